@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Values forwarded, anomalies caught and CPU time per sample of an AnomalyGate
+with either Method, compared with a RangeFilter with static bounds in the
+same WindowingScheme, on a day of values sampled every second.
+
+The trace is generated with a fixed seed: a temperature drifting by a few
+degrees over the day, with sensor noise and 20 spikes of 6 to 10 times the
+noise.  The static bounds are set around the first hour of values, as they
+would be when commissioning the sensor.
+
+Usage: python benchmarks/anomaly_gate_benchmark.py
+"""
+
+import math
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.lib.utilities.filters.anomaly_filter import Method
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+from liota.lib.utilities.filters.windowing_scheme import windowing_scheme
+from liota.lib.utilities.filters.windowing_scheme.anomaly_gate import AnomalyGate
+from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
+
+NUM_SAMPLES = 86400
+START = 1500000000000
+HEARTBEAT_SEC = 300
+
+
+def trace():
+    rand = random.Random(42)
+    values = [20.0 + 4 * math.sin(math.pi * i / NUM_SAMPLES) + rand.gauss(0, 0.2) for i in range(NUM_SAMPLES)]
+    spikes = set(rand.sample(range(3600, NUM_SAMPLES), 20))
+    for i in spikes:
+        values[i] += rand.choice([-1, 1]) * rand.uniform(1.2, 2.0)
+    return [(START + 1000 * i, v) for i, v in enumerate(values)], spikes
+
+
+def run(filter_obj, samples, spikes):
+    start = time.time()
+    passed = filter_obj.filter_batch(samples)
+    elapsed = time.time() - start
+    caught = len(spikes & set((ts - START) // 1000 for ts, _ in passed))
+    return len(passed), caught, elapsed * 1e6 / len(samples)
+
+
+def main():
+    samples, spikes = trace()
+    first_hour = [v for _, v in samples[:3600]]
+    # Windowing schemes start their first window at the current time; start it with the trace instead
+    windowing_scheme.getUTCmillis = lambda: START
+    filters = [
+        ("RangeFilter, static bounds", WindowingScheme(
+            RangeFilter(Type.OPEN_REJECT, min(first_hour) - 0.5, max(first_hour) + 0.5), HEARTBEAT_SEC)),
+        ("AnomalyGate, Method.ZSCORE", AnomalyGate(threshold=4.5, heartbeat_sec=HEARTBEAT_SEC)),
+        ("AnomalyGate, Method.MAD", AnomalyGate(threshold=4.5, heartbeat_sec=HEARTBEAT_SEC, method=Method.MAD))
+    ]
+    print "%d samples, %d spikes, heartbeat every %d s" % (len(samples), len(spikes), HEARTBEAT_SEC)
+    print "%-28s %10s %10s %8s %10s" % ("filter", "forwarded", "reduction", "spikes", "us/sample")
+    for name, filter_obj in filters:
+        forwarded, caught, us = run(filter_obj, samples, spikes)
+        print "%-28s %10d %9.1fx %5d/%d %10.2f" % (name, forwarded, float(len(samples)) / forwarded, caught,
+                                                  len(spikes), us)
+
+
+if __name__ == '__main__':
+    main()
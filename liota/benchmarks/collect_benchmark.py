@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Measures the overhead of RegisteredMetric.collect() around a trivial
+sampling function, as spent by a CollectionThread for each sample, with
+liota logging at its default level (WARNING).
+
+Usage: python benchmarks/collect_benchmark.py [collections]
+"""
+
+import logging
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.entities.metrics.metric import Metric
+
+
+def no_arg():
+    return 1.5
+
+
+def one_arg(context):
+    return 1.5
+
+
+def bench(sampling_function, num_collections):
+    metric = Metric(name="metric", interval=1, aggregation_size=1,
+                    sampling_function=sampling_function)
+    reg_metric = metric.register(None, None)
+    collect = reg_metric.collect
+    values = reg_metric.values
+    start = time.time()
+    for _ in xrange(num_collections):
+        collect()
+        reg_metric.is_ready_to_send()
+        reg_metric.reset_aggregation_size()
+        values.drain()
+    return time.time() - start
+
+
+def main():
+    num_collections = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    logging.getLogger('liota').setLevel(logging.WARNING)
+    print "%16s %16s %16s" % ("sampling args", "collections/s",
+                              "us/collection")
+    for name, sampling_function in [("none", no_arg), ("one", one_arg)]:
+        elapsed = bench(sampling_function, num_collections)
+        print "%16s %16.0f %16.2f" % (name, num_collections / elapsed,
+                                      elapsed * 1e6 / num_collections)
+
+
+if __name__ == '__main__':
+    main()
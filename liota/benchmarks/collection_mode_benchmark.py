@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Compares ExecutionMode.THREAD and ExecutionMode.PROCESS on a CPU-bound
+sampling function (a naive DFT), collecting with a fixed number of threads
+as CollectionThreadPool would.
+
+Usage: python benchmarks/collection_mode_benchmark.py [threads] [collections]
+"""
+
+import cmath
+import math
+import sys
+import time
+from threading import Thread
+
+sys.path.insert(0, '.')
+
+from liota.core import metric_handler
+from liota.core.metric_handler import ExecutionMode
+from liota.entities.metrics.metric import Metric
+
+SAMPLES = [math.sin(i / 3.0) for i in range(256)]
+
+
+def dft_peak():
+    """
+    CPU-bound sampling function: magnitude of the strongest DFT bin.
+    """
+    n = len(SAMPLES)
+    return max(abs(sum(SAMPLES[k] * cmath.exp(-2j * cmath.pi * f * k / n)
+                       for k in range(n)))
+               for f in range(n / 2))
+
+
+def bench(execution_mode, num_threads, num_collections):
+    metric = Metric(name="dft_peak", interval=1,
+                    sampling_function=dft_peak,
+                    execution_mode=execution_mode)
+    reg_metric = metric.register(None, None)
+
+    def collector():
+        for _ in range(num_collections / num_threads):
+            reg_metric.collect()
+
+    threads = [Thread(target=collector) for _ in range(num_threads)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return num_collections / (time.time() - start)
+
+
+def main():
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    num_collections = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    # Fork worker processes before timing
+    metric_handler.get_process_pool()
+    print "%10s %20s" % ("mode", "collections/s")
+    for execution_mode in [ExecutionMode.THREAD, ExecutionMode.PROCESS]:
+        print "%10s %20.1f" % (execution_mode.name,
+                               bench(execution_mode, num_threads,
+                                     num_collections))
+    metric_handler.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Compression ratio and CPU time per sample of DeadbandFilter and
+SwingingDoorFilter, applied sample by sample with filter() and to a whole
+batch with filter_batch().
+
+Traces are generated with a fixed seed to resemble recorded sensor data
+sampled once a second: a slowly drifting temperature with sensor noise, a
+pressure stepping between set points, and a vibration.
+
+Usage: python benchmarks/compression_filter_benchmark.py [samples]
+"""
+
+import math
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.lib.utilities.filters import swinging_door_filter
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+from liota.lib.utilities.filters.swinging_door_filter import SwingingDoorFilter
+
+
+def traces(num_samples):
+    rand = random.Random(42)
+    temperature = []
+    drift = 21.0
+    for i in range(num_samples):
+        drift += rand.gauss(0, 0.01)
+        temperature.append(round(drift + 2 * math.sin(2 * math.pi * i / 86400.0) + rand.gauss(0, 0.05), 2))
+    pressure = []
+    set_point = 100.0
+    for i in range(num_samples):
+        if rand.random() < 0.002:
+            set_point = rand.choice([80.0, 100.0, 120.0])
+        pressure.append(round(set_point + rand.gauss(0, 0.2), 1))
+    vibration = [math.sin(2 * math.pi * i / 20.0) + rand.gauss(0, 0.02) for i in range(num_samples)]
+    start = 1500000000000
+    for name, values in [("temperature", temperature), ("pressure", pressure), ("vibration", vibration)]:
+        yield name, [(start + 1000 * i, v) for i, v in enumerate(values)]
+
+
+def per_sample(filter_obj, samples):
+    # SwingingDoorFilter.filter() timestamps samples with the clock; replay the trace's time instead
+    clock = iter([ts for ts, _ in samples]).next
+    swinging_door_filter.getUTCmillis = clock
+    start = time.time()
+    passed = sum(1 for _, v in samples if filter_obj.filter(v) is not None)
+    return passed, time.time() - start
+
+
+def per_batch(filter_obj, samples):
+    start = time.time()
+    passed = len(filter_obj.filter_batch(samples))
+    return passed, time.time() - start
+
+
+def main():
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    filters = [
+        ("deadband 0.5", lambda: DeadbandFilter(0.5)),
+        ("deadband 1%", lambda: DeadbandFilter(0.01, relative=True)),
+        ("swinging door 0.5", lambda: SwingingDoorFilter(0.5)),
+    ]
+    print "%d samples per trace" % num_samples
+    print "%12s %18s %8s %14s %14s" % ("trace", "filter", "ratio", "sample (us)", "batch (us)")
+    for trace, samples in traces(num_samples):
+        for name, create in filters:
+            passed, sample_time = per_sample(create(), samples)
+            batch_passed, batch_time = per_batch(create(), samples)
+            assert passed == batch_passed
+            print "%12s %18s %8.1f %14.2f %14.2f" % (
+                trace, name, float(num_samples) / passed,
+                sample_time * 1e6 / num_samples, batch_time * 1e6 / num_samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Measures the cost of rescheduling a metric in the event scheduler of the
+metric handler, for an increasing number of registered metrics.
+
+Usage: python benchmarks/event_scheduler_benchmark.py
+"""
+
+import heapq
+import random
+import sys
+import timeit
+
+sys.path.insert(0, '.')
+
+from liota.core.event_scheduler import EventScheduler
+
+SIZES = [1000, 10000, 100000]
+INTERVALS = [1000, 5000, 10000, 60000]
+RESCHEDULES = 100000
+
+
+def _fill(size):
+    scheduler = EventScheduler()
+    for i in range(size):
+        interval = random.choice(INTERVALS)
+        scheduler.push(i, random.randint(0, interval), interval)
+    return scheduler
+
+
+def bench_event_scheduler(size):
+    scheduler = _fill(size)
+    intervals = {}
+
+    def reschedule():
+        deadline = scheduler.peek_deadline()
+        item = scheduler.pop()
+        interval = intervals.setdefault(item, random.choice(INTERVALS))
+        scheduler.push(item, deadline + interval, interval)
+
+    return min(timeit.repeat(reschedule, number=RESCHEDULES, repeat=3)) \
+        / RESCHEDULES
+
+
+def bench_heapq_nsmallest(size):
+    """
+    Previous implementation: one heap plus heapq.nsmallest() to look up the
+    first element before and after every insertion.
+    """
+    queue = [(random.randint(0, 60000), i) for i in range(size)]
+    heapq.heapify(queue)
+    number = max(RESCHEDULES / size, 10)
+
+    def reschedule():
+        heapq.nsmallest(1, queue)
+        deadline, item = heapq.heappop(queue)
+        heapq.heappush(queue, (deadline + random.choice(INTERVALS), item))
+        heapq.nsmallest(1, queue)
+
+    return min(timeit.repeat(reschedule, number=number, repeat=3)) / number
+
+
+def main():
+    random.seed(0)
+    print "%10s %22s %22s" % ("metrics", "EventScheduler (us)",
+                              "heapq.nsmallest (us)")
+    for size in SIZES:
+        print "%10d %22.2f %22.2f" % (size,
+                                      bench_event_scheduler(size) * 1e6,
+                                      bench_heapq_nsmallest(size) * 1e6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+CPU time per sample of a chain of filters applied by a sampling function,
+one filter after another, and of the same filters in a FilterPipeline,
+which fuses the stateless RangeFilters into one step, for single values,
+batches of (timestamp, value) tuples and NumPy arrays.
+
+Usage: python benchmarks/filter_pipeline_benchmark.py [samples]
+"""
+
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+from liota.lib.utilities.filters.filter_pipeline import FilterPipeline
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def create_filters():
+    return [RangeFilter(Type.AT_LEAST, None, 20.0),
+            RangeFilter(Type.AT_MOST, 80.0, None),
+            RangeFilter(Type.CLOSED_REJECT, 45.0, 55.0),
+            DeadbandFilter(0.5)]
+
+
+def chained(samples):
+    filters = create_filters()
+    start = time.time()
+    passed = 0
+    for _, v in samples:
+        for filter_obj in filters:
+            v = filter_obj.filter(v)
+            if v is None:
+                break
+        else:
+            passed += 1
+    return time.time() - start, passed
+
+
+def pipeline_filter(samples):
+    pipeline = FilterPipeline(*create_filters())
+    start = time.time()
+    passed = len([v for _, v in samples if pipeline.filter(v) is not None])
+    return time.time() - start, passed
+
+
+def pipeline_batch(samples):
+    pipeline = FilterPipeline(*create_filters())
+    start = time.time()
+    passed = len(pipeline.filter_batch(samples))
+    return time.time() - start, passed
+
+
+def pipeline_arrays(timestamps, values):
+    pipeline = FilterPipeline(*create_filters())
+    start = time.time()
+    passed = len(pipeline.filter_arrays(timestamps, values))
+    return time.time() - start, passed
+
+
+def main():
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rand = random.Random(42)
+    samples = [(1500000000000 + 100 * i, rand.gauss(50.0, 15.0)) for i in range(num_samples)]
+    results = [("chained filter()", chained(samples)),
+               ("FilterPipeline.filter()", pipeline_filter(samples)),
+               ("FilterPipeline.filter_batch()", pipeline_batch(samples))]
+    if numpy is not None:
+        results.append(("FilterPipeline.filter_arrays(numpy)",
+                        pipeline_arrays(numpy.array([ts for ts, _ in samples], dtype=numpy.int64),
+                                        numpy.array([v for _, v in samples], dtype=numpy.float64))))
+
+    print "%d samples" % num_samples
+    print "%-36s %10s %8s" % ("applied with", "us/sample", "passed")
+    for name, (elapsed, passed) in results:
+        print "%-36s %10.3f %8d" % (name, elapsed * 1e6 / num_samples, passed)
+
+
+if __name__ == '__main__':
+    main()
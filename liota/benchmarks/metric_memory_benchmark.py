@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Memory taken by each registered metric, i.e. a Metric and its
+RegisteredMetric with an empty value buffer, as measured by the growth of
+the resident set size of the process while registering many of them.
+Run it on two revisions of liota to compare them.
+
+Usage: python benchmarks/metric_memory_benchmark.py [metrics]
+"""
+
+import gc
+import logging
+import resource
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.entities.metrics.metric import Metric
+
+
+def sampling_function():
+    return 0
+
+
+def rss():
+    """
+    :return: Resident set size of the process in bytes
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except IOError:
+        # Peak size, in kB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main():
+    num_metrics = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # Options of metrics are read from CORE_CFG once per metric
+    logging.disable(logging.CRITICAL)
+    names = ["metric-%d" % i for i in range(num_metrics)]
+    gc.collect()
+    before = rss()
+    start = time.time()
+    metrics = [Metric(name=name, interval=10,
+                      sampling_function=sampling_function)
+               for name in names]
+    reg_metrics = [metric.register(None, None) for metric in metrics]
+    elapsed = time.time() - start
+    gc.collect()
+    after = rss()
+    print "%d registered metrics" % len(reg_metrics)
+    print "%20s %12.0f" % ("bytes/metric", float(after - before) / num_metrics)
+    print "%20s %12.1f" % ("us to create", elapsed * 1e6 / num_metrics)
+
+
+if __name__ == '__main__':
+    main()
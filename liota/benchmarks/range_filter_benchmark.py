@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+CPU time per sample of RangeFilter and of a WindowingScheme around it,
+applied sample by sample with filter(), to a batch of (timestamp, value)
+tuples with filter_batch(), and to arrays with filter_arrays().
+
+Usage: python benchmarks/range_filter_benchmark.py [samples]
+"""
+
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, '.')
+
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+from liota.lib.utilities.filters.windowing_scheme import windowing_scheme
+from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def per_sample(filter_obj, samples):
+    # WindowingScheme.filter() reads the clock; replay the samples' time instead
+    windowing_scheme.getUTCmillis = iter([ts for ts, _ in samples]).next
+    start = time.time()
+    passed = [v for _, v in samples if filter_obj.filter(v) is not None]
+    return time.time() - start, len(passed)
+
+
+def batch(filter_obj, samples):
+    start = time.time()
+    passed = filter_obj.filter_batch(samples)
+    return time.time() - start, len(passed)
+
+
+def arrays(filter_obj, timestamps, values):
+    start = time.time()
+    _, passed = filter_obj.filter_arrays(timestamps, values)
+    return time.time() - start, len(passed)
+
+
+def main():
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rand = random.Random(42)
+    start_ts = 1500000000000
+    samples = [(start_ts + 100 * i, rand.gauss(50.0, 10.0)) for i in range(num_samples)]
+    inputs = [("array.array", array('l', [ts for ts, _ in samples]), array('d', [v for _, v in samples]))]
+    if numpy is not None:
+        inputs.append(("numpy", numpy.array([ts for ts, _ in samples], dtype=numpy.int64),
+                       numpy.array([v for _, v in samples], dtype=numpy.float64)))
+
+    def create(name):
+        range_filter = RangeFilter(Type.CLOSED_REJECT, 20.0, 80.0)
+        if name == "RangeFilter":
+            return range_filter
+        windowing_scheme.getUTCmillis = lambda: start_ts
+        return WindowingScheme(range_filter, 10)
+
+    print "%d samples, us per sample" % num_samples
+    print "%-16s %-26s %10s %8s" % ("filter", "applied with", "us", "passed")
+    for name in ["RangeFilter", "WindowingScheme"]:
+        results = [("filter()", per_sample(create(name), samples)),
+                   ("filter_batch()", batch(create(name), samples))]
+        for input_name, timestamps, values in inputs:
+            results.append(("filter_arrays(%s)" % input_name, arrays(create(name), timestamps, values)))
+        for applied_with, (elapsed, passed) in results:
+            print "%-16s %-26s %10.3f %8d" % (name, applied_with, elapsed * 1e6 / num_samples, passed)
+
+
+if __name__ == '__main__':
+    main()
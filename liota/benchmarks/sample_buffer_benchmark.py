@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Compares the storage of collected samples in a Queue.Queue of (ts, value)
+tuples, as RegisteredMetric.values used to be, and in a SampleBuffer:
+bytes per sample, and time to add then drain samples as a DCC formatter
+does.
+
+Usage: python benchmarks/sample_buffer_benchmark.py [samples]
+"""
+
+import sys
+import time
+from Queue import Queue
+
+sys.path.insert(0, '.')
+
+from liota.core.sample_buffer import SampleBuffer
+from liota.lib.utilities.utility import getUTCmillis
+
+
+def queue_size(queue):
+    return sys.getsizeof(queue.queue) + sum(
+        sys.getsizeof(item) + sys.getsizeof(item[0]) + sys.getsizeof(item[1])
+        for item in queue.queue)
+
+
+def fill(buf, samples):
+    start = time.time()
+    for sample in samples:
+        buf.put(sample)
+    return time.time() - start
+
+
+def drain_queue(queue):
+    start = time.time()
+    timestamps = []
+    values = []
+    for _ in range(queue.qsize()):
+        ts, value = queue.get(block=True)
+        timestamps.append(ts)
+        values.append(value)
+    return time.time() - start
+
+
+def drain_buffer(buf):
+    start = time.time()
+    buf.drain()
+    return time.time() - start
+
+
+def main():
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    now = getUTCmillis()
+    kinds = [
+        ("int", lambda i: i),
+        ("float", lambda i: i * 0.1),
+        ("str", lambda i: "state-%d" % (i % 8))
+    ]
+    print "%d samples" % num_samples
+    print "%6s %12s %14s %14s %14s" % ("value", "storage", "bytes/sample",
+                                       "put (us)", "drain (us)")
+    for name, value in kinds:
+        samples = [(now + i, value(i)) for i in range(num_samples)]
+        for storage, buf, size, drain in [
+                ("Queue", Queue(), queue_size, drain_queue),
+                ("Sample", SampleBuffer(), SampleBuffer.memory_size,
+                 drain_buffer)]:
+            put_time = fill(buf, samples)
+            bytes_per_sample = float(size(buf)) / num_samples
+            drain_time = drain(buf)
+            print "%6s %12s %14.1f %14.2f %14.3f" % (
+                name, storage, bytes_per_sample,
+                put_time * 1e6 / num_samples, drain_time * 1e6 / num_samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Compares the CPU load profile of SchedulingPhase.NONE, SPREAD and ALIGN
+when a package starts many metrics with the same interval at once.
+
+Run times of the metrics are computed as the metric handler would, then
+their collections are replayed bucket by bucket (100 ms each), measuring
+the CPU time spent per bucket.  A peak-to-mean ratio close to 1 means the
+load is evenly spread over the interval.
+
+Usage: python benchmarks/scheduling_phase_benchmark.py [metrics] [interval]
+"""
+
+import collections
+import logging
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from liota.core.metric_handler import SchedulingPhase
+from liota.entities.metrics.metric import Metric
+
+BUCKET_MS = 100
+NUM_INTERVALS = 4
+
+
+def sampling_function():
+    return sum(i * i for i in range(200))
+
+
+def bench(phase, num_metrics, interval):
+    # Start in the middle of an interval, as a package would
+    now = 1500000000000 + interval * 1000 / 3
+    buckets = collections.defaultdict(list)
+    for i in range(num_metrics):
+        metric = Metric(name="metric_%d" % i, interval=interval,
+                        sampling_function=sampling_function,
+                        scheduling_phase=phase)
+        reg_metric = metric.register(None, None)
+        run_time = reg_metric.get_first_run_time(now)
+        for j in range(NUM_INTERVALS):
+            buckets[int(run_time + j * interval * 1000) / BUCKET_MS].append(
+                reg_metric)
+    first, last = min(buckets), max(buckets)
+    cpu_times = []
+    for bucket in range(first, last + 1):
+        start = time.clock()
+        for reg_metric in buckets.get(bucket, []):
+            reg_metric.collect()
+            reg_metric.values.get()
+        cpu_times.append((time.clock() - start) * 1000)
+    peak_collections = max(len(metrics) for metrics in buckets.values())
+    mean = sum(cpu_times) / len(cpu_times)
+    return peak_collections, max(cpu_times), mean, max(cpu_times) / mean
+
+
+def main():
+    num_metrics = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    # Keep liota.conf lookups and collection logs out of the measurements
+    logging.disable(logging.CRITICAL)
+    print "%d metrics, interval %d s, %d ms buckets" \
+        % (num_metrics, interval, BUCKET_MS)
+    print "%8s %18s %16s %16s %12s" % ("phase", "peak collections",
+                                       "peak CPU (ms)", "mean CPU (ms)",
+                                       "peak/mean")
+    for phase in SchedulingPhase:
+        print "%8s %18d %16.1f %16.2f %12.1f" \
+            % ((phase.name,) + bench(phase, num_metrics, interval))
+
+
+if __name__ == '__main__':
+    main()
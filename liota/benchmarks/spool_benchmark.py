@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Throughput of a Spool: messages appended per second while a DCC is
+unavailable, messages read back and removed per second on replay, and time
+to open a spool holding all of them again after a restart.  Replay is
+measured without the rate limit of SpoolReplayThread.
+
+Usage: python benchmarks/spool_benchmark.py [messages]
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from liota.core.spool import Spool
+from liota.lib.utilities.utility import getUTCmillis
+
+
+def message(size):
+    now = getUTCmillis()
+    values = []
+    while len(json.dumps(values)) < size:
+        values.append({"v": len(values) * 0.5, "ts": now + len(values)})
+    return json.dumps(values)
+
+
+def main():
+    num_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print "%d messages" % num_messages
+    print "%8s %14s %14s %14s %10s" % ("size (B)", "append (msg/s)",
+                                       "replay (msg/s)", "append (MB/s)",
+                                       "open (ms)")
+    for size in [100, 1000, 10000]:
+        payload = message(size)
+        path = tempfile.mkdtemp()
+        try:
+            spool = Spool(path, max_size=1 << 40)
+            start = time.time()
+            for _ in range(num_messages):
+                spool.append(payload, None)
+            spool.flush()
+            append_time = time.time() - start
+            spool.close()
+
+            start = time.time()
+            spool = Spool(path, max_size=1 << 40)
+            open_time = time.time() - start
+            start = time.time()
+            while spool.peek() is not None:
+                spool.pop()
+            replay_time = time.time() - start
+            spool.close()
+        finally:
+            shutil.rmtree(path)
+        print "%8d %14.0f %14.0f %14.1f %10.1f" % (
+            len(payload), num_messages / append_time,
+            num_messages / replay_time,
+            num_messages * len(payload) / append_time / 1e6,
+            open_time * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from collections import deque
+from Queue import Queue
+
+from aenum import UniqueEnum
+
+
+class OverflowPolicy(UniqueEnum):
+    """
+    Enum for what a BoundedQueue does with an item put while it is full.
+
+        *  BLOCK       - Block the producer until there is room
+        *  DROP_OLDEST - Drop the oldest queued item to make room
+        *  DROP_NEWEST - Drop the item being put
+        *  DOWNSAMPLE  - Drop every other queued item, keeping the newest,
+                         so the queue keeps covering the same period at
+                         half the resolution
+    """
+    BLOCK = 0
+    DROP_OLDEST = 1
+    DROP_NEWEST = 2
+    DOWNSAMPLE = 3
+
+
+def parse_overflow_policy(name):
+    """
+    :param name: Name of an OverflowPolicy, case insensitive
+    :return: OverflowPolicy
+    """
+    return OverflowPolicy[name.strip().upper()]
+
+
+def is_control_item(item):
+    """
+    None and SystemExit objects are the signals used by liota's worker
+    threads, they are never subject to the capacity of a BoundedQueue.
+    """
+    return item is None or isinstance(item, SystemExit)
+
+
+class BoundedQueue(Queue):
+    """
+    Queue whose capacity is enforced with an OverflowPolicy.
+
+    A maxsize of 0 or less means the queue is unbounded.  Items dropped to
+    respect the capacity are counted in num_dropped and passed to on_drop,
+    which is called after the queue lock is released.
+
+    Subclasses that store something else than the items in self.queue
+    override _item() to get an item back from a stored entry.
+    """
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.BLOCK, on_drop=None):
+        Queue.__init__(self, maxsize)
+        if policy not in OverflowPolicy:
+            raise TypeError("OverflowPolicy is expected.")
+        self.policy = policy
+        self.on_drop = on_drop
+        self.num_dropped = 0
+
+    def _item(self, entry):
+        return entry
+
+    def put(self, item, block=True, timeout=None):
+        if self.maxsize > 0 and self.policy is OverflowPolicy.BLOCK \
+                and not is_control_item(item):
+            return Queue.put(self, item, block, timeout)
+        dropped = []
+        self.not_full.acquire()
+        try:
+            if self.maxsize > 0 and not is_control_item(item) \
+                    and self._qsize() >= self.maxsize:
+                dropped = self._make_room(item)
+            if not dropped or dropped[-1] is not item:
+                self._put(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+            self.num_dropped += len(dropped)
+        finally:
+            self.not_full.release()
+        if self.on_drop is not None:
+            for dropped_item in dropped:
+                self.on_drop(dropped_item)
+
+    def _lanes(self):
+        """
+        :return: Deques holding the queued entries, most important first
+        """
+        return [self.queue]
+
+    def _lane(self, item):
+        """
+        :return: Index in _lanes() of the lane item is queued in
+        """
+        return 0
+
+    def _make_room(self, item):
+        """
+        Removes queued entries according to policy, shedding the least
+        important lanes first.  Entries of lanes more important than the
+        one of item are never dropped.  Must be called with the queue lock
+        held.
+
+        :param item: Item being put
+        :return: List of dropped items, ending with item if it is not to be
+                 queued
+        """
+        lanes = self._lanes()
+        item_lane = self._lane(item)
+        for i in range(len(lanes) - 1, item_lane - 1, -1):
+            dropped = self._drop_from(lanes[i], i == item_lane)
+            if dropped:
+                self.unfinished_tasks -= len(dropped)
+                return dropped
+        # Nothing else can be dropped
+        return [item]
+
+    def _drop_from(self, lane, own_lane):
+        """
+        :param lane: Deque of entries
+        :param own_lane: Whether the item being put goes in this lane
+        :return: List of items removed from lane
+        """
+        if self.policy is OverflowPolicy.DROP_OLDEST:
+            return self._drop_first(lane, xrange(len(lane)))
+        if self.policy is OverflowPolicy.DROP_NEWEST:
+            if own_lane:
+                return []
+            return self._drop_first(lane, xrange(len(lane) - 1, -1, -1))
+        # DOWNSAMPLE: drop every other entry, counting back from the item
+        # being put, or from the newest entry of a less important lane
+        droppable = [i for i, entry in enumerate(lane)
+                     if not is_control_item(self._item(entry))]
+        if own_lane:
+            dropped = droppable[(len(droppable) - 1) % 2::2]
+        else:
+            dropped = droppable[len(droppable) % 2::2] or droppable
+        if not dropped:
+            return []
+        dropped = set(dropped)
+        entries = list(lane)
+        lane.clear()
+        lane.extend(entry for i, entry in enumerate(entries)
+                    if i not in dropped)
+        return [self._item(entry) for i, entry in enumerate(entries)
+                if i in dropped]
+
+    def _drop_first(self, lane, indexes):
+        """
+        Removes the first droppable entry of lane, in the order of indexes.
+        """
+        for i in indexes:
+            item = self._item(lane[i])
+            if not is_control_item(item):
+                del lane[i]
+                return [item]
+        return []
+
+
+class LaneQueue(BoundedQueue):
+    """
+    BoundedQueue with one FIFO lane per priority level, lane 0 being the
+    most important.  get() takes items of a lane only when all more
+    important lanes are empty, and a full queue sheds items of the least
+    important lanes first.
+
+    Subclasses override _lane() to tell in which lane an item goes.
+    """
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.BLOCK, on_drop=None,
+                 num_lanes=1):
+        self.num_lanes = num_lanes
+        BoundedQueue.__init__(self, maxsize, policy, on_drop)
+
+    def _init(self, maxsize):
+        self.lanes = [deque() for _ in range(self.num_lanes)]
+
+    def _qsize(self, len=len):
+        return sum(len(lane) for lane in self.lanes)
+
+    def _put(self, item):
+        self.lanes[self._lane(item)].append(item)
+
+    def _get(self):
+        for lane in self.lanes:
+            if lane:
+                return lane.popleft()
+
+    def _lanes(self):
+        return self.lanes
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+"""
+Single threaded collector for coroutine sampling functions.
+
+A coroutine sampling function is a generator function.  Instead of blocking,
+it yields what it is waiting for, and is resumed by CoroutineCollector once
+that is available:
+
+    *  Sleep(seconds)        - resumed after the given time
+    *  WaitReadable(fd)      - resumed when fd (or object with fileno())
+                               is readable
+    *  WaitWritable(fd)      - resumed when fd is writable
+    *  another generator     - runs it as a sub-coroutine, its result is
+                               sent back
+
+A coroutine finishes with "raise Return(value)", value being the collected
+data.  For example:
+
+    def read_device():
+        sock = socket.create_connection(("10.0.0.5", 502))
+        sock.setblocking(0)
+        sock.send(REQUEST)
+        yield WaitReadable(sock)
+        raise Return(parse(sock.recv(256)))
+
+Thousands of such coroutines can wait on their devices concurrently from a
+single CoroutineCollector thread.
+"""
+
+from collections import deque
+from heapq import heappush, heappop
+import errno
+import fcntl
+import itertools
+import logging
+import os
+import select
+import sys
+from threading import Thread, Lock
+from time import time as _time
+import types
+
+log = logging.getLogger(__name__)
+
+
+class Sleep(object):
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class WaitReadable(object):
+
+    def __init__(self, fd):
+        self.fd = fd if isinstance(fd, (int, long)) else fd.fileno()
+
+
+class WaitWritable(object):
+
+    def __init__(self, fd):
+        self.fd = fd if isinstance(fd, (int, long)) else fd.fileno()
+
+
+class Timeout(Exception):
+    """
+    Passed to the callback of a coroutine that did not finish in time.
+    """
+    pass
+
+
+class Return(Exception):
+    """
+    Raised by a coroutine to finish with a value.
+    """
+
+    def __init__(self, value=None):
+        Exception.__init__(self)
+        self.value = value
+
+
+class _Task(object):
+
+    def __init__(self, coroutine, callback, deadline):
+        # Stack of nested generators, the innermost one is running
+        self.stack = [coroutine]
+        self.callback = callback
+        self.deadline = deadline
+        self.send_value = None
+        self.exc_info = None
+        # (waiters, fd) while waiting on a file descriptor
+        self.waiting = None
+        self.finished = False
+
+
+class CoroutineCollector(Thread):
+    """
+    Event loop thread that runs coroutines until they finish, then calls
+    their callback with (result, exc_info); exc_info is None unless the
+    coroutine raised an exception.  A coroutine still running after its
+    timeout is closed, and its callback gets a Timeout exception.
+    """
+
+    def __init__(self, name=None):
+        Thread.__init__(self, name=name)
+        self.daemon = True
+        self._lock = Lock()
+        self._incoming = deque()
+        self._ready = deque()
+        # Heaps of (wake up time, sequence, task) and (deadline, sequence,
+        # task); finished tasks are skipped when popped
+        self._sleepers = []
+        self._deadlines = []
+        self._counter = itertools.count()
+        # key: fd, value: task
+        self._readers = {}
+        self._writers = {}
+        self._num_tasks = 0
+        self._poll = select.poll()
+        self._wake_r, self._wake_w = os.pipe()
+        for fd in (self._wake_r, self._wake_w):
+            fcntl.fcntl(fd, fcntl.F_SETFL,
+                        fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        self._poll.register(self._wake_r, select.POLLIN)
+        self.start()
+
+    def submit(self, coroutine, callback, timeout=None):
+        """
+        Schedules a coroutine, this method can be called from any thread.
+
+        :param coroutine: Generator object
+        :param callback: Called as callback(result, exc_info) when done
+        :param timeout: Seconds the coroutine is allowed to run, or None
+        :return: None
+        """
+        deadline = None if timeout is None else _time() + timeout
+        with self._lock:
+            self._incoming.append(_Task(coroutine, callback, deadline))
+        try:
+            os.write(self._wake_w, "x")
+        except OSError as err:
+            # Pipe is full, event loop is going to wake up anyway
+            if err.errno != errno.EAGAIN:
+                raise
+
+    def get_num_tasks(self):
+        """
+        :return: Number of coroutines submitted and not finished yet.
+        """
+        with self._lock:
+            return self._num_tasks + len(self._incoming)
+
+    def run(self):
+        log.info("Started CoroutineCollector")
+        while True:
+            while self._ready:
+                task = self._ready.popleft()
+                if not task.finished:
+                    self._step(task)
+            wake_up = [heap[0][0] for heap in (self._sleepers, self._deadlines)
+                       if heap]
+            if wake_up:
+                timeout = max(0, int((min(wake_up) - _time()) * 1000))
+            else:
+                timeout = None
+            try:
+                events = self._poll.poll(timeout)
+            except select.error as err:
+                if err.args[0] != errno.EINTR:
+                    raise
+                events = []
+            for fd, event in events:
+                if fd == self._wake_r:
+                    self._accept()
+                    continue
+                if event & (select.POLLIN | select.POLLERR | select.POLLHUP) \
+                        and fd in self._readers:
+                    self._ready.append(self._readers.pop(fd))
+                if event & (select.POLLOUT | select.POLLERR | select.POLLHUP) \
+                        and fd in self._writers:
+                    self._ready.append(self._writers.pop(fd))
+                self._update_poll(fd)
+            now = _time()
+            while self._sleepers and self._sleepers[0][0] <= now:
+                self._ready.append(heappop(self._sleepers)[2])
+            while self._deadlines and self._deadlines[0][0] <= now:
+                task = heappop(self._deadlines)[2]
+                if not task.finished:
+                    self._expire(task)
+
+    def _accept(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except OSError as err:
+            if err.errno != errno.EAGAIN:
+                raise
+        with self._lock:
+            self._num_tasks += len(self._incoming)
+            for task in self._incoming:
+                if task.deadline is not None:
+                    heappush(self._deadlines, (task.deadline,
+                                               next(self._counter), task))
+            self._ready.extend(self._incoming)
+            self._incoming.clear()
+
+    def _update_poll(self, fd):
+        mask = 0
+        if fd in self._readers:
+            mask |= select.POLLIN
+        if fd in self._writers:
+            mask |= select.POLLOUT
+        if mask:
+            self._poll.register(fd, mask)
+        else:
+            try:
+                self._poll.unregister(fd)
+            except KeyError:
+                pass
+
+    def _wait_fd(self, task, waiters, fd):
+        if fd in waiters:
+            task.exc_info = (RuntimeError, RuntimeError(
+                "Another coroutine is already waiting on fd %d" % fd), None)
+            self._ready.append(task)
+            return
+        waiters[fd] = task
+        task.waiting = (waiters, fd)
+        self._update_poll(fd)
+
+    def _expire(self, task):
+        if task.waiting is not None:
+            waiters, fd = task.waiting
+            del waiters[fd]
+            self._update_poll(fd)
+            task.waiting = None
+        for coroutine in reversed(task.stack):
+            try:
+                coroutine.close()
+            except Exception:
+                log.exception("Error closing timed out coroutine")
+        self._finish(task, None, (Timeout, Timeout(
+            "Coroutine did not finish in time"), None))
+
+    def _step(self, task):
+        task.waiting = None
+        value, exc_info = task.send_value, task.exc_info
+        task.send_value = task.exc_info = None
+        while True:
+            coroutine = task.stack[-1]
+            try:
+                if exc_info is not None:
+                    request = coroutine.throw(*exc_info)
+                else:
+                    request = coroutine.send(value)
+            except Return as ret:
+                value, exc_info = ret.value, None
+            except StopIteration:
+                value, exc_info = None, None
+            except Exception:
+                value, exc_info = None, sys.exc_info()
+            else:
+                value, exc_info = None, None
+                if isinstance(request, types.GeneratorType):
+                    task.stack.append(request)
+                elif isinstance(request, Sleep):
+                    heappush(self._sleepers, (_time() + request.seconds,
+                                              next(self._counter), task))
+                    return
+                elif isinstance(request, WaitReadable):
+                    self._wait_fd(task, self._readers, request.fd)
+                    return
+                elif isinstance(request, WaitWritable):
+                    self._wait_fd(task, self._writers, request.fd)
+                    return
+                else:
+                    exc_info = (TypeError, TypeError(
+                        "Unsupported object yielded by coroutine: %r"
+                        % (request,)), None)
+                continue
+            # Innermost generator has finished
+            task.stack.pop()
+            if not task.stack:
+                self._finish(task, value, exc_info)
+                return
+
+    def _finish(self, task, result, exc_info):
+        task.finished = True
+        with self._lock:
+            self._num_tasks -= 1
+        try:
+            task.callback(result, exc_info)
+        except Exception:
+            log.exception("Error in coroutine callback")
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from collections import deque
+from heapq import heapify, heappush, heappop
+import itertools
+
+# Replaces the item of entries that have been cancelled or popped
+_REMOVED = object()
+
+
+class EventScheduler(object):
+    """
+    Deadline ordered container used by the metric handler to schedule events.
+
+    Most metrics are rescheduled at a fixed interval, so their deadlines are
+    produced in increasing order per interval.  Such entries are appended to
+    a FIFO lane kept per interval, which is an amortised O(1) insert.
+    Entries that would break the order of their lane, or that come without
+    an interval, fall back to a binary heap (O(log n) insert).
+
+    The earliest entry is cached, so peeking at the next deadline is O(1).
+    Popping it costs O(k + log n), where k is the number of distinct
+    intervals in use (usually a handful).
+
+    push() returns an entry which serves as a handle to cancel the item
+    later on.  A cancelled entry drops its reference to the item right away
+    and is purged lazily; lanes and heap are compacted once cancelled
+    entries outnumber live ones.
+    """
+
+    def __init__(self):
+        # key: interval, value: deque of entries in deadline order
+        self._lanes = {}
+        self._heap = []
+        self._first = None
+        self._size = 0
+        # Number of cancelled entries still held in lanes or heap
+        self._removed = 0
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return self._size
+
+    def push(self, item, deadline, interval=None):
+        """
+        Schedules an item.
+
+        :param item: Object to schedule.
+        :param deadline: Deadline of the item (any comparable value).
+        :param interval: Rescheduling interval of the item, if it has one.
+        :return: Scheduler entry (handle) of the item.
+        """
+        # Entries are [deadline, sequence, item, lane]; the sequence number
+        # keeps FIFO order among equal deadlines and prevents items from
+        # ever being compared with each other.
+        entry = [deadline, next(self._counter), item, None]
+        lane = None
+        if interval is not None:
+            lane = self._lanes.get(interval)
+            if lane is None:
+                lane = self._lanes[interval] = deque()
+        if lane is not None and (not lane or lane[-1] <= entry):
+            entry[3] = interval
+            lane.append(entry)
+        else:
+            heappush(self._heap, entry)
+        if self._first is None or entry < self._first:
+            self._first = entry
+        self._size += 1
+        return entry
+
+    def cancel(self, entry):
+        """
+        Removes a scheduled item using the entry returned by push().
+
+        :param entry: Scheduler entry of the item.
+        :return: True if the item was scheduled, False if it had already been
+                 popped or cancelled.
+        """
+        if entry is None or entry[2] is _REMOVED:
+            return False
+        entry[2] = _REMOVED
+        self._size -= 1
+        self._removed += 1
+        if entry is self._first:
+            self._first = self._find_first()
+        if self._removed > 64 and self._removed > self._size:
+            self._compact()
+        return True
+
+    def reschedule(self, entry, item, deadline, interval=None):
+        """
+        Cancels an entry, if it is still scheduled, and schedules the item
+        with a new deadline.
+
+        :param entry: Current scheduler entry of the item, or None.
+        :param item: Object to schedule.
+        :param deadline: New deadline of the item.
+        :param interval: Rescheduling interval of the item, if it has one.
+        :return: New scheduler entry (handle) of the item.
+        """
+        self.cancel(entry)
+        return self.push(item, deadline, interval)
+
+    def peek(self):
+        """
+        :return: Item with the earliest deadline, or None if empty.
+        """
+        if self._first is None:
+            return None
+        return self._first[2]
+
+    def peek_deadline(self):
+        """
+        :return: Earliest deadline, or None if empty.
+        """
+        if self._first is None:
+            return None
+        return self._first[0]
+
+    def pop(self):
+        """
+        Removes and returns the item with the earliest deadline.
+
+        :return: Item with the earliest deadline.
+        """
+        entry = self._first
+        if entry is None:
+            raise IndexError("pop from an empty EventScheduler")
+        interval = entry[3]
+        if interval is None:
+            heappop(self._heap)
+        else:
+            lane = self._lanes[interval]
+            lane.popleft()
+            if not lane:
+                del self._lanes[interval]
+        item = entry[2]
+        entry[2] = _REMOVED
+        self._size -= 1
+        self._first = self._find_first()
+        return item
+
+    def _find_first(self):
+        # Purges cancelled entries found at the head of heap and lanes
+        heap = self._heap
+        while heap and heap[0][2] is _REMOVED:
+            heappop(heap)
+            self._removed -= 1
+        first = heap[0] if heap else None
+        for interval in self._lanes.keys():
+            lane = self._lanes[interval]
+            while lane and lane[0][2] is _REMOVED:
+                lane.popleft()
+                self._removed -= 1
+            if not lane:
+                del self._lanes[interval]
+            elif first is None or lane[0] < first:
+                first = lane[0]
+        return first
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap
+                      if entry[2] is not _REMOVED]
+        heapify(self._heap)
+        for interval in self._lanes.keys():
+            lane = deque(entry for entry in self._lanes[interval]
+                         if entry[2] is not _REMOVED)
+            if lane:
+                self._lanes[interval] = lane
+            else:
+                del self._lanes[interval]
+        self._removed = 0
@@ -30,39 +30,197 @@
 #  THE POSSIBILITY OF SUCH DAMAGE.                                            #
 # ----------------------------------------------------------------------------#
 
-from Queue import Queue, PriorityQueue, Full
-import heapq
+from collections import deque, OrderedDict
+from itertools import chain, count
+from Queue import PriorityQueue, Empty, Full
 import logging
+import multiprocessing
+import os
 from threading import Thread, Condition, Lock
-from time import time as _time
+from time import sleep, time as _time
 
+from aenum import UniqueEnum
+
+from liota.core.bounded_queue import LaneQueue, OverflowPolicy, parse_overflow_policy, is_control_item
+from liota.core.coroutine_collector import CoroutineCollector, Timeout
+from liota.core.event_scheduler import EventScheduler
+from liota.core.sample_buffer import SampleBuffer
+from liota.core.spool import Spool, SpoolInUseError, SpoolReplayThread
 from liota.lib.utilities.utility import getUTCmillis
-from liota.lib.utilities.utility import read_liota_config
+from liota.lib.utilities.utility import read_liota_config_section
 
 log = logging.getLogger(__name__)
 
 event_ds = None
 collect_queue = None
-send_queue = None
+# key: id of DCC, value: SendThreadPool publishing to that DCC
+send_pools = {}
+send_pools_lock = Lock()
 event_checker_thread = None
-send_thread = None
 collect_thread_pool = None
+collection_watchdog = None
+coroutine_collector = None
+process_pool = None
+process_pool_lock = Lock()
+# Seconds between checks whether the process pool was recycled while waiting
+# for a sampling function, see get_process_result()
+process_poll_interval = 1.0
+# Options of CORE_CFG section of liota.conf, see _read_core_config()
+core_config = None
+core_config_lock = Lock()
+# key: id of RegisteredMetric, value: RegisteredMetric collecting data
+metrics = {}
+metrics_lock = Lock()
+
+
+class ExecutionMode(UniqueEnum):
+    """
+    Enum for where the sampling function of a Metric is executed.
+
+        *  THREAD   - In a CollectionThread of liota process (default)
+        *  PROCESS  - In a worker process of process_pool, so CPU-bound
+                      sampling functions are not limited by the GIL
+        *  COROUTINE - As a coroutine of coroutine_collector, for I/O-bound
+                      generator sampling functions
+    """
+    THREAD = 0
+    PROCESS = 1
+    COROUTINE = 2
+
+
+class MissedDeadlinePolicy(UniqueEnum):
+    """
+    Enum for how a Metric is rescheduled when collection is so late that
+    some of its next run times have already passed.
+
+        *  CATCH_UP - Run the missed collections back-to-back, at most
+                      max_catch_up of them (all of them if not set)
+        *  SKIP     - Skip the missed collections and run at the next run
+                      time still to come
+        *  COALESCE - Run one collection right away for all the missed ones
+    """
+    CATCH_UP = 0
+    SKIP = 1
+    COALESCE = 2
+
+
+def parse_missed_deadline_policy(name):
+    """
+    :param name: Name of a MissedDeadlinePolicy, case insensitive
+    :return: MissedDeadlinePolicy
+    """
+    return MissedDeadlinePolicy[name.strip().upper()]
+
+
+class SchedulingPhase(UniqueEnum):
+    """
+    Enum for when a Metric is first collected after start_collecting().
+
+        *  NONE   - One interval after start_collecting() (default)
+        *  SPREAD - At a deterministic offset within the interval, derived
+                     from the metric id, so metrics started together do
+                     not all fire at the same instant
+        *  ALIGN  - On wall-clock multiples of the interval, so metrics
+                     with the same interval fire together and their values
+                     can be published together
+    """
+    NONE = 0
+    SPREAD = 1
+    ALIGN = 2
+
+
+def parse_scheduling_phase(name):
+    """
+    :param name: Name of a SchedulingPhase, case insensitive
+    :return: SchedulingPhase
+    """
+    return SchedulingPhase[name.strip().upper()]
+
+
+class Priority(UniqueEnum):
+    """
+    Enum for the priority class of a Metric.
+
+    Among metrics due at the same time, the more important one is collected
+    first.  Collect and send queues keep a lane per priority class: a
+    metric is only taken from a lane when the lanes of more important
+    metrics are empty, and full queues drop less important metrics first.
+    """
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
 
 
 class EventsPriorityQueue(PriorityQueue):
+    """
+    Priority queue of metrics waiting for their next run time.
+
+    Elements are kept in an EventScheduler instead of a plain heap, so the
+    earliest metric can be looked up in constant time while holding the
+    mutex.  Each queued metric keeps its scheduler entry in _event_handle,
+    so it can be removed as soon as it stops collecting.
+    """
 
     def __init__(self):
         PriorityQueue.__init__(self)
         self.first_element_changed = Condition(self.mutex)
 
+    def _init(self, maxsize):
+        self.queue = EventScheduler()
+
+    def _qsize(self, len=len):
+        return len(self.queue)
+
+    def _put(self, item):
+        if isinstance(item, SystemExit):
+            # Exit signal is handled before any pending metric
+            self.queue.push(item, (0, 0))
+        else:
+            # A metric is never queued twice; an earlier entry is replaced.
+            # Priority breaks ties between metrics due at the same time.
+            item._event_handle = self.queue.reschedule(
+                item._event_handle, item,
+                (item.get_next_run_time(), item.ref_entity.priority.value),
+                item.ref_entity.interval)
+
+    def _get(self):
+        item = self.queue.pop()
+        if not isinstance(item, SystemExit):
+            item._event_handle = None
+        return item
+
+    def remove(self, item):
+        """
+        Removes a metric from the queue, if it is queued.
+
+        :param item: RegisteredMetric
+        :return: True if the metric was removed, False otherwise.
+        """
+        self.mutex.acquire()
+        try:
+            first_element_before_removal = self.queue.peek()
+            if not self.queue.cancel(item._event_handle):
+                return False
+            item._event_handle = None
+            self.unfinished_tasks -= 1
+            self.not_full.notify()
+            if first_element_before_removal is item:
+                self.first_element_changed.notify()
+            return True
+        finally:
+            self.mutex.release()
+
     def put_and_notify(self, item, block=True, timeout=None):
-        log.debug("Adding Event:" + str(item))
+        log.debug("Adding Event: %s", item)
         self.not_full.acquire()
         try:
+            # Metric stopped while being collected, do not put it back
+            if not isinstance(item, SystemExit) and not item.flag_alive:
+                log.debug("Discarded dead metric: %s" % str(item))
+                return
             first_element_before_insertion = None
             if self._qsize() > 0:
-                first_element_before_insertion = heapq.nsmallest(1, self.queue)[
-                    0]
+                first_element_before_insertion = self.queue.peek()
 
             if self.maxsize > 0:
                 if not block:
@@ -84,8 +242,8 @@ class EventsPriorityQueue(PriorityQueue):
             self.unfinished_tasks += 1
             self.not_empty.notify()
 
-            first_element_after_insertion = heapq.nsmallest(1, self.queue)[0]
-            if first_element_before_insertion != first_element_after_insertion:
+            first_element_after_insertion = self.queue.peek()
+            if first_element_before_insertion is not first_element_after_insertion:
                 self.first_element_changed.notify()
         finally:
             self.not_full.release()
@@ -93,141 +251,901 @@ class EventsPriorityQueue(PriorityQueue):
     def get_next_element_when_ready(self):
         self.first_element_changed.acquire()
         try:
-            isNotReady = True
-            while isNotReady:
-                if self._qsize() > 0:
-                    first_element = heapq.nsmallest(1, self.queue)[0]
-                    if isinstance(first_element, SystemExit):
-                        first_element = self._get()
-                        break
-                    if not first_element.flag_alive:
-                        log.debug("Early termination of dead metric")
-                        first_element = self._get()
-                        break
-                    timeout = (
-                        first_element.get_next_run_time() - getUTCmillis()
-                    ) / 1000.0
-                    log.debug("Waiting on acquired first_element_changed LOCK "
-                             + "for: %.2f" % timeout)
-                    self.first_element_changed.wait(timeout)
-                else:
-                    self.first_element_changed.wait()
-                    first_element = heapq.nsmallest(1, self.queue)[0]
+            return self._get_next_element_when_ready()
+        finally:
+            self.first_element_changed.release()
+
+    def get_ready_elements(self, max_count=None):
+        """
+        Waits until the first element is ready, then removes it together with
+        every other element that is due, in one critical section.
+
+        :param max_count: Maximum number of elements to remove at once.
+        :return: List of due elements. An exit signal is always returned alone.
+        """
+        self.first_element_changed.acquire()
+        try:
+            elements = [self._get_next_element_when_ready()]
+            if isinstance(elements[0], SystemExit):
+                return elements
+            now = getUTCmillis()
+            while self._qsize() > 0 and \
+                    (max_count is None or len(elements) < max_count):
+                first_element = self.queue.peek()
                 if isinstance(first_element, SystemExit):
-                    first_element = self._get()
                     break
-                if (first_element.get_next_run_time() - getUTCmillis()) <= 0 \
-                        or not first_element.flag_alive:
-                    isNotReady = False
-                    first_element = self._get()
-            return first_element
+                if first_element.flag_alive and \
+                        first_element.get_next_run_time() > now:
+                    break
+                elements.append(self._get())
+            return elements
         finally:
             self.first_element_changed.release()
 
+    def _get_next_element_when_ready(self):
+        # Caller must hold first_element_changed
+        isNotReady = True
+        while isNotReady:
+            if self._qsize() > 0:
+                first_element = self.queue.peek()
+                if isinstance(first_element, SystemExit):
+                    first_element = self._get()
+                    break
+                if not first_element.flag_alive:
+                    log.debug("Early termination of dead metric")
+                    first_element = self._get()
+                    break
+                timeout = (
+                    first_element.get_next_run_time() - getUTCmillis()
+                ) / 1000.0
+                log.debug("Waiting on acquired first_element_changed LOCK "
+                          "for: %.2f", timeout)
+                self.first_element_changed.wait(timeout)
+            else:
+                self.first_element_changed.wait()
+            if self._qsize() == 0:
+                continue
+            first_element = self.queue.peek()
+            if isinstance(first_element, SystemExit):
+                first_element = self._get()
+                break
+            if (first_element.get_next_run_time() - getUTCmillis()) <= 0 \
+                    or not first_element.flag_alive:
+                isNotReady = False
+                first_element = self._get()
+        return first_element
+
 
 class EventCheckerThread(Thread):
 
-    def __init__(self, name=None):
+    def __init__(self, batch_size=1, name=None):
         Thread.__init__(self, name=name)
         self.flag_alive = True
+        # Maximum number of due metrics handed to a collector at once
+        self.batch_size = batch_size
+        # Delay in ms between the run time of the last dispatched metric and
+        # its dispatch, and the largest such delay so far
+        self.lag = 0
+        self.max_lag = 0
         self.start()
 
     def run(self):
         log.info("Started EventCheckerThread")
         global event_ds
         global collect_queue
+        global collect_thread_pool
         while self.flag_alive:
             log.debug("Waiting for event...")
-            metric = event_ds.get_next_element_when_ready()
-            if isinstance(metric, SystemExit):
+            metrics = event_ds.get_ready_elements(self.batch_size)
+            if isinstance(metrics[0], SystemExit):
                 log.debug("Got exit signal")
                 break
-            log.debug("Got event:" + str(metric))
-            if not metric.flag_alive:
-                log.debug("Discarded dead metric: %s" % str(metric))
+            # Metrics of each priority class are batched separately, so
+            # they go in their own lane of collect_queue
+            batches = {}
+            now = getUTCmillis()
+            for metric in metrics:
+                if not metric.flag_alive:
+                    log.debug("Discarded dead metric: %s" % str(metric))
+                    continue
+                metric.scheduling_lag = self.lag = \
+                    max(0, now - metric.get_next_run_time())
+                self.max_lag = max(self.max_lag, self.lag)
+                if metric.ref_entity.execution_mode is \
+                        ExecutionMode.COROUTINE:
+                    _start_coroutine_collection(metric)
+                    continue
+                batches.setdefault(metric.ref_entity.priority.value,
+                                   []).append(metric)
+            if len(batches) == 0:
                 continue
-            collect_queue.put(metric)
+            for priority in sorted(batches):
+                batch = batches[priority]
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Got %d event(s): %s"
+                              % (len(batch), ", ".join(map(str, batch))))
+                collect_queue.put(batch)
+            if collect_thread_pool is not None:
+                collect_thread_pool.adjust()
         log.info("Thread exits: %s" % str(self.name))
 
 
 class SendThread(Thread):
+    """
+    Publishes metrics of one send queue.
 
-    def __init__(self, name=None):
+    After taking a metric it keeps taking queued metrics, waiting at most
+    linger_ms for more, until batch_size metrics are gathered.  Metrics of
+    the batch sharing the same msg_attr are then handed together to
+    DataCenterComponent.publish_batch(), so the DCC can combine them into
+    fewer messages.  With the defaults every metric is published on its own.
+    """
+
+    def __init__(self, send_queue, name=None, batch_size=1, linger_ms=0,
+                 pool=None):
         Thread.__init__(self, name=name)
         self.flag_alive = True
+        self._send_queue = send_queue
+        self._pool = pool
+        self._batch_size = max(1, batch_size)
+        self._linger = max(0, linger_ms) / 1000.0
         self.start()
 
     def run(self):
         log.info("Started SendThread")
-        global send_queue
+        send_queue = self._send_queue
         while self.flag_alive:
             log.debug("Waiting to send...")
             metric = send_queue.get()
             if isinstance(metric, SystemExit):
                 log.debug("Got exit signal")
                 break
-            log.debug("Got item in send_queue: " + str(metric))
+            log.debug("Got item in send_queue: %s", metric)
+            batch, exiting = self._gather(metric)
+            self._send(batch)
+            if exiting:
+                log.debug("Got exit signal")
+                break
+        log.info("Thread exits: %s" % str(self.name))
+
+    def _gather(self, metric):
+        """
+        :return: Tuple of the gathered metrics and whether an exit signal
+                 was taken from the queue while gathering
+        """
+        batch = [metric]
+        if self._batch_size == 1:
+            return batch, False
+        deadline = _time() + self._linger
+        while len(batch) < self._batch_size:
+            try:
+                remaining = deadline - _time()
+                if remaining > 0:
+                    item = self._send_queue.get(timeout=remaining)
+                else:
+                    item = self._send_queue.get_nowait()
+            except Empty:
+                break
+            if isinstance(item, SystemExit):
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _send(self, batch):
+        groups = OrderedDict()
+        # RegisteredMetrics compare by run time and priority, so metrics
+        # queued twice are told apart by identity
+        seen = set()
+        for metric in batch:
             if not metric.flag_alive:
                 log.debug("Discarded dead metric: %s" % str(metric))
                 continue
-            metric.send_data()
-        log.info("Thread exits: %s" % str(self.name))
+            if id(metric) in seen:
+                continue
+            seen.add(id(metric))
+            key = id(getattr(metric, 'msg_attr', None))
+            groups.setdefault(key, []).append(metric)
+        for group in groups.values():
+            if self._pool is not None:
+                num_samples = sum(metric.values.qsize() for metric in group)
+                start = _time()
+            if len(group) == 1:
+                group[0].send_data()
+            else:
+                log.debug("Publishing %d metrics together" % len(group))
+                group[0].ref_dcc.publish_batch(group)
+            if self._pool is not None:
+                self._pool.record_publish(group, (_time() - start) * 1000,
+                                          num_samples)
+
+
+class SendQueue(LaneQueue):
+    """
+    Queue of metrics ready to be published, with a lane per Priority.
+    """
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.DROP_OLDEST,
+                 on_drop=None):
+        LaneQueue.__init__(self, maxsize, policy, on_drop,
+                           num_lanes=len(Priority))
+
+    def _lane(self, item):
+        if is_control_item(item):
+            return 0
+        return item.ref_entity.priority.value
+
+
+class SendThreadPool:
+    """
+    Send queue and SendThreads of one DCC, so a slow or unavailable DCC only
+    backs up its own queue.
+
+    It keeps track of the publish latency and throughput of the DCC, and
+    lets metrics with an adaptive aggregation size adjust it after each
+    publish, so that latency stays within latency_slo (in ms).
+
+    If the DCC has a spool, a SpoolReplayThread sends its records back to
+    the DCC, at most replay_rate records per second.
+    """
+
+    # Weight of the latest publish in the moving average of latency
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, dcc, num_threads, batch_size=1, linger_ms=0,
+                 queue_size=0, overflow_policy=OverflowPolicy.DROP_OLDEST,
+                 latency_slo=1000, replay_rate=50, retry_interval=5):
+        self.dcc_name = type(dcc).__name__
+        self.send_queue = SendQueue(queue_size, overflow_policy,
+                                    on_drop=_on_send_dropped)
+        self.latency_slo = latency_slo
+        # Moving average of publish latency in ms
+        self.latency = None
+        self._num_samples = 0
+        self._publish_time = 0.0
+        self._stats_lock = Lock()
+        self._threads = []
+        log.info("Starting %d send threads for %s"
+                 % (num_threads, self.dcc_name))
+        for j in range(num_threads):
+            self._threads.append(SendThread(
+                self.send_queue,
+                name="%s-Sender-%d" % (self.dcc_name, j + 1),
+                batch_size=batch_size,
+                linger_ms=linger_ms,
+                pool=self
+            ))
+        self.spool = dcc.spool
+        self._replay_thread = None
+        if self.spool is not None:
+            self._replay_thread = SpoolReplayThread(
+                self.spool, dcc._try_send,
+                rate=replay_rate,
+                retry_interval=retry_interval,
+                name="%s-SpoolReplay" % self.dcc_name
+            )
+
+    def put(self, metric):
+        self.send_queue.put(metric)
+
+    def record_publish(self, metrics, latency, num_samples):
+        """
+        Called by a SendThread after publishing metrics.
+
+        :param metrics: List of RegisteredMetrics published together
+        :param latency: Time taken to publish them in ms
+        :param num_samples: Number of samples published
+        :return: None
+        """
+        with self._stats_lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.LATENCY_SMOOTHING * \
+                    (latency - self.latency)
+            self._num_samples += num_samples
+            self._publish_time += latency
+            smoothed_latency = self.latency
+        for metric in metrics:
+            metric.adapt_aggregation_size(smoothed_latency, self.latency_slo)
+
+    def get_stats(self):
+        with self._stats_lock:
+            latency = self.latency or 0.0
+            throughput = 0.0
+            if self._publish_time > 0:
+                throughput = self._num_samples * 1000 / self._publish_time
+        return [self.dcc_name,
+                self.send_queue.qsize(),
+                len(self._threads),
+                self.send_queue.num_dropped,
+                latency,
+                throughput]
+
+    def get_spool_stats(self):
+        """
+        :return: List of DCC name, pending records, size in bytes, records
+                 appended, sent, dropped and corrupted, or None if the DCC
+                 has no spool
+        """
+        spool = self.spool
+        if spool is None:
+            return None
+        return [self.dcc_name,
+                spool.qsize(),
+                spool.disk_size(),
+                spool.num_appended,
+                spool.num_sent,
+                spool.num_dropped,
+                spool.num_corrupted]
+
+    def terminate(self):
+        for tref in self._threads:
+            tref.flag_alive = False
+        for tref in self._threads:
+            self.send_queue.put(SystemExit())
+        if self._replay_thread is not None:
+            self._replay_thread.stop()
+            self.spool.flush()
+
+    def join(self, timeout):
+        """
+        Waits for the threads of the pool to exit after terminate().
+
+        :param timeout: Time in seconds to wait for all of them
+        :return: True if all threads exited
+        """
+        threads = list(self._threads)
+        if self._replay_thread is not None:
+            threads.append(self._replay_thread)
+        deadline = _time() + timeout
+        for tref in threads:
+            tref.join(max(0, deadline - _time()))
+        return not any(tref.is_alive() for tref in threads)
+
+
+def get_send_pool(dcc):
+    """
+    Returns the SendThreadPool of a DCC, creating it on first use.  The
+    number of send threads is taken from the send_thread_pool_size attribute
+    of the DCC if set, else from CORE_CFG option send_thread_pool_size.
+    Coalescing of metrics is set by CORE_CFG options send_batch_size and
+    send_linger_ms, capacity of the send queue by send_queue_size and
+    send_queue_overflow_policy.  The latency SLO for adaptive aggregation
+    is taken from the publish_latency_slo_ms attribute of the DCC if set,
+    else from CORE_CFG option publish_latency_slo_ms.  Replay of the spool
+    of the DCC is set by CORE_CFG options spool_replay_rate and
+    spool_retry_interval.
+
+    :param dcc: DataCenterComponent
+    :return: SendThreadPool
+    """
+    with send_pools_lock:
+        send_pool = send_pools.get(id(dcc))
+        if send_pool is None:
+            num_threads = getattr(dcc, 'send_thread_pool_size', None)
+            if num_threads is None:
+                num_threads = _read_core_config('send_thread_pool_size', 1)
+            latency_slo = getattr(dcc, 'publish_latency_slo_ms', None)
+            if latency_slo is None:
+                latency_slo = _read_core_config('publish_latency_slo_ms',
+                                                1000, float)
+            if getattr(dcc, 'spool', None) is None:
+                dcc.spool = _create_spool(dcc)
+            send_pool = send_pools[id(dcc)] = SendThreadPool(
+                dcc, num_threads,
+                batch_size=_read_core_config('send_batch_size', 1),
+                linger_ms=_read_core_config('send_linger_ms', 0),
+                queue_size=_read_core_config('send_queue_size', 0),
+                overflow_policy=_read_core_config(
+                    'send_queue_overflow_policy', OverflowPolicy.DROP_OLDEST,
+                    parse_overflow_policy),
+                latency_slo=latency_slo,
+                replay_rate=_read_core_config('spool_replay_rate', 50, float),
+                retry_interval=_read_core_config('spool_retry_interval', 5,
+                                                 float)
+            )
+        return send_pool
+
+
+def _create_spool(dcc):
+    """
+    Opens the spool of a DCC in a directory under CORE_CFG option spool_dir,
+    named after the spool_name attribute of the DCC if set, else after its
+    class.  A spool directory is locked while open, so DCCs of the same
+    class without a spool_name get numbered directories (Mqtt, Mqtt.1,
+    Mqtt.2, ...) in the order they start publishing.  Size of segment files
+    and maximum size of the spool are set by CORE_CFG options
+    spool_segment_size and spool_max_size.
+
+    :param dcc: DataCenterComponent
+    :return: Spool, or None if spool_dir is not configured or no spool
+             could be opened
+    """
+    spool_dir = _read_core_config('spool_dir', None, str)
+    if not spool_dir:
+        return None
+    name = getattr(dcc, 'spool_name', None)
+    if name:
+        names = [name]
+    else:
+        class_name = type(dcc).__name__
+        names = chain([class_name],
+                      ("%s.%d" % (class_name, i) for i in count(1)))
+    for name in names:
+        path = os.path.join(spool_dir, name)
+        try:
+            return Spool(
+                path,
+                segment_size=_read_core_config('spool_segment_size', 1048576),
+                max_size=_read_core_config('spool_max_size', 67108864)
+            )
+        except SpoolInUseError:
+            log.debug("Spool %s is used by another DCC" % path)
+        except Exception:
+            log.exception("Failed to open spool %s, messages which fail to "
+                          "send are discarded" % path)
+            return None
+    log.error("Spool %s is used by another DCC, messages which fail to "
+              "send are discarded" % path)
+    return None
+
+
+def release_send_pool(dcc, timeout=5):
+    """
+    Stops the send threads and spool replay of a DCC and closes its spool,
+    e.g. when the package of the DCC is unloaded, so that the DCC is not
+    kept alive by its SendThreadPool and a DCC loaded again reopens the
+    same spool directory.  Metrics still queued are not sent.
+
+    :param dcc: DataCenterComponent
+    :param timeout: Time in seconds to wait for the threads to exit
+    :return: True if the DCC had a SendThreadPool
+    """
+    with send_pools_lock:
+        send_pool = send_pools.pop(id(dcc), None)
+    if send_pool is None:
+        return False
+    log.info("Stopping send threads for %s" % send_pool.dcc_name)
+    send_pool.terminate()
+    if not send_pool.join(timeout):
+        log.warning("Send threads for %s did not exit in %s seconds"
+                    % (send_pool.dcc_name, timeout))
+    if send_pool.spool is not None:
+        send_pool.spool.close()
+        dcc.spool = None
+    return True
+
+
+def get_send_pools():
+    """
+    :return: List of SendThreadPools
+    """
+    with send_pools_lock:
+        return send_pools.values()
+
+
+def _on_send_dropped(metric):
+    """
+    A metric dropped from a full send queue keeps its values, they are
+    published with the next send of the metric.
+    """
+    log.warning("Send queue full, dropped send of %s" % str(metric))
+    metric.dropped_sends += 1
+
+
+def _on_collection_dropped(batch):
+    """
+    Metrics of a batch dropped from a full collect_queue skip this
+    collection and are scheduled for the next one.
+    """
+    global event_ds
+    log.warning("Collect queue full, dropped collection of %s"
+                % ", ".join(map(str, batch)))
+    for metric in batch:
+        if not metric.flag_alive:
+            continue
+        metric.dropped_collections += 1
+        metric.set_next_run_time()
+        event_ds.put_and_notify(metric)
+
+
+def get_scheduling_phase(metric):
+    """
+    :param metric: Metric
+    :return: SchedulingPhase of the Metric if set, else CORE_CFG option
+             scheduling_phase
+    """
+    phase = getattr(metric, 'scheduling_phase', None)
+    if phase is None:
+        phase = _read_core_config('scheduling_phase', SchedulingPhase.NONE,
+                                  parse_scheduling_phase)
+    return phase
+
+
+def get_missed_deadline_policy(metric):
+    """
+    Returns how a Metric is rescheduled after missed run times: its own
+    missed_deadline_policy and max_catch_up if set, else CORE_CFG options
+    missed_deadline_policy and max_catch_up.
+
+    :param metric: Metric
+    :return: Tuple of MissedDeadlinePolicy and maximum number of missed
+             collections to catch up (None for all)
+    """
+    policy = getattr(metric, 'missed_deadline_policy', None)
+    if policy is None:
+        policy = _read_core_config(
+            'missed_deadline_policy', MissedDeadlinePolicy.CATCH_UP,
+            parse_missed_deadline_policy)
+    max_catch_up = getattr(metric, 'max_catch_up', None)
+    if max_catch_up is None:
+        max_catch_up = _read_core_config('max_catch_up', None)
+    return policy, max_catch_up
+
+
+def create_value_buffer(reg_metric):
+    """
+    Creates the queue holding values collected by a RegisteredMetric until
+    they are published.  Its capacity and overflow policy are those of the
+    Metric if set, else CORE_CFG options metric_buffer_size and
+    metric_overflow_policy.
+
+    With OverflowPolicy.BLOCK, the buffer must hold as many values as are
+    sent together, otherwise the collector would wait for a send that never
+    comes.
+
+    :param reg_metric: RegisteredMetric
+    :return: SampleBuffer
+    :raises ValueError: If a blocking buffer is smaller than the
+                        aggregation size of the metric
+    """
+    metric = reg_metric.ref_entity
+    buffer_size = getattr(metric, 'buffer_size', None)
+    if buffer_size is None:
+        buffer_size = _read_core_config('metric_buffer_size', 0)
+    overflow_policy = getattr(metric, 'overflow_policy', None)
+    if overflow_policy is None:
+        overflow_policy = _read_core_config(
+            'metric_overflow_policy', OverflowPolicy.DROP_OLDEST,
+            parse_overflow_policy)
+    aggregation_size = max(metric.aggregation_size,
+                           getattr(metric, 'max_aggregation_size', None) or 0)
+    if overflow_policy is OverflowPolicy.BLOCK \
+            and 0 < buffer_size < aggregation_size:
+        log.error("Buffer size %d of %s is smaller than its aggregation size "
+                  "%d" % (buffer_size, metric.name, aggregation_size))
+        raise ValueError("Buffer size is smaller than aggregation size with "
+                         "OverflowPolicy.BLOCK")
+    return SampleBuffer(buffer_size, overflow_policy,
+                        on_drop=reg_metric.record_value_drop)
+
+
+class CollectQueue(LaneQueue):
+    """
+    Queue of metric batches waiting for a collector, with a FIFO lane per
+    Priority.  A batch goes in the lane of its most important metric.
+
+    It remembers when each batch was queued, so CollectionThreadPool can
+    tell how long the oldest batch has been waiting.
+    """
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.BLOCK, on_drop=None):
+        LaneQueue.__init__(self, maxsize, policy, on_drop,
+                           num_lanes=len(Priority))
+
+    def _item(self, entry):
+        return entry[1]
+
+    def _lane(self, item):
+        if is_control_item(item):
+            return 0
+        return min(metric.ref_entity.priority.value for metric in item)
+
+    def _put(self, item):
+        self.lanes[self._lane(item)].append((getUTCmillis(), item))
+
+    def _get(self):
+        return LaneQueue._get(self)[1]
+
+    def get_oldest_wait(self):
+        """
+        :return: Waiting time of the oldest batch in milliseconds, or 0.
+        """
+        self.mutex.acquire()
+        try:
+            if not self._qsize():
+                return 0
+            return getUTCmillis() - min(lane[0][0] for lane in self.lanes
+                                        if lane)
+        finally:
+            self.mutex.release()
 
 
 class CollectionThread(Thread):
 
-    def __init__(self, worker_stat_lock, name=None):
+    def __init__(self, worker_stat_lock, name=None, pool=None):
         Thread.__init__(self, name=name)
         self.daemon = True
         self.working_obj = None
+        self.working_since = None
+        self.last_active = getUTCmillis()
+        # Set by the watchdog when this worker has been replaced
+        self.abandoned = False
+        # Metrics of the current batch not collected yet
+        self.pending = deque()
         self._worker_stat_lock = worker_stat_lock
+        self._pool = pool
         self.start()
 
     def run(self):
-        global event_ds
         global collect_queue
-        global send_queue
-        while True:
-            metric = collect_queue.get()
-            log.debug("Collecting stats for metric: " + str(metric))
-            try:
-                if not metric.flag_alive:
-                    log.debug("Discarded dead metric: %s" % str(metric))
-                    continue
-                with self._worker_stat_lock:
-                    self.working_obj = metric
-                metric.collect()
+        while not self.abandoned:
+            # Items in collect_queue are batches (lists) of due metrics,
+            # or None when the pool asks one worker to retire
+            batch = collect_queue.get()
+            if batch is None:
+                if self._pool is not None:
+                    self._pool.retire(self)
+                break
+            with self._worker_stat_lock:
+                self.pending.extend(batch)
+            while True:
                 with self._worker_stat_lock:
-                    self.working_obj = None
-                if not metric.flag_alive:
-                    log.debug("Discarded dead metric: %s" % str(metric))
-                    continue
-                metric.set_next_run_time()
-                event_ds.put_and_notify(metric)
-                if metric.is_ready_to_send():
-                    send_queue.put(metric)
-                    metric.reset_aggregation_size()
-            except Exception as e:
-                log.error("Error collecting data for metric" + str(metric))
-                raise e
+                    if self.abandoned or not self.pending:
+                        break
+                    metric = self.pending.popleft()
+                self._collect(metric)
+            self.last_active = getUTCmillis()
+        log.info("Thread exits: %s" % str(self.name))
+
+    def _collect(self, metric):
+        log.debug("Collecting stats for metric: %s", metric)
+        if not metric.flag_alive:
+            log.debug("Discarded dead metric: %s" % str(metric))
+            return
+        with self._worker_stat_lock:
+            self.working_obj = metric
+            self.working_since = getUTCmillis()
+        try:
+            metric.collect()
+        except Exception as e:
+            # A failing sampling function must neither end this worker nor
+            # the collection of the other metrics of its batch
+            log.error("Error collecting data for metric %s: %s"
+                      % (str(metric), e))
+        finally:
+            with self._worker_stat_lock:
+                self.working_obj = None
+                elapsed = getUTCmillis() - self.working_since
+        timeout = metric.ref_entity.sampling_timeout
+        if timeout is not None and elapsed > timeout * 1000:
+            metric.record_overrun()
+        try:
+            _schedule_next_collection(metric)
+        except Exception as e:
+            log.error("Error rescheduling metric %s: %s" % (str(metric), e))
+
+
+def _schedule_next_collection(metric):
+    """
+    Puts a collected metric back in event_ds, and in the send queue of its
+    DCC if enough values have been aggregated.
+
+    :param metric: RegisteredMetric
+    :return: None
+    """
+    global event_ds
+    if not metric.flag_alive:
+        log.debug("Discarded dead metric: %s" % str(metric))
+        return
+    metric.set_next_run_time()
+    event_ds.put_and_notify(metric)
+    if metric.is_ready_to_send():
+        get_send_pool(metric.ref_dcc).put(metric)
+        metric.reset_aggregation_size()
+
+
+def _start_coroutine_collection(metric):
+    """
+    Submits the coroutine of a metric in ExecutionMode.COROUTINE to
+    coroutine_collector, which is started on first use.
+
+    :param metric: RegisteredMetric
+    :return: None
+    """
+    global coroutine_collector
+    if coroutine_collector is None:
+        coroutine_collector = CoroutineCollector(name="CoroutineCollector")
+
+    def on_done(collected_data, exc_info):
+        if exc_info is not None:
+            log.error("Error collecting data for metric %s: %s"
+                      % (str(metric), exc_info[1]))
+            if exc_info[0] is Timeout:
+                metric.record_overrun()
+        elif metric.flag_alive:
+            metric.store_collected_data(collected_data)
+        _schedule_next_collection(metric)
+
+    try:
+        coroutine = metric.start_coroutine()
+    except Exception as e:
+        log.error("Error collecting data for metric %s: %s"
+                  % (str(metric), e))
+        _schedule_next_collection(metric)
+        return
+    coroutine_collector.submit(coroutine, on_done,
+                               metric.ref_entity.sampling_timeout)
+
+
+def register_metric(metric):
+    """
+    Keeps track of a metric that starts collecting, for statistics.
+
+    :param metric: RegisteredMetric
+    :return: None
+    """
+    with metrics_lock:
+        metrics[id(metric)] = metric
+
+
+def deregister_metric(metric):
+    """
+    :param metric: RegisteredMetric that stops collecting
+    :return: None
+    """
+    with metrics_lock:
+        metrics.pop(id(metric), None)
+
+
+def get_metrics():
+    """
+    :return: List of RegisteredMetrics collecting data
+    """
+    with metrics_lock:
+        return metrics.values()
 
 
 class CollectionThreadPool:
+    """
+    Pool of CollectionThreads that grows and shrinks with load.
+
+    adjust() is called whenever metrics are dispatched to collect_queue.
+    A worker is added (up to max_threads) if more than depth_threshold
+    batches are queued, or if the oldest batch has been waiting longer than
+    wait_threshold_ms.  If no batch is queued and a worker has been idle
+    for longer than idle_timeout seconds, one worker is retired (down to
+    min_threads).
+    """
 
-    def __init__(self, num_threads):
+    def __init__(self, num_threads, min_threads=None, max_threads=None,
+                 depth_threshold=0, wait_threshold_ms=1000,
+                 idle_timeout=60):
+        if min_threads is None:
+            min_threads = num_threads
+        if max_threads is None:
+            max_threads = num_threads
+        if not 0 < min_threads <= num_threads <= max_threads:
+            raise ValueError("0 < min_threads <= num_threads <= max_threads "
+                             "is expected")
         self._num_threads = num_threads
+        self._min_threads = min_threads
+        self._max_threads = max_threads
+        self._depth_threshold = depth_threshold
+        self._wait_threshold_ms = wait_threshold_ms
+        self._idle_timeout_ms = idle_timeout * 1000
         self._pool = []
         self._worker_stat_lock = Lock()
+        # Number of retirement requests not yet picked by a worker
+        self._retiring = 0
+        self._num_created = 0
+        self._num_grown = 0
+        self._num_shrunk = 0
+        self._num_replaced = 0
+        self._last_scaling = "n/a"
 
         log.info("Starting " + str(num_threads) + " for collection")
-        for j in range(num_threads):
-            self._pool.append(CollectionThread(
-                self._worker_stat_lock,
-                name="Collector-%d" % (j + 1)
-            ))
+        with self._worker_stat_lock:
+            for j in range(num_threads):
+                self._add_worker()
+
+    def _add_worker(self):
+        # Caller must hold _worker_stat_lock
+        self._num_created += 1
+        self._pool.append(CollectionThread(
+            self._worker_stat_lock,
+            name="Collector-%d" % self._num_created,
+            pool=self
+        ))
+
+    def adjust(self):
+        """
+        Grows or shrinks the pool according to the state of collect_queue.
+
+        :return: None
+        """
+        global collect_queue
+        depth = collect_queue.qsize()
+        wait = collect_queue.get_oldest_wait()
+        now = getUTCmillis()
+        with self._worker_stat_lock:
+            size = len(self._pool) - self._retiring
+            if (depth > self._depth_threshold
+                    or wait > self._wait_threshold_ms) \
+                    and size < self._max_threads:
+                self._add_worker()
+                self._num_grown += 1
+                self._last_scaling = "up to %d (queue depth: %d, " \
+                    "oldest wait: %d ms)" % (size + 1, depth, wait)
+                log.info("Collection thread pool scaled %s"
+                         % self._last_scaling)
+                return
+            if depth > 0 or self._retiring > 0 \
+                    or size <= self._min_threads:
+                return
+            idle_times = [now - tref.last_active for tref in self._pool
+                          if tref.working_obj is None]
+            if not idle_times or max(idle_times) <= self._idle_timeout_ms:
+                return
+            idle = max(idle_times)
+            self._retiring += 1
+            self._last_scaling = "down to %d (idle for: %d ms)" \
+                % (size - 1, idle)
+        log.info("Collection thread pool scaled %s" % self._last_scaling)
+        collect_queue.put(None)
+
+    def replace_overrunning(self):
+        """
+        Replaces workers whose current collection exceeded the
+        sampling_timeout of its metric.  The overrunning worker exits once
+        its collection returns; metrics left in its batch are put back in
+        collect_queue.
+
+        :return: None
+        """
+        global collect_queue
+        now = getUTCmillis()
+        requeue = []
+        with self._worker_stat_lock:
+            for tref in list(self._pool):
+                metric = tref.working_obj
+                if metric is None:
+                    continue
+                timeout = metric.ref_entity.sampling_timeout
+                if timeout is None \
+                        or now - tref.working_since <= timeout * 1000:
+                    continue
+                log.error("Collection of %s exceeded %s s, replacing %s"
+                          % (str(metric), timeout, tref.name))
+                metric.record_overrun()
+                tref.abandoned = True
+                self._pool.remove(tref)
+                requeue.extend(tref.pending)
+                tref.pending.clear()
+                self._num_replaced += 1
+                self._add_worker()
+        if requeue:
+            try:
+                collect_queue.put(requeue, block=False)
+            except Full:
+                _on_collection_dropped(requeue)
+
+    def retire(self, worker):
+        """
+        Called by a worker that picked a retirement request, right before it
+        exits.
+
+        :param worker: CollectionThread
+        :return: None
+        """
+        with self._worker_stat_lock:
+            self._retiring -= 1
+            self._num_shrunk += 1
+            self._pool.remove(worker)
 
     def get_num_threads(self):
-        return self._num_threads
+        with self._worker_stat_lock:
+            return len(self._pool) - self._retiring
 
     def get_stats_working(self):
         num_working = 0
@@ -245,11 +1163,145 @@ class CollectionThreadPool:
         return [num_working,
                 num_alive,
                 num_all,
-                self._num_threads]
+                self._max_threads]
+
+    def get_stats_scaling(self):
+        with self._worker_stat_lock:
+            return [self._min_threads,
+                    self._num_grown,
+                    self._num_shrunk,
+                    self._num_replaced,
+                    self._last_scaling]
+
+
+class CollectionWatchdog(Thread):
+    """
+    Periodically looks for collections exceeding their sampling_timeout.
+    """
+
+    def __init__(self, interval=1, name=None):
+        Thread.__init__(self, name=name)
+        self.daemon = True
+        self.flag_alive = True
+        self.interval = interval
+        self.start()
+
+    def run(self):
+        log.info("Started CollectionWatchdog")
+        global collect_thread_pool
+        while self.flag_alive:
+            sleep(self.interval)
+            if collect_thread_pool is not None:
+                collect_thread_pool.replace_overrunning()
+        log.info("Thread exits: %s" % str(self.name))
+
+def get_process_pool():
+    """
+    Returns the pool of worker processes used by metrics in
+    ExecutionMode.PROCESS.  Its size comes from CORE_CFG option
+    collect_process_pool_size (number of CPUs by default).
+
+    On Python 2 the workers are forked, and a forked process only gets the
+    thread that forked it: a lock held by another thread at that time, such
+    as the lock of a logging handler, stays locked in the worker for good.
+    initialize() therefore creates the pool before it starts any thread.
+    Afterwards the pool is only created here if it was recycled, see
+    recycle_process_pool().
+
+    :return: multiprocessing.Pool
+    """
+    global process_pool
+    with process_pool_lock:
+        if process_pool is None:
+            size = _read_core_config('collect_process_pool_size',
+                                     multiprocessing.cpu_count())
+            log.info("Starting %d processes for collection" % size)
+            process_pool = multiprocessing.Pool(size)
+        return process_pool
+
+
+def recycle_process_pool(pool):
+    """
+    Terminates a process pool in which a sampling function overran its
+    sampling_timeout, so that the hung worker does not hold a slot of the
+    pool forever.  The next collection in ExecutionMode.PROCESS starts a new
+    pool.  Collections still running in the terminated pool fail, see
+    get_process_result().
+
+    The new pool is forked while collection and send threads are running,
+    so a sampling function which takes a lock held by one of them at that
+    time (e.g. by logging) deadlocks in the worker, until sampling_timeout
+    recycles the pool again.  Sampling functions that may time out should
+    not log.
+
+    :param pool: multiprocessing.Pool returned by get_process_pool()
+    :return: None
+    """
+    global process_pool
+    with process_pool_lock:
+        if process_pool is not pool:
+            # Already recycled by another collection
+            return
+        process_pool = None
+    log.warning("Terminating process pool to recycle a hung worker")
+    pool.terminate()
+
+
+def get_process_result(pool, result, timeout):
+    """
+    Waits for the result of a sampling function run in a process pool.
+    Waiting is interrupted when the pool is recycled, as results of a
+    terminated pool never arrive.
+
+    :param pool: multiprocessing.Pool running the sampling function
+    :param result: multiprocessing AsyncResult of the sampling function
+    :param timeout: sampling_timeout in seconds, None to wait without limit
+    :return: Value returned by the sampling function
+    :raises multiprocessing.TimeoutError: If timeout expired
+    :raises RuntimeError: If the pool was recycled
+    """
+    deadline = None if timeout is None else _time() + timeout
+    while True:
+        wait = process_poll_interval
+        if deadline is not None:
+            wait = min(wait, deadline - _time())
+            if wait <= 0:
+                raise multiprocessing.TimeoutError()
+        try:
+            return result.get(wait)
+        except multiprocessing.TimeoutError:
+            if process_pool is not pool:
+                raise RuntimeError("Process pool was recycled")
 
 is_initialization_done = False
 
 
+def _read_core_config(name, default, cast=int):
+    """
+    Reads an option of CORE_CFG section in liota.conf.  The section is read
+    once, on first use, as options are looked up whenever a metric is
+    registered.
+
+    :param name: Option name
+    :param default: Value used if the option is not configured
+    :param cast: Type of the option
+    :return: Option value
+    """
+    global core_config
+    with core_config_lock:
+        if core_config is None:
+            core_config = read_liota_config_section('CORE_CFG')
+        value = core_config.get(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except Exception:
+        log.warning("Invalid value of %s: %s, using default: %s"
+                    % (name, value, default))
+        return default
+
+
 def initialize():
     global is_initialization_done
     if is_initialization_done:
@@ -257,25 +1309,45 @@ def initialize():
         pass
     else:
         log.debug("Initializing.............")
+        # Fork worker processes before any thread of this module starts
+        get_process_pool()
         global event_ds
         if event_ds is None:
             event_ds = EventsPriorityQueue()
         global event_checker_thread
         if event_checker_thread is None:
             event_checker_thread = EventCheckerThread(
+                batch_size=_read_core_config('collect_batch_size', 1),
                 name="EventCheckerThread")
         global collect_queue
         if collect_queue is None:
-            collect_queue = Queue()
-        global send_queue
-        if send_queue is None:
-            send_queue = Queue()
-        global send_thread
-        if send_thread is None:
-            send_thread = SendThread(name="SendThread")
+            collect_queue = CollectQueue(
+                _read_core_config('collect_queue_size', 0),
+                _read_core_config('collect_queue_overflow_policy',
+                                  OverflowPolicy.BLOCK,
+                                  parse_overflow_policy),
+                on_drop=_on_collection_dropped)
         global collect_thread_pool
-        collect_thread_pool_size = int(read_liota_config('CORE_CFG','collect_thread_pool_size')) 
-        collect_thread_pool = CollectionThreadPool(collect_thread_pool_size)
+        collect_thread_pool_size = _read_core_config(
+            'collect_thread_pool_size', 30)
+        collect_thread_pool = CollectionThreadPool(
+            collect_thread_pool_size,
+            min_threads=_read_core_config(
+                'collect_thread_pool_min_size', collect_thread_pool_size),
+            max_threads=_read_core_config(
+                'collect_thread_pool_max_size', collect_thread_pool_size),
+            depth_threshold=_read_core_config(
+                'collect_queue_depth_threshold', 0),
+            wait_threshold_ms=_read_core_config(
+                'collect_queue_wait_threshold_ms', 1000),
+            idle_timeout=_read_core_config(
+                'collect_thread_idle_timeout', 60)
+        )
+        global collection_watchdog
+        if collection_watchdog is None:
+            collection_watchdog = CollectionWatchdog(
+                interval=_read_core_config('watchdog_interval', 1, float),
+                name="CollectionWatchdog")
         is_initialization_done = True
 
 
@@ -283,12 +1355,16 @@ def terminate():
     global event_checker_thread
     if event_checker_thread:
         event_checker_thread.flag_alive = False
-    global send_thread
-    if send_thread:
-        send_thread.flag_alive = False
+    global collection_watchdog
+    if collection_watchdog:
+        collection_watchdog.flag_alive = False
     global event_ds
     if event_ds:
         event_ds.put_and_notify(SystemExit(), timeout=0)
-    global send_queue
-    if send_queue:
-        send_queue.put(SystemExit())
+    for send_pool in get_send_pools():
+        send_pool.terminate()
+    global process_pool
+    with process_pool_lock:
+        if process_pool is not None:
+            process_pool.terminate()
+            process_pool = None
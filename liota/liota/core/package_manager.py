@@ -309,42 +309,134 @@ class PackageThread(Thread):
     def _cmd_handler_stat(self, parameter):
         if parameter == "metrics" or parameter == "met":
             from liota.core.metric_handler \
-                import event_ds, collect_queue, send_queue, \
-                CollectionThreadPool, collect_thread_pool
+                import event_ds, collect_queue, get_send_pools, \
+                CollectionThreadPool, collect_thread_pool, \
+                CoroutineCollector, coroutine_collector, \
+                EventCheckerThread, event_checker_thread
 
-            stats = ["n/a", "n/a", "n/a", "n/a"]
+            stats = ["n/a"] * 7
             if isinstance(event_ds, Queue):
                 stats[0] = str(event_ds.qsize())
-            if isinstance(send_queue, Queue):
-                stats[1] = str(send_queue.qsize())
+            stats[1] = str(sum(send_pool.send_queue.qsize()
+                               for send_pool in get_send_pools()))
             if isinstance(collect_queue, Queue):
                 stats[2] = str(collect_queue.qsize())
             if isinstance(collect_thread_pool, CollectionThreadPool):
                 stats[3] = collect_thread_pool.get_stats_working()[0]
+            if isinstance(coroutine_collector, CoroutineCollector):
+                stats[4] = coroutine_collector.get_num_tasks()
+            if isinstance(event_checker_thread, EventCheckerThread):
+                stats[5] = event_checker_thread.lag
+                stats[6] = event_checker_thread.max_lag
             log.warning(("Number of metrics in - \n\t"
                          + "Waiting queue: %s\n\t"
                          + "Sending queue: %s\n\t"
-                         + "Collecting queue: %s\n\t"
-                         + "Collecting threads: %s"
+                         + "Collecting queue (batches): %s\n\t"
+                         + "Collecting threads: %s\n\t"
+                         + "Collecting coroutines: %s\n\t"
+                         + "Scheduler lag: %s ms (max: %s ms)"
                          ) % tuple(stats))
             return
         if parameter == "collection_threads" or parameter == "col":
             from liota.core.metric_handler \
                 import CollectionThreadPool, collect_thread_pool
 
-            stats = ["n/a", "n/a", "n/a", "n/a"]
+            stats = ["n/a"] * 9
             if isinstance(collect_thread_pool, CollectionThreadPool):
                 stats = map(
                     lambda n: str(n),
                     collect_thread_pool.get_stats_working()
+                    + collect_thread_pool.get_stats_scaling()
                 )
             log.warning(("Status of collection threads - \n\t"
                          + "Collecting: %s\n\t"
                          + "Alive: %s\n\t"
                          + "Pool: %s\n\t"
-                         + "Capacity: %s"
+                         + "Capacity: %s\n\t"
+                         + "Minimum: %s\n\t"
+                         + "Scaled up: %s times\n\t"
+                         + "Scaled down: %s times\n\t"
+                         + "Replaced after overrun: %s times\n\t"
+                         + "Last scaling: %s"
                          ) % tuple(stats))
             return
+        if parameter == "send" or parameter == "snd":
+            from liota.core.metric_handler import get_send_pools
+
+            log.warning("Status of send queues - \n\t%s"
+                        % "\n\t".join(sorted(
+                            "%s: %d queued, %d threads, %d dropped, "
+                            "latency %.1f ms, %.1f samples/s"
+                            % tuple(send_pool.get_stats())
+                            for send_pool in get_send_pools()
+                        ))
+                        )
+            return
+        if parameter == "spool" or parameter == "sp":
+            from liota.core.metric_handler import get_send_pools
+
+            lines = ["%s: %d pending, %d bytes, %d spooled, %d replayed, "
+                     "%d dropped, %d corrupted" % tuple(stats)
+                     for stats in (send_pool.get_spool_stats()
+                                   for send_pool in get_send_pools())
+                     if stats is not None]
+            log.warning("Status of spools - \n\t%s"
+                        % "\n\t".join(sorted(lines)))
+            return
+        if parameter == "timeouts" or parameter == "to":
+            from liota.core.metric_handler import get_metrics
+
+            lines = ["%s: overruns %d, deadline misses %d, "
+                     "missed intervals %d, lag %d ms"
+                     % (metric.ref_entity.name, metric.overrun_count,
+                        metric.deadline_miss_count, metric.missed_intervals,
+                        metric.scheduling_lag)
+                     for metric in get_metrics()
+                     if metric.overrun_count or metric.deadline_miss_count
+                     or metric.missed_intervals]
+            log.warning("Metrics with overruns or deadline misses - \n\t%s"
+                        % "\n\t".join(sorted(lines)))
+            return
+        if parameter == "aggregation" or parameter == "agg":
+            from liota.core.metric_handler import get_metrics
+
+            lines = ["%s: %d (min %d, max %d)"
+                     % (metric.ref_entity.name,
+                        metric.effective_aggregation_size,
+                        metric.ref_entity.min_aggregation_size,
+                        metric.ref_entity.max_aggregation_size)
+                     for metric in get_metrics()
+                     if metric.ref_entity.max_aggregation_size is not None]
+            log.warning("Adaptive aggregation sizes - \n\t%s"
+                        % "\n\t".join(sorted(lines)))
+            return
+        if parameter == "drops" or parameter == "dr":
+            from liota.core.metric_handler import get_metrics, collect_queue
+
+            lines = ["%s: values %d, collections %d, sends %d"
+                     % (metric.ref_entity.name, metric.dropped_values,
+                        metric.dropped_collections, metric.dropped_sends)
+                     for metric in get_metrics()
+                     if metric.dropped_values or metric.dropped_collections
+                     or metric.dropped_sends]
+            log.warning(("Dropped by collecting queue: %s\n"
+                         + "Metrics with dropped items - \n\t%s")
+                        % (getattr(collect_queue, "num_dropped", "n/a"),
+                           "\n\t".join(sorted(lines))))
+            return
+        if parameter == "filters" or parameter == "fl":
+            from liota.core.metric_handler import get_metrics
+
+            lines = ["%s: step %d %s, %d passed, %d rejected, %.1f ms"
+                     % (metric.ref_entity.name, stats.step, stats.name,
+                        stats.passed, stats.rejected, stats.time_ms)
+                     for metric in get_metrics()
+                     if metric.ref_entity.filter_pipeline is not None
+                     for stats in
+                     metric.ref_entity.filter_pipeline.get_stats()]
+            log.warning("Stages of filter pipelines - \n\t%s"
+                        % "\n\t".join(sorted(lines)))
+            return
         if parameter == "threads" or parameter == "th":
             import threading
 
@@ -648,8 +740,10 @@ class PackageThread(Thread):
 
         # Deregister resources
         # Unload should proceed no matter deregistration succeeds or not
+        resources = []
         if file_name in self._resource_registry._packages:
             for identifier in self._resource_registry._packages[file_name]:
+                resources.append(self._resource_registry.get(identifier))
                 self._resource_registry.deregister(identifier)
             del self._resource_registry._packages[file_name]
             log.debug("Deregistered resource refs for package: %s"
@@ -664,6 +758,13 @@ class PackageThread(Thread):
         except Exception as er:
             log.error("Exception in clean-up: %s" % er)
 
+        # Stop send threads of DCCs, releasing their spools
+        from liota.core.metric_handler import release_send_pool
+        from liota.dccs.dcc import DataCenterComponent
+        for resource in resources:
+            if isinstance(resource, DataCenterComponent):
+                release_send_pool(resource)
+
         # Remove dependent item from dependencies
         log.debug("Package %s depends on: %s"
                   % (file_name, " ".join(package_record.get_dependencies())))
@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from array import array
+from Queue import Empty, Full
+from threading import Condition, Lock
+from time import time as _time
+import sys
+
+from liota.core.bounded_queue import OverflowPolicy
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Python 2 has no 'q' typecode; 'l' is a 64 bit integer on LP64 platforms
+try:
+    _INT_TYPECODE = array('q').typecode
+except ValueError:
+    _INT_TYPECODE = 'l'
+
+# Types stored in typed arrays, other types (bool included) are kept in
+# lists.  Timestamps of liota are longs; they are stored as 64 bit integers
+# as long as they fit.
+_TYPECODES = {
+    int: _INT_TYPECODE,
+    long: _INT_TYPECODE,
+    float: 'd'
+}
+
+# Capacity of a buffer when its first sample is added; storage is only
+# allocated then
+_INITIAL_CAPACITY = 16
+
+
+def split_array_batch(data):
+    """
+    Recognises a batch of samples returned by a sampling function as NumPy
+    arrays: a (timestamps, values) pair of 1-D arrays, or a structured
+    array whose first two fields are timestamps and values.
+
+    :param data: Data returned by a sampling function
+    :return: Tuple of timestamps and values arrays, or None if data is not
+             such a batch (or NumPy is not installed)
+    """
+    if numpy is None:
+        return None
+    if isinstance(data, numpy.ndarray):
+        names = data.dtype.names
+        if names is None or len(names) < 2 or data.ndim != 1:
+            return None
+        timestamps, values = data[names[0]], data[names[1]]
+    elif isinstance(data, tuple) and len(data) == 2 \
+            and isinstance(data[0], numpy.ndarray) \
+            and isinstance(data[1], numpy.ndarray) \
+            and data[0].ndim == 1:
+        timestamps, values = data
+    else:
+        return None
+    if len(timestamps) != len(values):
+        raise ValueError("Timestamps and values differ in length: %d, %d"
+                         % (len(timestamps), len(values)))
+    return timestamps, values
+
+
+def _array_typecode(items):
+    """
+    :param items: NumPy array
+    :return: Typecode of the typed array that can hold items, or None if
+             they are kept in a list
+    """
+    kind = items.dtype.kind
+    if kind == 'f':
+        return 'd'
+    if kind in 'iu' and items.dtype != numpy.uint64 \
+            and array(_INT_TYPECODE).itemsize == 8:
+        return _INT_TYPECODE
+    return None
+
+
+class _Column(object):
+    """
+    Ring storage of one field of the samples: a typed array while all
+    samples have the same int or float type, a list otherwise.
+    """
+    __slots__ = ('data', 'typecode')
+
+    def __init__(self, capacity):
+        self.typecode = None
+        self.data = [None] * capacity
+
+    def reset(self, value, capacity):
+        """
+        Chooses the storage for samples of the type of value.  Called when
+        the buffer is empty.
+        """
+        self.allocate(_TYPECODES.get(type(value)), capacity)
+
+    def allocate(self, typecode, capacity):
+        """
+        Sets up a storage for typecode, None for a list.  Called when the
+        buffer is empty.
+        """
+        if typecode != self.typecode or len(self.data) != capacity:
+            self.typecode = typecode
+            if typecode is None:
+                self.data = [None] * capacity
+            else:
+                self.data = array(typecode, [0]) * capacity
+
+    def set(self, i, value):
+        if self.typecode is not None:
+            if _TYPECODES.get(type(value)) == self.typecode:
+                try:
+                    self.data[i] = value
+                    return
+                except OverflowError:
+                    pass
+            # Mixed types or integer out of range, fall back to a list
+            self.data = self.data.tolist()
+            self.typecode = None
+        self.data[i] = value
+
+    def set_many(self, i, items):
+        """
+        Stores the elements of a NumPy array from index i on, wrapping
+        around the end of the ring.
+        """
+        typecode = _array_typecode(items)
+        if typecode is not None and typecode == self.typecode:
+            dtype = numpy.float64 if typecode == 'd' else numpy.int64
+            chunk = array(typecode, numpy.ascontiguousarray(
+                items, dtype=dtype).tostring())
+        else:
+            if self.typecode is not None:
+                self.data = self.data.tolist()
+                self.typecode = None
+            chunk = items.tolist()
+        first = min(len(chunk), len(self.data) - i)
+        self.data[i:i + first] = chunk[:first]
+        self.data[:len(chunk) - first] = chunk[first:]
+
+    def get(self, i):
+        value = self.data[i]
+        if self.typecode is None:
+            # Release the reference held by the list
+            self.data[i] = None
+        return value
+
+    def take(self, head, count):
+        """
+        :return: List of count elements starting at head, in order
+        """
+        data = self.data
+        end = head + count
+        if end <= len(data):
+            items = data[head:end]
+        else:
+            items = data[head:] + data[:end - len(data)]
+        if self.typecode is not None:
+            return items.tolist()
+        return items
+
+    def resize(self, head, count, capacity):
+        """
+        Moves count elements starting at head to a storage of capacity
+        elements, the first one at index 0.
+        """
+        data = self.data
+        end = head + count
+        if end <= len(data):
+            items = data[head:end]
+        else:
+            items = data[head:] + data[:end - len(data)]
+        if self.typecode is not None:
+            self.data = items + array(self.typecode, [0]) * (capacity - count)
+        else:
+            self.data = items + [None] * (capacity - count)
+
+    def memory_size(self):
+        data = self.data
+        if self.typecode is not None:
+            return sys.getsizeof(data)
+        return sys.getsizeof(data) + sum(sys.getsizeof(item)
+                                         for item in data
+                                         if item is not None)
+
+
+class SampleBuffer(object):
+    """
+    Buffer of (ts, value) samples collected by a RegisteredMetric.
+
+    Timestamps and values are kept in two ring buffers of parallel arrays,
+    which takes a few bytes per sample instead of a tuple and its elements.
+    Columns fall back to lists for samples that are not int or float, or
+    whose type changes between samples.
+
+    put(), get() and qsize() work as those of Queue.Queue, and capacity is
+    enforced like BoundedQueue with an OverflowPolicy.  put_many() and
+    drain() add or take many samples while acquiring the lock only once,
+    and put_arrays() copies NumPy arrays of samples without iterating over
+    them in Python.
+
+    As a gateway may have a buffer per metric for many metrics, an empty
+    buffer is kept small: storage is allocated with the first sample, and
+    the conditions not_empty and not_full when a thread first waits.
+    """
+    __slots__ = ('maxsize', 'policy', 'on_drop', 'num_dropped', 'mutex',
+                 '_not_empty', '_not_full', '_capacity', '_timestamps',
+                 '_values', '_head', '_count', '_num_getters', '_num_putters')
+
+    def __init__(self, maxsize=0, policy=OverflowPolicy.BLOCK, on_drop=None):
+        if policy not in OverflowPolicy:
+            raise TypeError("OverflowPolicy is expected.")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_drop = on_drop
+        self.num_dropped = 0
+        self.mutex = Lock()
+        self._not_empty = None
+        self._not_full = None
+        self._capacity = 0
+        self._timestamps = _Column(0)
+        self._values = _Column(0)
+        self._head = 0
+        self._count = 0
+        # Threads waiting in get() and put(), only those are notified
+        self._num_getters = 0
+        self._num_putters = 0
+
+    @property
+    def not_empty(self):
+        with self.mutex:
+            return self._get_not_empty()
+
+    @property
+    def not_full(self):
+        with self.mutex:
+            return self._get_not_full()
+
+    def qsize(self):
+        self.mutex.acquire()
+        try:
+            return self._count
+        finally:
+            self.mutex.release()
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def full(self):
+        self.mutex.acquire()
+        try:
+            return 0 < self.maxsize <= self._count
+        finally:
+            self.mutex.release()
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Adds a (ts, value) sample.
+        """
+        self.mutex.acquire()
+        try:
+            # Common case: room left without growing or dropping
+            if self._count < self._capacity:
+                self._append(item[0], item[1])
+                if self._num_getters:
+                    self._not_empty.notify()
+                return
+        finally:
+            self.mutex.release()
+        self.put_many([item], block, timeout)
+
+    def put_nowait(self, item):
+        return self.put(item, False)
+
+    def put_many(self, items, block=True, timeout=None):
+        """
+        Adds (ts, value) samples in order.
+
+        :param items: Iterable of (ts, value) tuples
+        :param block: With OverflowPolicy.BLOCK, wait for room if full
+        :param timeout: Maximum time to wait for room in seconds
+        :return: None
+        """
+        dropped = []
+        added = 0
+        self.mutex.acquire()
+        try:
+            for item in items:
+                if 0 < self.maxsize <= self._count:
+                    if self.policy is OverflowPolicy.BLOCK:
+                        self._wait_not_full(block, timeout)
+                    elif self.policy is OverflowPolicy.DROP_NEWEST:
+                        dropped.append(item)
+                        continue
+                    elif self.policy is OverflowPolicy.DROP_OLDEST:
+                        dropped.append(self._pop())
+                    else:
+                        dropped.extend(self._downsample())
+                # Also after waiting for room, as clear() may have released
+                # the storage meanwhile
+                if self._count == self._capacity:
+                    self._resize(max(self._capacity * 2, _INITIAL_CAPACITY))
+                self._append(item[0], item[1])
+                added += 1
+            self.num_dropped += len(dropped)
+            if added and self._num_getters:
+                self._not_empty.notify(added)
+        finally:
+            self.mutex.release()
+        if self.on_drop is not None:
+            for item in dropped:
+                self.on_drop(item)
+
+    def put_arrays(self, timestamps, values, block=True, timeout=None):
+        """
+        Adds samples given as NumPy arrays.  Numeric arrays are copied into
+        the buffer in one operation; if the buffer would overflow, samples
+        are added one by one so the OverflowPolicy applies to each.
+
+        :param timestamps: 1-D NumPy array of timestamps
+        :param values: 1-D NumPy array of values, same length
+        :param block: With OverflowPolicy.BLOCK, wait for room if full
+        :param timeout: Maximum time to wait for room in seconds
+        :return: None
+        """
+        count = len(timestamps)
+        if count != len(values):
+            raise ValueError("Timestamps and values differ in length: %d, %d"
+                             % (count, len(values)))
+        if not count:
+            return
+        self.mutex.acquire()
+        try:
+            if self.maxsize <= 0 or self._count + count <= self.maxsize:
+                if self._count + count > self._capacity:
+                    self._resize(max(self._capacity * 2, self._count + count))
+                if not self._count:
+                    self._head = 0
+                    self._timestamps.allocate(_array_typecode(timestamps),
+                                              self._capacity)
+                    self._values.allocate(_array_typecode(values),
+                                          self._capacity)
+                i = (self._head + self._count) % self._capacity
+                self._timestamps.set_many(i, timestamps)
+                self._values.set_many(i, values)
+                self._count += count
+                if self._num_getters:
+                    self._not_empty.notify(count)
+                return
+        finally:
+            self.mutex.release()
+        self.put_many(zip(timestamps.tolist(), values.tolist()),
+                      block, timeout)
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the oldest (ts, value) sample.
+        """
+        self.mutex.acquire()
+        try:
+            if not block:
+                if not self._count:
+                    raise Empty
+            elif timeout is None:
+                while not self._count:
+                    self._wait_for_sample()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                endtime = _time() + timeout
+                while not self._count:
+                    remaining = endtime - _time()
+                    if remaining <= 0.0:
+                        raise Empty
+                    self._wait_for_sample(remaining)
+            item = self._pop()
+            if self._num_putters:
+                self._not_full.notify()
+            return item
+        finally:
+            self.mutex.release()
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def drain(self):
+        """
+        Removes all samples.
+
+        :return: Tuple of the list of timestamps and the list of values,
+                 oldest first
+        """
+        self.mutex.acquire()
+        try:
+            timestamps = self._timestamps.take(self._head, self._count)
+            values = self._values.take(self._head, self._count)
+            for column in (self._timestamps, self._values):
+                if column.typecode is None:
+                    column.data = [None] * self._capacity
+            self._head = 0
+            self._count = 0
+            if self._num_putters:
+                self._not_full.notify_all()
+            return timestamps, values
+        finally:
+            self.mutex.release()
+
+    def clear(self):
+        """
+        Removes all samples and releases their storage.
+        """
+        self.mutex.acquire()
+        try:
+            self._capacity = 0
+            self._timestamps = _Column(0)
+            self._values = _Column(0)
+            self._head = 0
+            self._count = 0
+            if self._num_putters:
+                self._not_full.notify_all()
+        finally:
+            self.mutex.release()
+
+    def memory_size(self):
+        """
+        :return: Bytes used by the storage of samples
+        """
+        self.mutex.acquire()
+        try:
+            return self._timestamps.memory_size() + \
+                self._values.memory_size()
+        finally:
+            self.mutex.release()
+
+    # All methods below must be called with mutex held
+
+    def _get_not_empty(self):
+        if self._not_empty is None:
+            self._not_empty = Condition(self.mutex)
+        return self._not_empty
+
+    def _get_not_full(self):
+        if self._not_full is None:
+            self._not_full = Condition(self.mutex)
+        return self._not_full
+
+    def _wait_not_full(self, block, timeout):
+        if not block:
+            raise Full
+        elif timeout is None:
+            while self._count >= self.maxsize:
+                self._wait_for_room()
+        elif timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        else:
+            endtime = _time() + timeout
+            while self._count >= self.maxsize:
+                remaining = endtime - _time()
+                if remaining <= 0.0:
+                    raise Full
+                self._wait_for_room(remaining)
+
+    def _wait_for_sample(self, timeout=None):
+        self._num_getters += 1
+        try:
+            self._get_not_empty().wait(timeout)
+        finally:
+            self._num_getters -= 1
+
+    def _wait_for_room(self, timeout=None):
+        self._num_putters += 1
+        try:
+            self._get_not_full().wait(timeout)
+        finally:
+            self._num_putters -= 1
+
+    def _append(self, ts, value):
+        if not self._count:
+            self._head = 0
+            self._timestamps.reset(ts, self._capacity)
+            self._values.reset(value, self._capacity)
+        i = (self._head + self._count) % self._capacity
+        for column, item in ((self._timestamps, ts), (self._values, value)):
+            # Inline the common case of _Column.set()
+            if column.typecode is not None and \
+                    _TYPECODES.get(type(item)) == column.typecode:
+                try:
+                    column.data[i] = item
+                    continue
+                except OverflowError:
+                    pass
+            column.set(i, item)
+        self._count += 1
+
+    def _pop(self):
+        head = self._head
+        item = (self._timestamps.get(head), self._values.get(head))
+        self._head = (head + 1) % self._capacity
+        self._count -= 1
+        return item
+
+    def _resize(self, capacity):
+        if self.maxsize > 0:
+            capacity = min(capacity, self.maxsize)
+        self._timestamps.resize(self._head, self._count, capacity)
+        self._values.resize(self._head, self._count, capacity)
+        self._capacity = capacity
+        self._head = 0
+
+    def _downsample(self):
+        """
+        Drops every other sample, counting back from the sample being added.
+
+        :return: List of dropped (ts, value) samples
+        """
+        samples = zip(self._timestamps.take(self._head, self._count),
+                      self._values.take(self._head, self._count))
+        dropped = samples[(len(samples) - 1) % 2::2]
+        kept = samples[len(samples) % 2::2]
+        self._head = 0
+        self._count = 0
+        for ts, value in kept:
+            self._append(ts, value)
+        return dropped
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import cPickle as pickle
+import errno
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import zlib
+from threading import Condition, Event, Lock, Thread
+from time import time as _time
+
+log = logging.getLogger(__name__)
+
+# Header of a record: length and CRC32 of its payload.  A zero length marks
+# the end of the records of a segment.
+_RECORD_HEADER = struct.Struct("<II")
+# Content of the cursor file: segment number and offset of the oldest
+# record not yet replayed
+_CURSOR = struct.Struct("<QQ")
+
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+_LOCK_FILE = "lock"
+
+
+class SpoolInUseError(IOError):
+    """
+    Raised when opening a spool directory that another Spool has open.
+    """
+
+
+class Spool:
+    """
+    Persistent store of messages a DCC could not send, to be sent later in
+    the order they were appended.
+
+    Messages are appended to memory-mapped segment files of a directory,
+    each record carrying the CRC32 of its payload.  A new segment is started
+    when a record does not fit in the current one, and the oldest segments
+    are discarded when the total size of segments exceeds max_size.
+    Position of the oldest record not yet sent is kept in a memory-mapped
+    cursor file, so a spool opened again after a restart resumes where it
+    stopped.  Records are written before their header, so a record torn by
+    a crash is never read back.
+
+    A spool is used by one writer and one reader thread at a time: append()
+    may be called concurrently with peek() and pop().  Its directory is
+    locked while it is open, so that no other Spool, in this process or
+    another one, writes the same segments.
+    """
+
+    def __init__(self, path, segment_size=1048576, max_size=67108864):
+        """
+        :param path: Directory of the spool, created if missing
+        :param segment_size: Size of a segment file in bytes
+        :param max_size: Maximum total size of segment files in bytes
+        """
+        if segment_size <= _RECORD_HEADER.size:
+            raise ValueError("segment_size must be larger than %d bytes"
+                             % _RECORD_HEADER.size)
+        self.path = path
+        self.segment_size = segment_size
+        self.max_size = max(max_size, segment_size)
+        self.mutex = Lock()
+        self.not_empty = Condition(self.mutex)
+        # Number of records appended, sent, and lost to size limit or
+        # corruption since the spool was opened
+        self.num_appended = 0
+        self.num_sent = 0
+        self.num_dropped = 0
+        self.num_corrupted = 0
+        # Number of records not sent yet
+        self.num_pending = 0
+        # key: segment number, value: size of the segment file
+        self._sizes = {}
+        # key: segment number, value: number of records not sent yet
+        self._counts = {}
+        # Sorted segment numbers
+        self._segments = []
+        self._write_seq = None
+        self._write_map = None
+        self._write_offset = 0
+        self._read_seq = None
+        self._read_map = None
+        self._read_offset = 0
+        # Position after the record returned by the last peek()
+        self._peeked = None
+        self._cursor_map = None
+        self._lock_file = None
+        self._open()
+
+    def _segment_path(self, seq):
+        return os.path.join(self.path, "%020d%s" % (seq, _SEGMENT_SUFFIX))
+
+    def _open(self):
+        try:
+            os.makedirs(self.path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        self._lock()
+        try:
+            self._load()
+        except Exception:
+            self._unlock()
+            raise
+
+    def _lock(self):
+        lock_file = open(os.path.join(self.path, _LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError as e:
+            lock_file.close()
+            if e.errno in (errno.EAGAIN, errno.EACCES):
+                raise SpoolInUseError("Spool %s is in use" % self.path)
+            raise
+        self._lock_file = lock_file
+
+    def _unlock(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self):
+        segments = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(_SEGMENT_SUFFIX)
+            and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        cursor_path = os.path.join(self.path, _CURSOR_FILE)
+        with open(cursor_path, "a+b") as f:
+            if os.fstat(f.fileno()).st_size < _CURSOR.size:
+                f.truncate(_CURSOR.size)
+            self._cursor_map = mmap.mmap(f.fileno(), _CURSOR.size)
+        read_seq, read_offset = _CURSOR.unpack_from(self._cursor_map, 0)
+        if read_seq not in segments:
+            read_offset = 0
+        for seq in segments:
+            if seq < read_seq:
+                # Sent before the last shutdown
+                os.remove(self._segment_path(seq))
+                continue
+            offset = read_offset if seq == read_seq else 0
+            segment_map = self._map_segment(seq)
+            count, end = _scan(segment_map, offset)
+            self._segments.append(seq)
+            self._sizes[seq] = len(segment_map)
+            self._counts[seq] = count
+            self.num_pending += count
+            if seq == segments[-1]:
+                # Clear anything past the last valid record, such as a torn
+                # record, before appending after it
+                segment_map[end:] = "\0" * (len(segment_map) - end)
+                self._write_seq = seq
+                self._write_map = segment_map
+                self._write_offset = end
+            else:
+                segment_map.close()
+        if self._segments:
+            self._read_seq = self._segments[0]
+            if self._read_seq == read_seq:
+                self._read_offset = read_offset
+            self._save_cursor()
+        log.info("Opened spool %s with %d pending records"
+                 % (self.path, self.num_pending))
+
+    def _map_segment(self, seq, size=None):
+        """
+        Maps a segment file, creating it with the given size if size is set.
+        """
+        with open(self._segment_path(seq), "w+b" if size else "r+b") as f:
+            if size:
+                f.truncate(size)
+            else:
+                size = os.fstat(f.fileno()).st_size
+            return mmap.mmap(f.fileno(), size)
+
+    def _save_cursor(self):
+        _CURSOR.pack_into(self._cursor_map, 0, self._read_seq,
+                          self._read_offset)
+
+    def append(self, message, msg_attr=None):
+        """
+        Appends a message to the spool.
+
+        :param message: Formatted message
+        :param msg_attr: Messaging attributes the message is sent with;
+                         they must be picklable
+        :return: None
+        """
+        payload = pickle.dumps((message, msg_attr), pickle.HIGHEST_PROTOCOL)
+        record_size = _RECORD_HEADER.size + len(payload)
+        crc = zlib.crc32(payload) & 0xffffffff
+        with self.mutex:
+            if self._write_map is None \
+                    or self._write_offset + record_size > len(self._write_map):
+                self._start_segment(record_size)
+            start = self._write_offset + _RECORD_HEADER.size
+            self._write_map[start:start + len(payload)] = payload
+            _RECORD_HEADER.pack_into(self._write_map, self._write_offset,
+                                     len(payload), crc)
+            self._write_offset += record_size
+            self._counts[self._write_seq] += 1
+            self.num_pending += 1
+            self.num_appended += 1
+            self.not_empty.notify()
+
+    def _start_segment(self, record_size):
+        seq = 0 if self._write_seq is None else self._write_seq + 1
+        size = max(self.segment_size, record_size)
+        if self._write_map is not None:
+            if self._write_seq == self._read_seq:
+                self._read_map = self._write_map
+            else:
+                self._write_map.close()
+        self._write_map = self._map_segment(seq, size)
+        self._write_seq = seq
+        self._write_offset = 0
+        self._segments.append(seq)
+        self._sizes[seq] = size
+        self._counts[seq] = 0
+        if self._read_seq is None:
+            self._read_seq = seq
+            self._read_offset = 0
+            self._save_cursor()
+        while len(self._segments) > 1 \
+                and sum(self._sizes.values()) > self.max_size:
+            self._drop_oldest_segment()
+
+    def _drop_oldest_segment(self):
+        seq = self._segments[0]
+        count = self._counts[seq]
+        if count:
+            log.warning("Spool %s full, dropped %d records"
+                        % (self.path, count))
+        self.num_dropped += count
+        self._remove_oldest_segment()
+
+    def _remove_oldest_segment(self):
+        seq = self._segments.pop(0)
+        self.num_pending -= self._counts.pop(seq)
+        del self._sizes[seq]
+        if self._read_map is not None:
+            self._read_map.close()
+            self._read_map = None
+        os.remove(self._segment_path(seq))
+        self._read_seq = self._segments[0]
+        self._read_offset = 0
+        self._peeked = None
+        self._save_cursor()
+
+    def _next_record(self):
+        """
+        :return: Tuple of the payload of the oldest record and the offset
+                 after it, or None if no record is pending
+        """
+        while True:
+            if self._read_seq is None:
+                return None
+            if self._read_seq == self._write_seq:
+                segment_map = self._write_map
+            else:
+                if self._read_map is None:
+                    self._read_map = self._map_segment(self._read_seq)
+                segment_map = self._read_map
+            record = _read_record(segment_map, self._read_offset)
+            if record is not None:
+                return record
+            if self._read_seq == self._write_seq:
+                if self._counts[self._read_seq]:
+                    # Corrupted record in the segment being written, go on
+                    # with a new one
+                    self._start_segment(0)
+                    continue
+                return None
+            count = self._counts[self._read_seq]
+            if count:
+                log.warning("Spool %s: skipped %d corrupted records"
+                            % (self.path, count))
+                self.num_corrupted += count
+            self._remove_oldest_segment()
+
+    def peek(self):
+        """
+        :return: Tuple of the message and msg_attr of the oldest record, or
+                 None if the spool is empty
+        """
+        with self.mutex:
+            while True:
+                record = self._next_record()
+                if record is None:
+                    return None
+                payload, end = record
+                self._peeked = (self._read_seq, end)
+                try:
+                    return pickle.loads(payload)
+                except Exception:
+                    log.exception("Spool %s: dropped unreadable record"
+                                  % self.path)
+                    self.num_corrupted += 1
+                    self._advance()
+
+    def pop(self):
+        """
+        Removes the record returned by the last peek(), after it was sent.
+        Nothing is removed if that record was dropped since, as append()
+        does with the oldest segment of a full spool.
+
+        :return: True if the record was removed
+        """
+        with self.mutex:
+            if self._peeked is None or self._peeked[0] != self._read_seq:
+                self._peeked = None
+                return False
+            self.num_sent += 1
+            self._advance()
+            return True
+
+    def _advance(self):
+        self._read_offset = self._peeked[1]
+        self._peeked = None
+        self._counts[self._read_seq] -= 1
+        self.num_pending -= 1
+        self._save_cursor()
+
+    def wait(self, timeout=None):
+        """
+        Waits until a record is pending.
+
+        :param timeout: Maximum time to wait in seconds, None to wait forever
+        :return: True if a record is pending
+        """
+        with self.not_empty:
+            if not self.num_pending:
+                self.not_empty.wait(timeout)
+            return self.num_pending > 0
+
+    def qsize(self):
+        with self.mutex:
+            return self.num_pending
+
+    def disk_size(self):
+        """
+        :return: Total size of segment files in bytes
+        """
+        with self.mutex:
+            return sum(self._sizes.values())
+
+    def notify(self):
+        """
+        Wakes up a thread blocked in wait().
+        """
+        with self.not_empty:
+            self.not_empty.notify_all()
+
+    def flush(self):
+        """
+        Writes changes of mapped files to disk.  Records appended survive a
+        crash of the process without it, but not a crash of the system.
+
+        :return: None
+        """
+        with self.mutex:
+            for segment_map in (self._write_map, self._read_map,
+                                self._cursor_map):
+                if segment_map is not None:
+                    segment_map.flush()
+
+    def close(self):
+        self.flush()
+        with self.mutex:
+            for segment_map in (self._write_map, self._read_map,
+                                self._cursor_map):
+                if segment_map is not None:
+                    segment_map.close()
+            self._write_map = self._read_map = self._cursor_map = None
+            self._write_seq = self._read_seq = None
+            self._unlock()
+
+
+def _read_record(segment_map, offset):
+    """
+    :return: Tuple of the payload of the record at offset and the offset
+             after it, or None if there is no valid record at offset
+    """
+    start = offset + _RECORD_HEADER.size
+    if start > len(segment_map):
+        return None
+    length, crc = _RECORD_HEADER.unpack_from(segment_map, offset)
+    if length == 0 or start + length > len(segment_map):
+        return None
+    payload = segment_map[start:start + length]
+    if zlib.crc32(payload) & 0xffffffff != crc:
+        log.warning("CRC mismatch of spool record at offset %d" % offset)
+        return None
+    return payload, start + length
+
+
+def _scan(segment_map, offset):
+    """
+    :return: Tuple of the number of valid records from offset on and the
+             offset after the last of them
+    """
+    count = 0
+    while True:
+        record = _read_record(segment_map, offset)
+        if record is None:
+            return count, offset
+        count += 1
+        offset = record[1]
+
+
+class SpoolReplayThread(Thread):
+    """
+    Sends the records of a spool, oldest first, at most rate records per
+    second.  A record is removed from the spool only after send returned
+    True; after a failure sending is retried every retry_interval seconds.
+    """
+
+    def __init__(self, spool, send, rate=50, retry_interval=5, name=None):
+        """
+        :param spool: Spool
+        :param send: Function taking message and msg_attr, returning whether
+                     the message was sent
+        :param rate: Maximum number of records sent per second, 0 for no
+                     limit
+        :param retry_interval: Time in seconds to wait after a failure
+        :param name: Thread name
+        """
+        Thread.__init__(self, name=name)
+        self.daemon = True
+        self.flag_alive = True
+        self._spool = spool
+        self._send = send
+        self._period = 1.0 / rate if rate > 0 else 0
+        self._retry_interval = retry_interval
+        self._stopped = Event()
+        self.start()
+
+    def run(self):
+        log.info("Started SpoolReplayThread")
+        spool = self._spool
+        next_send = _time()
+        while self.flag_alive:
+            if not spool.wait(self._retry_interval):
+                continue
+            now = _time()
+            if next_send > now:
+                self._stopped.wait(next_send - now)
+                continue
+            record = spool.peek()
+            if record is None:
+                continue
+            message, msg_attr = record
+            try:
+                sent = self._send(message, msg_attr)
+            except Exception:
+                log.exception("Replay of spooled message failed")
+                sent = False
+            if not sent:
+                self._stopped.wait(self._retry_interval)
+                next_send = _time()
+                continue
+            spool.pop()
+            # Unused time of an idle period is not saved up for a burst
+            next_send = max(next_send, now - self._period) + self._period
+        log.info("Thread exits: %s" % str(self.name))
+
+    def stop(self):
+        self.flag_alive = False
+        self._stopped.set()
+        self._spool.notify()
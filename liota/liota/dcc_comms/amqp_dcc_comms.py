@@ -124,7 +124,7 @@ class AmqpDccComms(DCCComms):
         Publishes message to AMQP broker with given routing key
         :param message: Message to be published
         :param pub_msg_attr: AmqpPublishMessagingAttributes Object
-        :return:
+        :return: True if the message was published, False otherwise
         """
         if pub_msg_attr:
             # declare exchange if not already declared
@@ -133,17 +133,17 @@ class AmqpDccComms(DCCComms):
 
             if pub_msg_attr.exchange_name is None:
                 # Mode 2: Single exchange and different routing-keys for each metric published from an edge_system
-                self.client.publish(self.pub_msg_attr.exchange_name, pub_msg_attr.routing_key, message,
-                                    pub_msg_attr.properties)
+                return self.client.publish(self.pub_msg_attr.exchange_name, pub_msg_attr.routing_key, message,
+                                           pub_msg_attr.properties)
             else:
                 # Mode 3: Separate exchange and routing-keys for each metric published from an edge_system
-                self.client.publish(pub_msg_attr.exchange_name, pub_msg_attr.routing_key, message,
-                                    pub_msg_attr.properties)
+                return self.client.publish(pub_msg_attr.exchange_name, pub_msg_attr.routing_key, message,
+                                           pub_msg_attr.properties)
 
         else:
             # Mode 1: Single exchange and routing-key for all metrics published from an edge_system
-            self.client.publish(self.pub_msg_attr.exchange_name, self.pub_msg_attr.routing_key, message,
-                                self.pub_msg_attr.properties)
+            return self.client.publish(self.pub_msg_attr.exchange_name, self.pub_msg_attr.routing_key, message,
+                                       self.pub_msg_attr.properties)
 
     def stop_receiving(self):
         """
@@ -57,6 +57,10 @@ class DCCComms:
     def _disconnect(self):
         pass
 
+    #-----------------------------------------------------------------------
+    # Return False, or raise an exception, if the message could not be
+    # handed to the transport, so that the DCC can spool it.
+    #
     @abstractmethod
     def send(self, message, msg_attr):
         pass
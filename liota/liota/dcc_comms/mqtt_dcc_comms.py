@@ -156,10 +156,10 @@ class MqttDccComms(DCCComms):
 
         :param message: Message to be published
         :param msg_attr: MqttMessagingAttributes Object
-        :return:
+        :return: True if the message was published, False otherwise
         """
         if msg_attr:
-            self.client.publish(msg_attr.pub_topic, message, msg_attr.pub_qos, msg_attr.pub_retain)
+            return self.client.publish(msg_attr.pub_topic, message, msg_attr.pub_qos, msg_attr.pub_retain)
         else:
-            self.client.publish(self.msg_attr.pub_topic, message, self.msg_attr.pub_qos,
-                                self.msg_attr.pub_retain)
+            return self.client.publish(self.msg_attr.pub_topic, message, self.msg_attr.pub_qos,
+                                       self.msg_attr.pub_retain)
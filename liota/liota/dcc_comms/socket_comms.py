@@ -63,8 +63,9 @@ class SocketDccComms(DCCComms):
 
     def send(self, message, msg_attr=None):
         log.debug("Publishing message:" + str(message))
-        if self.client is not None:
-            self.client.sendall(message)
+        if self.client is None:
+            return False
+        self.client.sendall(message)
 
     def receive(self):
         raise NotImplementedError
@@ -44,9 +44,30 @@ class DataCenterComponent:
 
     """
     Abstract base class for all DCCs.
+
+    Metrics registered to a DCC are published by its own send threads.  Set
+    send_thread_pool_size on a DCC object, before its metrics start
+    collecting, to override CORE_CFG option send_thread_pool_size.
+    Likewise, publish_latency_slo_ms overrides CORE_CFG option
+    publish_latency_slo_ms, the publish latency that metrics with an
+    adaptive aggregation size try not to exceed.
+
+    If spool is set to a Spool, messages of metrics which comms fails to
+    send are appended to it, and replayed oldest first by the send threads
+    of the DCC once sending succeeds again.  Without it, a spool is created
+    under CORE_CFG option spool_dir if that is set, in a directory named
+    after spool_name if set, else after the class of the DCC.  Set
+    spool_name on DCCs of the same class so that each finds its own spool
+    after a restart.  The spool is closed when the package of the DCC is
+    unloaded, so the DCC of a reloaded package reopens it.
     """
     __metaclass__ = ABCMeta
 
+    send_thread_pool_size = None
+    publish_latency_slo_ms = None
+    spool = None
+    spool_name = None
+
     @abstractmethod
     def __init__(self, comms):
         if not isinstance(comms, DCCComms):
@@ -76,15 +97,76 @@ class DataCenterComponent:
     def _format_data(self, reg_metric):
         pass
 
+    # -----------------------------------------------------------------------
+    # Override this method in subclasses whose message format can carry
+    # values of several metrics.  It should return a list of messages for
+    # the given metrics, which all share the same msg_attr, or
+    # NotImplemented if they can not be combined.
+    #
+
+    def _format_data_batch(self, reg_metrics):
+        return NotImplemented
+
     def publish(self, reg_metric):
         if not isinstance(reg_metric, RegisteredMetric):
             log.error("RegisteredMetric object is expected.")
             raise TypeError("RegisteredMetric object is expected.")
         message = self._format_data(reg_metric)
         if hasattr(reg_metric, 'msg_attr'):
-            self.comms.send(message, reg_metric.msg_attr)
+            self._send(message, reg_metric.msg_attr)
         else:
-            self.comms.send(message, None)
+            self._send(message, None)
+
+    def publish_batch(self, reg_metrics):
+        """
+        Publishes several metrics sharing the same msg_attr, in as few
+        messages as _format_data_batch() allows.
+
+        :param reg_metrics: List of RegisteredMetric objects
+        :return: None
+        """
+        for reg_metric in reg_metrics:
+            if not isinstance(reg_metric, RegisteredMetric):
+                log.error("RegisteredMetric object is expected.")
+                raise TypeError("RegisteredMetric object is expected.")
+        messages = self._format_data_batch(reg_metrics)
+        if messages is NotImplemented:
+            for reg_metric in reg_metrics:
+                self.publish(reg_metric)
+            return
+        msg_attr = getattr(reg_metrics[0], 'msg_attr', None)
+        for message in messages:
+            self._send(message, msg_attr)
+
+    def _send(self, message, msg_attr):
+        """
+        Sends a formatted message of metrics, appending it to the spool of
+        the DCC if comms fails to send it.
+
+        :param message: Formatted message
+        :param msg_attr: Messaging attributes or None
+        :return: None
+        """
+        if self.spool is None:
+            self.comms.send(message, msg_attr)
+            return
+        if self._try_send(message, msg_attr):
+            return
+        try:
+            self.spool.append(message, msg_attr)
+        except Exception:
+            log.exception("Failed to spool message, it is discarded")
+
+    def _try_send(self, message, msg_attr):
+        """
+        :return: True if comms sent the message; comms report a failure by
+                 returning False or raising an exception
+        """
+        try:
+            return self.comms.send(message, msg_attr) is not False
+        except Exception:
+            log.exception("Failed to send message")
+            return False
 
     @abstractmethod
     def set_properties(self, reg_entity, properties):
@@ -34,6 +34,7 @@ from liota.dccs.dcc import DataCenterComponent
 from liota.entities.metrics.registered_metric import RegisteredMetric
 from liota.entities.metrics.metric import Metric
 from liota.entities.registered_entity import RegisteredEntity
+from liota.lib.utilities.filters.windowing_scheme.window_aggregator import WindowSummary
 
 
 log = logging.getLogger(__name__)
@@ -55,20 +56,27 @@ class Graphite(DataCenterComponent):
     def create_relationship(self, reg_entity_parent, reg_entity_child):
         reg_entity_child.parent = reg_entity_parent
 
+    def _format_data_batch(self, reg_metrics):
+        # Plaintext protocol accepts any number of lines per message
+        message = ''.join(filter(None, map(self._format_data, reg_metrics)))
+        return [message] if message else []
+
     def _format_data(self, reg_metric):
-        met_cnt = reg_metric.values.qsize()
-        message = ''
-        if met_cnt == 0:
-            return
-        for _ in range(met_cnt):
-            v = reg_metric.values.get(block=True)
-            if v is not None:
-                # Graphite expects time in seconds, not milliseconds. Hence,
-                # dividing by 1000
-                message += '%s %s %d\n' % (reg_metric.ref_entity.name,
-                                           v[1], v[0] / 1000)
-        if message == '':
+        _timestamps, _values = reg_metric.values.drain()
+        if not _timestamps:
             return
+        # Graphite expects time in seconds, not milliseconds. Hence,
+        # dividing by 1000
+        name = reg_metric.ref_entity.name
+        lines = []
+        for ts, v in zip(_timestamps, _values):
+            if isinstance(v, WindowSummary):
+                # One series per field of the summary, e.g. name.max
+                lines.extend(['%s.%s %s %d\n' % (name, field, x, ts / 1000)
+                              for field, x in zip(v._fields, v)])
+            else:
+                lines.append('%s %s %d\n' % (name, v, ts / 1000))
+        message = ''.join(lines)
         log.info ("Publishing values to Graphite DCC")
         log.debug("Formatted message: {0}".format(message))
         return message
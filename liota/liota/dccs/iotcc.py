@@ -37,6 +37,7 @@ import threading
 import ConfigParser
 import os
 import Queue
+from collections import OrderedDict
 from time import gmtime, strftime
 from threading import Lock
 import xml.etree.cElementTree as ET
@@ -49,6 +50,7 @@ from liota.lib.utilities.utility import LiotaConfigPath, getUTCmillis, mkdir, re
 from liota.lib.utilities.si_unit import parse_unit
 from liota.entities.metrics.registered_metric import RegisteredMetric
 from liota.entities.registered_entity import RegisteredEntity
+from liota.lib.utilities.filters.windowing_scheme.window_aggregator import WindowSummary
 
 log = logging.getLogger(__name__)
 
@@ -230,27 +232,54 @@ class IotControlCenter(DataCenterComponent):
         return msg
 
     def _format_data(self, reg_metric):
-        met_cnt = reg_metric.values.qsize()
-        if met_cnt == 0:
-            return
-        _timestamps = []
-        _values = []
-        for _ in range(met_cnt):
-            m = reg_metric.values.get(block=True)
-            if m is not None:
-                _timestamps.append(m[0])
-                _values.append(m[1])
-        if _timestamps == []:
+        metric_data = self._format_metric_data(reg_metric)
+        if not metric_data:
             return
         return json.dumps({
             "type": "add_stats",
             "uuid": reg_metric.reg_entity_id,
-            "metric_data": [{
-                "statKey": reg_metric.ref_entity.name,
+            "metric_data": metric_data
+        })
+
+    def _format_data_batch(self, reg_metrics):
+        # One add_stats message per resource, carrying all its metrics
+        stats = OrderedDict()
+        for reg_metric in reg_metrics:
+            metric_data = self._format_metric_data(reg_metric)
+            if metric_data:
+                stats.setdefault(reg_metric.reg_entity_id, []).extend(metric_data)
+        return [json.dumps({
+            "type": "add_stats",
+            "uuid": uuid,
+            "metric_data": metric_data
+        }) for uuid, metric_data in stats.items()]
+
+    def _format_metric_data(self, reg_metric):
+        # List of stats of a metric; add_stats takes numbers, so WindowSummary
+        # values give one stat per field of the summary, e.g. name.max
+        _timestamps, _values = reg_metric.values.drain()
+        if _timestamps == []:
+            return []
+        name = reg_metric.ref_entity.name
+        if not any(isinstance(v, WindowSummary) for v in _values):
+            return [{
+                "statKey": name,
                 "timestamps": _timestamps,
                 "data": _values
             }]
-        })
+        stats = OrderedDict()
+        for ts, v in zip(_timestamps, _values):
+            if isinstance(v, WindowSummary):
+                fields = [('%s.%s' % (name, field), x) for field, x in zip(v._fields, v)]
+            else:
+                fields = [(name, v)]
+            for stat_key, x in fields:
+                stat = stats.get(stat_key)
+                if stat is None:
+                    stat = stats[stat_key] = {"statKey": stat_key, "timestamps": [], "data": []}
+                stat["timestamps"].append(ts)
+                stat["data"].append(x)
+        return stats.values()
 
     def set_organization_group_properties(self, reg_entity_name, reg_entity_id, reg_entity_type, properties):
         log.info("Organization Group Properties defined for resource {0}".format(reg_entity_name))
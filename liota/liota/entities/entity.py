@@ -37,8 +37,13 @@ class Entity:
 
     """
     Abstract base class for all entities.
+
+    Entity and Metric declare __slots__, so that the many Metric objects of
+    a gateway take no instance dict; subclasses not declaring __slots__
+    get one as usual.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ('name', 'entity_id', 'entity_type')
 
     @abstractmethod
     def __init__(self, name, entity_id, entity_type):
@@ -30,26 +30,141 @@
 #  THE POSSIBILITY OF SUCH DAMAGE.                                            #
 # ----------------------------------------------------------------------------#
 
+import inspect
+
 import pint
+from liota.core.bounded_queue import OverflowPolicy
+from liota.core.metric_handler import ExecutionMode, Priority, \
+    MissedDeadlinePolicy, SchedulingPhase
 from liota.entities.entity import Entity
 from liota.entities.metrics.registered_metric import RegisteredMetric
+from liota.lib.utilities.filters.filter_pipeline import FilterPipeline
 from liota.lib.utilities.utility import systemUUID
 
 
 class Metric(Entity):
+    """
+    Metric entity.
+
+    With execution_mode=ExecutionMode.PROCESS, sampling_function runs in a
+    worker process of metric_handler's process pool and its return value is
+    sent back to liota.  It must then be picklable, i.e. a module level
+    function of a module that worker processes can import, and so must its
+    return value.
+
+    If sampling_function is a generator function, it is run as a coroutine
+    by metric_handler's CoroutineCollector (see
+    liota.core.coroutine_collector) and execution_mode is set to
+    ExecutionMode.COROUTINE.
+
+    sampling_timeout is the number of seconds a collection may take.  A
+    collection running longer counts as an overrun: its collector is
+    replaced by metric_handler's watchdog, and the metric backs off until a
+    collection completes in time again.
+
+    buffer_size is the number of collected values kept until they are
+    published, and overflow_policy (an OverflowPolicy) tells what happens to
+    values collected while the buffer is full.  If not set, they are taken
+    from CORE_CFG options metric_buffer_size and metric_overflow_policy.  A
+    buffer_size of 0 means unbounded.
+
+    priority (a Priority) lets metrics such as alarms be collected and
+    published ahead of bulk telemetry when liota is loaded, while
+    Priority.LOW metrics are the first to wait or be dropped.
+
+    missed_deadline_policy (a MissedDeadlinePolicy) and max_catch_up tell
+    how the metric is rescheduled after a stall made it miss run times.  If
+    not set, they are taken from CORE_CFG options missed_deadline_policy and
+    max_catch_up.
+
+    sampling_function may return a value, a (ts, value) tuple, a list of
+    such tuples, or, for high-rate sensors, a batch of samples as NumPy
+    arrays: a (timestamps, values) pair of arrays or a structured array
+    whose first two fields are timestamps and values.  Such batches are
+    copied into the metric's buffer at once, and every sample counts
+    towards aggregation_size.
+
+    Collected values are sent once aggregation_size of them are buffered,
+    or, if max_flush_latency is set, once the oldest of them has been
+    buffered for max_flush_latency seconds, whichever comes first.  The
+    latter is checked after each collection, so values wait at most
+    max_flush_latency plus one interval.
+
+    With max_aggregation_size set, aggregation_size is only the initial
+    number of values sent together: after each publish it is adjusted
+    between min_aggregation_size and max_aggregation_size, to send as many
+    values per message as the publish latency SLO of the DCC allows.
+
+    scheduling_phase (a SchedulingPhase) tells when the metric is first
+    collected, which spreads or aligns metrics started together.  If not
+    set, it is taken from CORE_CFG option scheduling_phase.
+
+    filter_pipeline (a FilterPipeline) filters collected values before they
+    are buffered, instead of filters applied by the sampling function.
+    Values it rejects are neither buffered nor counted towards
+    aggregation_size.
+    """
+    __slots__ = ('unit', 'interval', 'aggregation_size', 'sampling_function',
+                 'execution_mode', 'sampling_timeout', 'buffer_size',
+                 'overflow_policy', 'priority', 'missed_deadline_policy',
+                 'max_catch_up', 'scheduling_phase', 'max_flush_latency',
+                 'min_aggregation_size', 'max_aggregation_size',
+                 'filter_pipeline')
 
     def __init__(self, name, entity_type="Metric",
                  unit=None,
                  interval=60,
                  aggregation_size=1,
-                 sampling_function=None
+                 sampling_function=None,
+                 execution_mode=ExecutionMode.THREAD,
+                 sampling_timeout=None,
+                 buffer_size=None,
+                 overflow_policy=None,
+                 priority=Priority.NORMAL,
+                 missed_deadline_policy=None,
+                 max_catch_up=None,
+                 scheduling_phase=None,
+                 max_flush_latency=None,
+                 min_aggregation_size=1,
+                 max_aggregation_size=None,
+                 filter_pipeline=None
                  ):
         if not (unit is None or isinstance(unit, pint.unit._Unit)) \
                 or not (
             isinstance(interval, int) or isinstance(interval, float)
         ) \
-                or not isinstance(aggregation_size, int):
+                or not isinstance(aggregation_size, int) \
+                or execution_mode not in ExecutionMode \
+                or not (sampling_timeout is None
+                        or isinstance(sampling_timeout, (int, float))) \
+                or not (buffer_size is None or isinstance(buffer_size, int)) \
+                or not (overflow_policy is None
+                        or overflow_policy in OverflowPolicy) \
+                or priority not in Priority \
+                or not (missed_deadline_policy is None
+                        or missed_deadline_policy in MissedDeadlinePolicy) \
+                or not (max_catch_up is None
+                        or isinstance(max_catch_up, int)) \
+                or not (scheduling_phase is None
+                        or scheduling_phase in SchedulingPhase) \
+                or not (max_flush_latency is None
+                        or isinstance(max_flush_latency, (int, float))) \
+                or not isinstance(min_aggregation_size, int) \
+                or not (max_aggregation_size is None
+                        or (isinstance(max_aggregation_size, int)
+                            and 1 <= min_aggregation_size
+                            <= max_aggregation_size)) \
+                or not (filter_pipeline is None
+                        or isinstance(filter_pipeline, FilterPipeline)):
             raise TypeError()
+        if inspect.isgeneratorfunction(sampling_function):
+            if execution_mode is ExecutionMode.PROCESS:
+                raise TypeError("Coroutine sampling functions can not run "
+                                "in ExecutionMode.PROCESS")
+            execution_mode = ExecutionMode.COROUTINE
+        elif execution_mode is ExecutionMode.COROUTINE:
+            raise TypeError("ExecutionMode.COROUTINE requires a generator "
+                            "function as sampling_function")
         super(Metric, self).__init__(
             name=name,
             entity_id=systemUUID().get_uuid(name),
@@ -59,6 +174,22 @@ class Metric(Entity):
         self.interval = interval
         self.aggregation_size = aggregation_size
         self.sampling_function = sampling_function
+        self.execution_mode = execution_mode
+        self.sampling_timeout = sampling_timeout
+        self.buffer_size = buffer_size
+        self.overflow_policy = overflow_policy
+        self.priority = priority
+        self.missed_deadline_policy = missed_deadline_policy
+        self.max_catch_up = max_catch_up
+        self.scheduling_phase = scheduling_phase
+        self.max_flush_latency = max_flush_latency
+        self.min_aggregation_size = min_aggregation_size
+        self.max_aggregation_size = max_aggregation_size
+        self.filter_pipeline = filter_pipeline
+        if max_aggregation_size is not None:
+            self.aggregation_size = min(max(aggregation_size,
+                                            min_aggregation_size),
+                                        max_aggregation_size)
 
     def register(self, dcc_obj, reg_entity_id):
         return RegisteredMetric(self, dcc_obj, reg_entity_id)
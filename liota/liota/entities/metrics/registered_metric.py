@@ -30,18 +30,44 @@
 #  THE POSSIBILITY OF SUCH DAMAGE.                                            #
 # ----------------------------------------------------------------------------#
 
-from Queue import Queue
 import inspect
 import logging
+import multiprocessing
+import zlib
 from liota.core import metric_handler
+from liota.core.sample_buffer import split_array_batch
 from liota.entities.registered_entity import RegisteredEntity
 from liota.lib.utilities.utility import getUTCmillis
 
 
 log = logging.getLogger(__name__)
 
+# Maximum number of intervals a metric backs off after repeated overruns
+MAX_BACKOFF_INTERVALS = 64
+
+# Adaptive aggregation size grows while publish latency is below this
+# fraction of the latency SLO
+ADAPTIVE_HEADROOM = 0.8
+
 
 class RegisteredMetric(RegisteredEntity):
+    """
+    A Metric registered to a DCC, with its collected values and scheduling
+    state.
+
+    Attributes are declared in __slots__, as a gateway may register a great
+    many metrics.  msg_attr is left unset unless a DCC or application sets
+    it, so hasattr() tells whether a metric has its own messaging
+    attributes.
+    """
+    __slots__ = ('flag_alive', '_next_run_time', '_event_handle',
+                 'current_aggregation_size', 'effective_aggregation_size',
+                 '_aggregation_start', 'overrun_count', 'deadline_miss_count',
+                 'missed_intervals', 'scheduling_lag',
+                 'missed_deadline_policy', 'max_catch_up', 'scheduling_phase',
+                 '_sampling_args', '_overrun', '_consecutive_overruns',
+                 'dropped_values', 'dropped_collections', 'dropped_sends',
+                 'values', 'args_required', 'collected_data', 'msg_attr')
 
     def __init__(self, ref_metric, ref_dcc, reg_entity_id):
         super(RegisteredMetric, self).__init__(ref_entity=ref_metric,
@@ -49,30 +75,69 @@ class RegisteredMetric(RegisteredEntity):
                                   reg_entity_id=reg_entity_id)
         self.flag_alive = False
         self._next_run_time = None
+        # Entry of this metric in metric_handler.event_ds, while it is queued
+        self._event_handle = None
         self.current_aggregation_size = 0
+        # Number of values sent together, adjusted by adapt_aggregation_size()
+        # if the metric has a max_aggregation_size
+        self.effective_aggregation_size = ref_metric.aggregation_size
+        # Time in ms the first value counted in current_aggregation_size
+        # was buffered
+        self._aggregation_start = None
+        # Collections that exceeded sampling_timeout
+        self.overrun_count = 0
+        # Collections that completed after the next run time had passed
+        self.deadline_miss_count = 0
+        # Run times skipped or coalesced by missed_deadline_policy
+        self.missed_intervals = 0
+        # Delay in ms of the latest collection behind its run time
+        self.scheduling_lag = 0
+        self.missed_deadline_policy, self.max_catch_up = \
+            metric_handler.get_missed_deadline_policy(ref_metric)
+        self.scheduling_phase = metric_handler.get_scheduling_phase(ref_metric)
+        # Arguments of sampling_function, see _get_sampling_args()
+        self._sampling_args = None
+        self._overrun = False
+        self._consecutive_overruns = 0
+        # Values, collections and sends dropped because a queue was full
+        self.dropped_values = 0
+        self.dropped_collections = 0
+        self.dropped_sends = 0
         # -------------------------------------------------------------------
-        # Elements in this queue are (ts, v) pairs.
+        # SampleBuffer of (ts, v) pairs.
         #
-        self.values = Queue()
+        self.values = metric_handler.create_value_buffer(self)
 
     def start_collecting(self):
         self.flag_alive = True
         # TODO: Add a check to ensure that start_collecting for a metric is
         # called only once by the client code
         metric_handler.initialize()
-        self._next_run_time = getUTCmillis() + (self.ref_entity.interval * 1000)
+        metric_handler.register_metric(self)
+        if self.ref_entity.sampling_function is not None:
+            self._get_sampling_args()
+        self._next_run_time = self.get_first_run_time(getUTCmillis())
         metric_handler.event_ds.put_and_notify(self)
 
     def stop_collecting(self):
         self.flag_alive = False
+        metric_handler.deregister_metric(self)
+        if metric_handler.event_ds is not None:
+            metric_handler.event_ds.remove(self)
+        # Release samples that will never be sent
+        self.values.clear()
         log.debug("Metric %s is marked for deletion" %
                  str(self.ref_entity.name))
 
     def add_collected_data(self, collected_data):
         if isinstance(collected_data, list):
-            for data_sample in collected_data:
-                self.values.put(data_sample)
+            self.values.put_many(collected_data)
             return len(collected_data)
+        batch = split_array_batch(collected_data)
+        if batch is not None:
+            # NumPy arrays of timestamps and values
+            self.values.put_arrays(*batch)
+            return len(batch[0])
         elif isinstance(collected_data, tuple):
             self.values.put(collected_data)
             return 1
@@ -80,44 +145,263 @@ class RegisteredMetric(RegisteredEntity):
             self.values.put((getUTCmillis(), collected_data))
             return 1
 
+    def get_first_run_time(self, now):
+        """
+        Returns the first run time of the metric according to its
+        scheduling_phase.
+
+        :param now: Time in ms at which collection starts
+        :return: Time in ms
+        """
+        interval = self.ref_entity.interval * 1000
+        if self.scheduling_phase is metric_handler.SchedulingPhase.NONE \
+                or interval <= 0:
+            return now + interval
+        offset = 0
+        if self.scheduling_phase is metric_handler.SchedulingPhase.SPREAD:
+            offset = (zlib.crc32(str(self.ref_entity.entity_id))
+                      & 0xffffffff) % interval
+        first_run_time = now - now % interval + offset
+        if first_run_time <= now:
+            first_run_time += interval
+        return first_run_time
+
     def get_next_run_time(self):
         return self._next_run_time
 
     def set_next_run_time(self):
-        self._next_run_time = self._next_run_time + \
-            (self.ref_entity.interval * 1000)
-        log.debug("Set next run time to:" + str(self._next_run_time))
+        now = getUTCmillis()
+        if self._overrun:
+            # Back off exponentially while collections keep overrunning
+            self._overrun = False
+            backoff = min(2 ** self._consecutive_overruns,
+                          MAX_BACKOFF_INTERVALS)
+            interval = self.ref_entity.interval * 1000
+            next_run_time = now + interval * backoff
+            if interval > 0 and self._next_run_time is not None:
+                # Stay on the run times of the metric, which keep its
+                # scheduling_phase
+                missed = -(-(next_run_time - self._next_run_time) // interval)
+                next_run_time = self._next_run_time + missed * interval
+            self._next_run_time = next_run_time
+            log.warning("Metric %s overran its sampling timeout, backing off "
+                        "for %d intervals" % (self.ref_entity.name, backoff))
+        else:
+            self._consecutive_overruns = 0
+            interval = self.ref_entity.interval * 1000
+            self._next_run_time = self._next_run_time + interval
+            if self._next_run_time < now:
+                self.deadline_miss_count += 1
+                if interval > 0:
+                    self._skip_missed_run_times(now, interval)
+        log.debug("Set next run time to: %s", self._next_run_time)
+
+    def _skip_missed_run_times(self, now, interval):
+        """
+        Moves the next run time, which has already passed, according to
+        missed_deadline_policy.  Run times stay aligned on the interval.
+
+        :param now: Current time in ms
+        :param interval: Interval of the metric in ms
+        :return: None
+        """
+        # Number of run times that have passed, the next one included
+        missed = int((now - self._next_run_time) // interval) + 1
+        policy = self.missed_deadline_policy
+        if policy is metric_handler.MissedDeadlinePolicy.SKIP:
+            skip = missed
+        elif policy is metric_handler.MissedDeadlinePolicy.COALESCE:
+            skip = missed - 1
+        elif self.max_catch_up is not None:
+            skip = max(0, missed - self.max_catch_up)
+        else:
+            skip = 0
+        if skip > 0:
+            self._next_run_time += skip * interval
+            self.missed_intervals += skip
+            log.debug("Metric %s missed %d run times"
+                      % (self.ref_entity.name, skip))
+
+    def record_overrun(self):
+        """
+        Records that the current collection exceeded sampling_timeout.  It is
+        counted once per collection, and makes the metric back off when it
+        is rescheduled.
+
+        :return: None
+        """
+        if self._overrun:
+            return
+        self._overrun = True
+        self._consecutive_overruns += 1
+        self.overrun_count += 1
+
+    def record_value_drop(self, value):
+        """
+        Called by values when a (ts, v) pair is dropped because the buffer
+        is full.
+
+        :param value: Dropped (ts, v) pair
+        :return: None
+        """
+        self.dropped_values += 1
+        log.debug("Buffer of %s full, dropped value: %s",
+                  self.ref_entity.name, value)
 
     def is_ready_to_send(self):
-        log.debug("self.current_aggregation_size:" +
-                  str(self.current_aggregation_size))
-        log.debug("self.aggregation_size:" +
-                  str(self.ref_entity.aggregation_size))
-        return self.current_aggregation_size >= self.ref_entity.aggregation_size
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("self.current_aggregation_size: %d, "
+                      "self.effective_aggregation_size: %d"
+                      % (self.current_aggregation_size,
+                         self.effective_aggregation_size))
+        if self.current_aggregation_size >= self.effective_aggregation_size:
+            return True
+        # Send values buffered for too long, however few they are
+        max_flush_latency = self.ref_entity.max_flush_latency
+        return max_flush_latency is not None \
+            and self.current_aggregation_size > 0 \
+            and getUTCmillis() - self._aggregation_start >= \
+            max_flush_latency * 1000
 
     def collect(self):
-        log.debug("Collecting values for the resource {0} ".format(
-            self.ref_entity.name))
+        log.debug("Collecting values for the resource %s",
+                  self.ref_entity.name)
+        args = self._sampling_args
+        if args is None:
+            args = self._get_sampling_args()
+        if self.ref_entity.execution_mode is \
+                metric_handler.ExecutionMode.PROCESS:
+            pool = metric_handler.get_process_pool()
+            result = pool.apply_async(self.ref_entity.sampling_function, args)
+            try:
+                collected_data = metric_handler.get_process_result(
+                    pool, result, self.ref_entity.sampling_timeout)
+            except multiprocessing.TimeoutError:
+                log.error("Sampling function of %s timed out"
+                          % self.ref_entity.name)
+                self.record_overrun()
+                # The worker is still running the sampling function
+                metric_handler.recycle_process_pool(pool)
+                return
+            except RuntimeError:
+                log.warning("Process pool was recycled while collecting %s"
+                            % self.ref_entity.name)
+                return
+        else:
+            collected_data = self.ref_entity.sampling_function(*args)
+        self.store_collected_data(collected_data)
+
+    def start_coroutine(self):
+        """
+        Creates the coroutine collecting values of a metric in
+        ExecutionMode.COROUTINE.
+
+        :return: Generator object
+        """
+        log.debug("Collecting values for the resource %s",
+                  self.ref_entity.name)
+        args = self._sampling_args
+        if args is None:
+            args = self._get_sampling_args()
+        return self.ref_entity.sampling_function(*args)
+
+    def _get_sampling_args(self):
+        """
+        Resolves the arguments passed to sampling_function once, instead of
+        inspecting it at every collection.
+
+        :return: Tuple of arguments
+        """
         self.args_required = len(inspect.getargspec(
             self.ref_entity.sampling_function)[0])
-        if self.args_required is not 0:
-            self.collected_data = self.ref_entity.sampling_function(1)
-        else:
-            self.collected_data = self.ref_entity.sampling_function()
-        log.debug("Size of the queue {0}".format(self.values.qsize()))
+        self._sampling_args = (1,) if self.args_required is not 0 else ()
+        return self._sampling_args
+
+    def store_collected_data(self, collected_data):
+        """
+        Adds data returned by the sampling function to values, after
+        filtering it with the filter_pipeline of the Metric, if any.
+
+        :param collected_data: Value, (ts, v) tuple or list of tuples
+        :return: None
+        """
+        if self.ref_entity.filter_pipeline is not None \
+                and collected_data is not None:
+            collected_data = self._filter_collected_data(collected_data)
+        self.collected_data = collected_data
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Size of the queue %d" % self.values.qsize())
         #  Sampling function might return 'None' because of filtering
         if self.collected_data is not None:
-            log.info("{0} Sample Value: {1}".format(
-                self.ref_entity.name, self.collected_data))
+            if log.isEnabledFor(logging.INFO):
+                log.info("%s Sample Value: %s"
+                         % (self.ref_entity.name, self.collected_data))
+            if not self.current_aggregation_size:
+                self._aggregation_start = getUTCmillis()
             no_of_values_added = self.add_collected_data(self.collected_data)
             self.current_aggregation_size = self.current_aggregation_size + no_of_values_added
 
+    def _filter_collected_data(self, collected_data):
+        """
+        Applies the filter_pipeline of the Metric to data returned by the
+        sampling function.  A single value is timestamped first, so that
+        the pipeline sees when it was collected.
+
+        :param collected_data: Value, (ts, v) tuple, list of tuples or
+                               NumPy arrays
+        :return: Data passed, in a form add_collected_data() accepts, or
+                 None if all values were rejected
+        """
+        pipeline = self.ref_entity.filter_pipeline
+        batch = split_array_batch(collected_data)
+        if batch is not None:
+            passed = pipeline.filter_arrays(*batch)
+            if isinstance(passed, tuple):
+                if not len(passed[1]):
+                    return None
+                if split_array_batch(passed) is not None:
+                    return passed
+                passed = zip(*passed)
+        elif isinstance(collected_data, list):
+            passed = pipeline.filter_batch(collected_data)
+        elif isinstance(collected_data, tuple):
+            passed = pipeline.filter_batch([collected_data])
+        else:
+            passed = pipeline.filter_batch([(getUTCmillis(), collected_data)])
+        if not passed:
+            return None
+        return passed[0] if len(passed) == 1 else passed
+
+    def adapt_aggregation_size(self, latency, latency_slo):
+        """
+        Adjusts effective_aggregation_size of a metric with a
+        max_aggregation_size after its values were published: it grows by
+        one while publish latency is well below the SLO, and is halved when
+        latency exceeds it, within the bounds of the Metric.
+
+        :param latency: Moving average of publish latency of the DCC in ms
+        :param latency_slo: Publish latency not to exceed in ms
+        :return: None
+        """
+        metric = self.ref_entity
+        if metric.max_aggregation_size is None:
+            return
+        size = self.effective_aggregation_size
+        if latency > latency_slo:
+            size = max(metric.min_aggregation_size, size // 2)
+        elif latency < latency_slo * ADAPTIVE_HEADROOM:
+            size = min(metric.max_aggregation_size, size + 1)
+        if size != self.effective_aggregation_size:
+            log.debug("Aggregation size of %s set to %d (latency: %.1f ms)",
+                      metric.name, size, latency)
+            self.effective_aggregation_size = size
+
     def reset_aggregation_size(self):
         self.current_aggregation_size = 0
 
     def send_data(self):
-        log.info("Publishing values for the resource {0} ".format(
-            self.ref_entity.name))
+        log.info("Publishing values for the resource %s",
+                 self.ref_entity.name)
         if not self.values:
             # No values measured since last report_data
             return True
@@ -131,4 +415,5 @@ class RegisteredMetric(RegisteredEntity):
             return -1
         if not isinstance(other, RegisteredMetric):
             return -1
-        return cmp(self._next_run_time, other._next_run_time)
+        return cmp((self._next_run_time, self.ref_entity.priority.value),
+                   (other._next_run_time, other.ref_entity.priority.value))
@@ -31,6 +31,7 @@
 # ----------------------------------------------------------------------------#
 
 class RegisteredEntity(object):
+    __slots__ = ('ref_entity', 'ref_dcc', 'reg_entity_id', 'parent')
 
     def __init__(self, ref_entity, ref_dcc, reg_entity_id):
         self.ref_entity = ref_entity
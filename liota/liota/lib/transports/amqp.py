@@ -293,7 +293,7 @@ class Amqp:
         :param message: Message to be published
         :type message: str or unicode
         :param bool exchange_durable: Value to survive exchange on RabbitMQ reboot
-        :return:
+        :return: True if the message was published, False otherwise
         """
 
         try:
@@ -303,8 +303,10 @@ class Amqp:
                                    delivery_mode=properties['delivery_mode'],
                                    headers=properties['headers'])
             log.info("Published to exchange: {0} with routing-key: {1}".format(exchange_name, routing_key))
+            return True
         except Exception:
             log.exception("AMQP publish exception traceback...")
+            return False
 
     def consume(self, consume_msg_attr_list):
         """
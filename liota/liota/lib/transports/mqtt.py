@@ -300,15 +300,17 @@ class Mqtt():
         :param message: Message to be published
         :param qos: Publish QoS
         :param retain: Message to be retained or not
-        :return:
+        :return: True if the message was accepted by the client, False otherwise
         """
         # TODO: Retry logic to be designed
         try:
             mess_info = self._paho_client.publish(topic, message, qos, retain)
             log.info("Publishing Message ID : {0} with result code : {1} ".format(mess_info.mid, mess_info.rc))
             log.debug("Published Topic:{0}, Payload:{1}, QoS:{2}".format(topic, message, qos))
+            return mess_info.rc == paho.MQTT_ERR_SUCCESS
         except Exception:
             log.exception("MQTT Publish exception traceback..")
+            return False
 
     def subscribe(self, topic, qos, callback):
         """
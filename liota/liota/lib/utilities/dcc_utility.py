@@ -70,15 +70,12 @@ def get_formatted_data(reg_metric, enclose_metadata):
     :param enclose_metadata: Include Gateway, Device and Metric names as part of payload or not
     :return: Payload in JSON format or None
     """
-    met_cnt = reg_metric.values.qsize()
-    if 0 == met_cnt:
+    _timestamps, _values = reg_metric.values.drain()
+    if not _timestamps:
         return
 
-    _list = []
-    for _ in range(met_cnt):
-        m = reg_metric.values.get(block=True)
-        if m is not None:
-            _list.append(OrderedDict([('value', m[1]), ('timestamp', m[0])]))
+    _list = [OrderedDict([('value', v), ('timestamp', ts)])
+             for ts, v in zip(_timestamps, _values)]
 
     payload = OrderedDict()
     if enclose_metadata:
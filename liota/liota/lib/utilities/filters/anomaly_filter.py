@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import logging
+from numbers import Number
+
+from aenum import UniqueEnum
+
+from liota.lib.utilities.filters.ewma_filter import EwmaFilter
+from liota.lib.utilities.filters.filter import Filter
+from liota.lib.utilities.filters.quantile_filter import RollingQuantile
+
+log = logging.getLogger(__name__)
+
+#  Scales the median absolute deviation of normally distributed values to their standard deviation
+MAD_SCALE = 1.4826
+
+
+class Method(UniqueEnum):
+    """
+    How AnomalyFilter learns the baseline of values and scores their deviation from it.
+    """
+    ZSCORE = "zscore"  # Deviation from the exponentially weighted mean, in exponentially weighted standard deviations
+    MAD = "mad"  # Deviation from the rolling median, in scaled rolling median absolute deviations
+
+
+class AnomalyFilter(Filter):
+    """
+    Passes only values which deviate from the baseline learned from the values before them, by more than threshold
+    times their usual spread.
+
+    With Method.ZSCORE, the baseline is the exponentially weighted mean and standard deviation of values (see
+    EwmaFilter).  With Method.MAD, it is the median and the median absolute deviation of the latest window_size to
+    2 * window_size values (see RollingQuantile), which outliers do not skew.  Either way the baseline follows a
+    drifting signal in constant memory.  Values passed still update the baseline, so a lasting shift stops being
+    passed once learned.
+
+    No value is passed until min_samples values were seen.  Use AnomalyGate to still report a value once per window
+    while no value deviates.
+    """
+
+    def __init__(self, threshold=3.0, method=Method.ZSCORE, alpha=0.05, window_size=200, min_samples=10):
+        """
+        :param threshold: Score above which values are passed.
+        :param method: Any one Method.
+        :param alpha: Weight of the newest value in the mean and standard deviation, for Method.ZSCORE.
+        :param window_size: Number of values the median and median absolute deviation are estimated over, for
+                            Method.MAD.
+        :param min_samples: Number of values to see before passing any.
+        """
+        if method not in Method:
+            log.error("Unsupported Method.")
+            raise TypeError("Unsupported Method.")
+        if not isinstance(threshold, Number) or threshold < 0:
+            log.error("threshold must be a non negative number")
+            raise ValueError("threshold must be a non negative number")
+        self.threshold = threshold
+        self.method = method
+        self.min_samples = min_samples
+        if method is Method.ZSCORE:
+            self._ewma = EwmaFilter(alpha)
+        else:
+            self._median = RollingQuantile(0.5, window_size)
+            self._mad = RollingQuantile(0.5, window_size)
+        #  Number of values seen
+        self.count = 0
+        #  Score of the latest value, None while fewer than min_samples values were seen
+        self.score = None
+
+    def _score(self, v):
+        """
+        Scores a value against the baseline, then adds it to the baseline.
+
+        :param v: Value, a number
+        :return: Score
+        """
+        if self.method is Method.ZSCORE:
+            ewma = self._ewma
+            deviation = abs(v - ewma.mean) if ewma.mean is not None else 0.0
+            spread = ewma.std
+            ewma.update(v)
+        else:
+            median = self._median.value()
+            deviation = abs(v - median) if median is not None else 0.0
+            spread = MAD_SCALE * (self._mad.value() or 0.0)
+            self._median.add(v)
+            self._mad.add(abs(v - self._median.value()))
+        if spread:
+            return deviation / spread
+        #  Constant values so far: any change deviates
+        return float("inf") if deviation else 0.0
+
+    def filter(self, v):
+        """
+        AnomalyFilter Implementation.
+
+        :param v: Collected value
+        :return: v if it deviates from the baseline, else None
+        """
+        if not isinstance(v, Number):
+            log.warn("Value is not a number. Returning without applying filter")
+            return v
+        score = self._score(v)
+        self.count += 1
+        if self.count <= self.min_samples:
+            return None
+        self.score = score
+        if score > self.threshold:
+            log.debug("Value deviates from baseline : %s (score %.2f)", v, score)
+            return v
+        return None
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import logging
+from numbers import Number
+
+from liota.lib.utilities.filters.filter import Filter
+
+log = logging.getLogger(__name__)
+
+
+class DeadbandFilter(Filter):
+    """
+    Passes a value only if it differs from the last value passed by more than epsilon, so a steady signal is not
+    reported at every interval.
+
+    With relative=True, epsilon is a fraction of the last value passed, e.g. 0.01 to report changes larger than 1%.
+    The first value is always passed.  Wrap it in a WindowingScheme to still report a value once per window while
+    the signal stays within the deadband.
+    """
+
+    def __init__(self, epsilon, relative=False):
+        """
+        :param epsilon: Change to exceed, absolute or relative to the last value passed.
+        :param relative: Whether epsilon is relative.
+        """
+        if not isinstance(epsilon, Number):
+            log.error("epsilon must be a number")
+            raise TypeError("epsilon must be a number")
+        if epsilon < 0:
+            log.error("epsilon must be a non negative number")
+            raise ValueError("epsilon must be a non negative number")
+        self.epsilon = epsilon
+        self.relative = relative
+        #  Last value passed, None until the first one
+        self.last_value = None
+
+    def _exceeds(self, v):
+        last_value = self.last_value
+        if last_value is None:
+            return True
+        if self.relative:
+            return abs(v - last_value) > self.epsilon * abs(last_value)
+        return abs(v - last_value) > self.epsilon
+
+    def filter(self, v):
+        """
+        DeadbandFilter Implementation.
+
+        :param v: Collected value
+        :return: v if it is out of the deadband, else None
+        """
+        if not isinstance(v, Number):
+            log.warn("Value is not a number. Returning without applying filter")
+            return v
+        if self._exceeds(v):
+            self.last_value = v
+            return v
+        log.debug("Value within deadband : %s", v)
+        return None
+
+    def filter_batch(self, samples):
+        """
+        Applies the filter to a batch of samples, as returned by a sampling function.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of the samples passed
+        """
+        passed = []
+        last_value = self.last_value
+        epsilon = self.epsilon
+        relative = self.relative
+        for sample in samples:
+            v = sample[1]
+            if not isinstance(v, Number):
+                passed.append(sample)
+                continue
+            if last_value is not None:
+                change = abs(v - last_value)
+                if change <= (epsilon * abs(last_value) if relative else epsilon):
+                    continue
+            last_value = v
+            passed.append(sample)
+        self.last_value = last_value
+        return passed
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import logging
+import math
+from numbers import Number
+
+from liota.lib.utilities.filters.filter import Filter
+
+log = logging.getLogger(__name__)
+
+
+class EwmaFilter(Filter):
+    """
+    Smooths values with an exponentially weighted moving average, and tracks their exponentially weighted variance.
+
+    Each value updates the mean and the variance in constant time and memory.  The weight of a value decays by a
+    factor 1 - alpha with every newer value, so the statistics follow a drifting baseline; a larger alpha follows it
+    faster but smooths less.  filter() returns the mean, which damps sensor noise, and the variance tells how noisy
+    values are around it.
+    """
+
+    def __init__(self, alpha):
+        """
+        :param alpha: Weight of the newest value, between 0 (excluded) and 1.
+        """
+        if not isinstance(alpha, Number):
+            log.error("alpha must be a number")
+            raise TypeError("alpha must be a number")
+        if not 0 < alpha <= 1:
+            log.error("alpha must be larger than 0 and at most 1")
+            raise ValueError("alpha must be larger than 0 and at most 1")
+        self.alpha = alpha
+        #  Exponentially weighted mean, None until the first value
+        self.mean = None
+        #  Exponentially weighted variance
+        self.variance = 0.0
+        #  Number of values seen
+        self.count = 0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def update(self, v):
+        """
+        Adds a value to the statistics.
+
+        :param v: Value, a number
+        :return: None
+        """
+        if self.mean is None:
+            self.mean = float(v)
+        else:
+            diff = v - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+    def filter(self, v):
+        """
+        EwmaFilter Implementation.
+
+        :param v: Collected value
+        :return: Mean of the values collected so far, v included
+        """
+        if not isinstance(v, Number):
+            log.warn("Value is not a number. Returning without applying filter")
+            return v
+        self.update(v)
+        return self.mean
@@ -31,8 +31,15 @@
 # ----------------------------------------------------------------------------#
 
 from abc import ABCMeta, abstractmethod
+from array import array
+from itertools import compress
 import logging
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 log = logging.getLogger(__name__)
 
 
@@ -46,6 +53,10 @@ class Filter:
     """
     __metaclass__ = ABCMeta
 
+    #  Whether filter() passes or rejects each value on its own, returning it unchanged.  A FilterPipeline fuses
+    #  consecutive stateless filters into a single pass over the values.
+    stateless = False
+
     @abstractmethod
     def __init__(self):
         pass
@@ -59,3 +70,63 @@ class Filter:
         :return: Filtered value or None
         """
         pass
+
+    def accepts(self, v):
+        """
+        Tells whether filter() passes a value.  Stateless child classes may override it with a cheaper test.
+
+        :param v: Collected value
+        :return: True or False
+        """
+        return self.filter(v) is not None
+
+    def filter_batch(self, samples):
+        """
+        Filters a batch of samples, applying filter() to each value in order.  Child classes may override it, e.g.
+        to use the samples' timestamps rather than the clock.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of (ts, filtered value) tuples passed
+        """
+        passed = []
+        for ts, v in samples:
+            v = self.filter(v)
+            if v is not None:
+                passed.append((ts, v))
+        return passed
+
+    def mask(self, values):
+        """
+        Tells which of many values filter() passes, applying it to each value in order.  Child classes may
+        override it with a vectorised implementation.
+
+        :param values: NumPy array, array or list of values
+        :return: NumPy array of booleans if values is a NumPy array, else list of booleans
+        """
+        passed = [self.filter(v) is not None for v in values]
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return numpy.array(passed, dtype=bool)
+        return passed
+
+
+def select(timestamps, values, mask):
+    """
+    Selects the samples for which mask is True.
+
+    :param timestamps: NumPy array, array or list of timestamps
+    :param values: NumPy array, array or list of values, same length
+    :param mask: NumPy array or list of booleans, same length
+    :return: Tuple of timestamps and values selected, of the same types as given
+    """
+    if len(timestamps) != len(values) or len(values) != len(mask):
+        raise ValueError("Timestamps, values and mask differ in length: %d, %d, %d"
+                         % (len(timestamps), len(values), len(mask)))
+    return _select(timestamps, mask), _select(values, mask)
+
+
+def _select(items, mask):
+    if numpy is not None and isinstance(items, numpy.ndarray):
+        return items[numpy.asarray(mask, dtype=bool)]
+    if isinstance(items, array):
+        return array(items.typecode, compress(items, mask))
+    return list(compress(items, mask))
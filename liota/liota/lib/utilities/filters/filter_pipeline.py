@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from collections import namedtuple
+import logging
+import time
+
+from liota.lib.utilities.filters.filter import Filter, select
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+log = logging.getLogger(__name__)
+
+#  Counters of a stage of a FilterPipeline.  Stages fused into one step are timed together: time_ms is the time
+#  spent in the step, the same for all its stages.
+StageStats = namedtuple("StageStats", ["name", "step", "passed", "rejected", "time_ms"])
+
+
+class FilterPipeline(Filter):
+    """
+    Chains Filter stages, each stage filtering the values passed by the previous one.
+
+    A pipeline is attached to a Metric with its filter_pipeline option, and then filters collected values before
+    they are buffered, whatever the sampling function returns: a value, a (ts, v) tuple, a list of them or NumPy
+    arrays.  Values are timestamped when collected, so stages which support batches see the samples' timestamps.
+
+    When created, the pipeline is compiled into steps: consecutive stateless stages (see Filter.stateless) are fused
+    into one step, which tests each value against all of them in a single pass, and every other stage is a step of
+    its own.  The pipeline counts values passed and rejected by each stage and the time spent in each step, see
+    get_stats().
+
+    Stages keep state such as windows, so a pipeline must not be shared between metrics.
+    """
+
+    def __init__(self, *stages):
+        """
+        :param stages: Filters, in the order they are applied.
+        """
+        if not stages or not all(isinstance(stage, Filter) for stage in stages):
+            log.error("Stages must be Filters")
+            raise TypeError("Stages must be Filters")
+        self.stages = stages
+        self._passed = [0] * len(stages)
+        self._rejected = [0] * len(stages)
+        self._plan = self._compile()
+        self._time = [0.0] * len(self._plan)
+
+    def _compile(self):
+        """
+        Groups the stages into steps.
+
+        :return: List of lists of indices of stages, one list per step
+        """
+        plan = []
+        for i, stage in enumerate(self.stages):
+            if stage.stateless and plan and self.stages[plan[-1][-1]].stateless:
+                plan[-1].append(i)
+            else:
+                plan.append([i])
+        return plan
+
+    def filter(self, v):
+        """
+        Applies the stages to one value.
+
+        :param v: Collected value
+        :return: Filtered value or None
+        """
+        for step, indices in enumerate(self._plan):
+            start = time.time()
+            for i in indices:
+                stage = self.stages[i]
+                if stage.stateless:
+                    if not stage.accepts(v):
+                        v = None
+                else:
+                    v = stage.filter(v)
+                if v is None:
+                    self._rejected[i] += 1
+                    break
+                self._passed[i] += 1
+            self._time[step] += time.time() - start
+            if v is None:
+                return None
+        return v
+
+    def filter_batch(self, samples):
+        """
+        Applies the stages to a batch of samples.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of the samples passed
+        """
+        for step, indices in enumerate(self._plan):
+            if not samples:
+                break
+            start = time.time()
+            samples = self._filter_step(indices, samples)
+            self._time[step] += time.time() - start
+        return samples
+
+    def _filter_step(self, indices, samples):
+        if len(indices) > 1:
+            return self._filter_fused(indices, samples)
+        i = indices[0]
+        passed = self.stages[i].filter_batch(samples)
+        self._count(i, len(samples), len(passed))
+        return passed
+
+    def _filter_fused(self, indices, samples):
+        accepts = [self.stages[i].accepts for i in indices]
+        rejected = [0] * len(indices)
+        passed = []
+        for sample in samples:
+            v = sample[1]
+            for j, accept in enumerate(accepts):
+                if not accept(v):
+                    rejected[j] += 1
+                    break
+            else:
+                passed.append(sample)
+        num_samples = len(samples)
+        for i, num_rejected in zip(indices, rejected):
+            self._count(i, num_samples, num_samples - num_rejected)
+            num_samples -= num_rejected
+        return passed
+
+    def filter_arrays(self, timestamps, values):
+        """
+        Applies the stages to samples given as parallel arrays of timestamps and values.  Fused steps compute one
+        mask per stage, vectorised with NumPy arrays.  From the first stage that does not support arrays on, samples
+        are filtered as a list of (ts, v) tuples.
+
+        :param timestamps: NumPy array, array or list of timestamps
+        :param values: NumPy array, array or list of values, same length
+        :return: Tuple of timestamps and values passed, of the same types as given, or list of (ts, v) tuples
+        """
+        samples = None
+        for step, indices in enumerate(self._plan):
+            start = time.time()
+            if samples is not None:
+                if not samples:
+                    break
+                samples = self._filter_step(indices, samples)
+            elif not len(values):
+                break
+            elif len(indices) > 1:
+                timestamps, values = self._filter_fused_arrays(indices, timestamps, values)
+            elif hasattr(self.stages[indices[0]], "filter_arrays"):
+                passed = self.stages[indices[0]].filter_arrays(timestamps, values)
+                if isinstance(passed, list):
+                    # Samples, e.g. of a WindowAggregator
+                    self._count(indices[0], len(values), len(passed))
+                    samples = passed
+                else:
+                    self._count(indices[0], len(values), len(passed[1]))
+                    timestamps, values = passed
+            else:
+                samples = self._filter_step(indices, zip(_tolist(timestamps), _tolist(values)))
+            self._time[step] += time.time() - start
+        if samples is not None:
+            return samples
+        return timestamps, values
+
+    def _filter_fused_arrays(self, indices, timestamps, values):
+        is_array = numpy is not None and isinstance(values, numpy.ndarray)
+        mask = None
+        for i in indices:
+            stage_mask = self.stages[i].mask(values)
+            if mask is None:
+                num_samples = len(values)
+                mask = stage_mask
+            elif is_array:
+                num_samples = int(numpy.count_nonzero(mask))
+                mask = mask & stage_mask
+            else:
+                num_samples = sum(mask)
+                mask = [m and s for m, s in zip(mask, stage_mask)]
+            self._count(i, num_samples, int(numpy.count_nonzero(mask)) if is_array else sum(mask))
+        return select(timestamps, values, mask)
+
+    def _count(self, i, num_samples, num_passed):
+        self._passed[i] += num_passed
+        self._rejected[i] += max(num_samples - num_passed, 0)
+
+    def get_stats(self):
+        """
+        Returns counters of each stage.
+
+        :return: List of StageStats, one per stage
+        """
+        step_of = dict((i, step) for step, indices in enumerate(self._plan) for i in indices)
+        return [StageStats(stage.__class__.__name__, step_of[i], self._passed[i], self._rejected[i],
+                           self._time[step_of[i]] * 1000)
+                for i, stage in enumerate(self.stages)]
+
+
+def _tolist(items):
+    if numpy is not None and isinstance(items, numpy.ndarray):
+        return items.tolist()
+    return list(items)
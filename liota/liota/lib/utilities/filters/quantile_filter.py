@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from bisect import insort
+import logging
+from numbers import Number
+
+from liota.lib.utilities.filters.filter import Filter
+
+log = logging.getLogger(__name__)
+
+
+class P2Quantile(object):
+    """
+    Estimates a quantile of a stream of values with the P-square algorithm of Jain and Chlamtac, keeping 5 markers
+    instead of the values.  The estimate is exact for up to 5 values.
+    """
+    __slots__ = ('p', 'count', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p):
+        """
+        :param p: Quantile to estimate, between 0 and 1, e.g. 0.5 for the median.
+        """
+        self.p = p
+        self.count = 0
+        #  Heights of the markers, the values themselves until there are 5
+        self._heights = []
+        self._positions = None
+        self._desired = None
+        self._increments = None
+
+    def add(self, x):
+        """
+        Adds a value to the stream.
+
+        :param x: Value, a number
+        :return: None
+        """
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            insort(q, x)
+            if self.count == 5:
+                p = self.p
+                self._positions = [1, 2, 3, 4, 5]
+                self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+                self._increments = [0, p / 2.0, p, (1 + p) / 2.0, 1]
+            return
+        n = self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 1
+        elif x >= q[4]:
+            q[4] = x
+            k = 4
+        else:
+            k = 1
+            while x >= q[k]:
+                k += 1
+        for i in range(k, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + float(d) / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / float(n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / float(n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    #  Parabolic prediction out of order, adjust linearly
+                    height = q[i] + d * (q[i + d] - q[i]) / float(n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def value(self):
+        """
+        :return: Estimate of the quantile, or None if no value was added
+        """
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return self._heights[int(round(self.p * (self.count - 1)))]
+        return self._heights[2]
+
+
+class RollingQuantile(object):
+    """
+    Estimates a quantile of the latest values of a stream, with two P2Quantile estimators taking turns: one is fed
+    window_size values, then replaces the estimate of the previous one and a new one starts.  The estimate thus
+    covers between window_size and 2 * window_size of the latest values, and follows a drifting stream in constant
+    memory.
+    """
+    __slots__ = ('p', 'window_size', '_current', '_previous')
+
+    def __init__(self, p, window_size):
+        """
+        :param p: Quantile to estimate, between 0 and 1.
+        :param window_size: Number of values each estimator is fed.
+        """
+        self.p = p
+        self.window_size = window_size
+        self._current = P2Quantile(p)
+        self._previous = None
+
+    @property
+    def count(self):
+        """
+        :return: Number of values the estimate covers
+        """
+        return self._current.count + (self._previous.count if self._previous is not None else 0)
+
+    def add(self, x):
+        if self._current.count >= self.window_size:
+            self._previous = self._current
+            self._current = P2Quantile(self.p)
+        self._current.add(x)
+
+    def value(self):
+        """
+        :return: Estimate of the quantile, or None if no value was added
+        """
+        if self._previous is None:
+            return self._current.value()
+        if self._current.count < 5:
+            return self._previous.value()
+        #  Weigh both estimates by the number of values they cover
+        return (self._previous.value() * self._previous.count + self._current.value() * self._current.count) / \
+            float(self._previous.count + self._current.count)
+
+
+class QuantileFilter(Filter):
+    """
+    Passes only values below the lower_quantile or above the upper_quantile of the latest values, e.g. below the 1st
+    or above the 99th percentile, unlike RangeFilter bounds which do not follow a drifting signal.
+
+    Quantiles are estimated with RollingQuantile, over the latest window_size to 2 * window_size values.  A value is
+    tested against the quantiles of the values before it, and no value is passed until min_samples values were seen.
+    Wrap it in a WindowingScheme to still report a value once per window.
+    """
+
+    def __init__(self, lower_quantile=None, upper_quantile=None, window_size=1000, min_samples=20):
+        """
+        :param lower_quantile: Quantile below which values are passed, or None.
+        :param upper_quantile: Quantile above which values are passed, or None.
+        :param window_size: Number of values quantiles are estimated over.
+        :param min_samples: Number of values to see before passing any.
+        """
+        if lower_quantile is None and upper_quantile is None:
+            log.error("lower_quantile or upper_quantile must be set")
+            raise TypeError("lower_quantile or upper_quantile must be set")
+        for quantile in (lower_quantile, upper_quantile):
+            if quantile is not None and (not isinstance(quantile, Number) or not 0 <= quantile <= 1):
+                log.error("Quantiles must be numbers between 0 and 1")
+                raise ValueError("Quantiles must be numbers between 0 and 1")
+        if lower_quantile is not None and upper_quantile is not None and lower_quantile >= upper_quantile:
+            log.error("lower_quantile must be smaller than upper_quantile")
+            raise ValueError("lower_quantile must be smaller than upper_quantile")
+        if not isinstance(window_size, int) or window_size < 5:
+            log.error("window_size must be an integer, at least 5")
+            raise ValueError("window_size must be an integer, at least 5")
+        self.min_samples = min_samples
+        self.lower = RollingQuantile(lower_quantile, window_size) if lower_quantile is not None else None
+        self.upper = RollingQuantile(upper_quantile, window_size) if upper_quantile is not None else None
+        #  Number of values seen
+        self.count = 0
+
+    def filter(self, v):
+        """
+        QuantileFilter Implementation.
+
+        :param v: Collected value
+        :return: v if it is out of the quantiles, else None
+        """
+        if not isinstance(v, Number):
+            log.warn("Value is not a number. Returning without applying filter")
+            return v
+        passed = self.count >= self.min_samples and (
+            (self.lower is not None and v < self.lower.value()) or
+            (self.upper is not None and v > self.upper.value()))
+        for quantile in (self.lower, self.upper):
+            if quantile is not None:
+                quantile.add(v)
+        self.count += 1
+        if passed:
+            return v
+        log.debug("Value within quantiles : %s", v)
+        return None
@@ -35,7 +35,12 @@ from numbers import Number
 
 from aenum import UniqueEnum
 
-from liota.lib.utilities.filters.filter import Filter
+from liota.lib.utilities.filters.filter import Filter, select
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 log = logging.getLogger(__name__)
 
@@ -79,10 +84,48 @@ class Type(UniqueEnum):
     AT_LEAST = 11
 
 
+# Predicates of each filter type, given lower and upper bounds.  _PREDICATES
+# test one value, _MASKS test NumPy arrays of values element-wise.
+_PREDICATES = {
+    Type.CLOSED: lambda lo, hi: lambda v: lo <= v <= hi,
+    Type.OPEN: lambda lo, hi: lambda v: lo < v < hi,
+    Type.CLOSED_OPEN: lambda lo, hi: lambda v: lo <= v < hi,
+    Type.OPEN_CLOSED: lambda lo, hi: lambda v: lo < v <= hi,
+    Type.CLOSED_REJECT: lambda lo, hi: lambda v: not lo <= v <= hi,
+    Type.OPEN_REJECT: lambda lo, hi: lambda v: not lo < v < hi,
+    Type.CLOSED_OPEN_REJECT: lambda lo, hi: lambda v: not lo <= v < hi,
+    Type.OPEN_CLOSED_REJECT: lambda lo, hi: lambda v: not lo < v <= hi,
+    Type.LESS_THAN: lambda lo, hi: lambda v: v < lo,
+    Type.AT_MOST: lambda lo, hi: lambda v: v <= lo,
+    Type.GREATER_THAN: lambda lo, hi: lambda v: v > hi,
+    Type.AT_LEAST: lambda lo, hi: lambda v: v >= hi
+}
+
+_MASKS = {
+    Type.CLOSED: lambda lo, hi: lambda v: (lo <= v) & (v <= hi),
+    Type.OPEN: lambda lo, hi: lambda v: (lo < v) & (v < hi),
+    Type.CLOSED_OPEN: lambda lo, hi: lambda v: (lo <= v) & (v < hi),
+    Type.OPEN_CLOSED: lambda lo, hi: lambda v: (lo < v) & (v <= hi),
+    Type.CLOSED_REJECT: lambda lo, hi: lambda v: (v < lo) | (hi < v),
+    Type.OPEN_REJECT: lambda lo, hi: lambda v: (v <= lo) | (hi <= v),
+    Type.CLOSED_OPEN_REJECT: lambda lo, hi: lambda v: (v < lo) | (hi <= v),
+    Type.OPEN_CLOSED_REJECT: lambda lo, hi: lambda v: (v <= lo) | (hi < v),
+    Type.LESS_THAN: lambda lo, hi: lambda v: v < lo,
+    Type.AT_MOST: lambda lo, hi: lambda v: v <= lo,
+    Type.GREATER_THAN: lambda lo, hi: lambda v: v > hi,
+    Type.AT_LEAST: lambda lo, hi: lambda v: v >= hi
+}
+
+
 class RangeFilter(Filter):
     """
     A simple lightweight filter, that filters values based on the specified filter type (range).
+
+    The filter type is compiled into a predicate when the filter is created.  Besides filter(), which takes one
+    value, filter_batch() and filter_arrays() filter many samples at once; with NumPy arrays, filter_arrays() tests
+    all values in one vectorised operation.
     """
+    stateless = True
 
     def __init__(self, filter_type, lower_bound, upper_bound):
         """
@@ -98,6 +141,8 @@ class RangeFilter(Filter):
         self._validate(lower_bound, upper_bound)
         self.lower_bound = lower_bound
         self.upper_bound = upper_bound
+        self._accept = _PREDICATES[filter_type](lower_bound, upper_bound)
+        self._accept_array = _MASKS[filter_type](lower_bound, upper_bound)
 
     def _validate(self, lower_bound, upper_bound):
         """
@@ -130,54 +175,56 @@ class RangeFilter(Filter):
         :param v: Collected value
         :return: Filtered value or None
         """
-        result = None
-        log.info("Applying RangeFilter " + str(self.filter_type))
         if not isinstance(v, Number):
             log.warn("Value is not a number. Returning without applying filter")
             return v
 
-        # Accept filters - bounded at both ends
-        elif self.filter_type is Type.CLOSED and (self.lower_bound <= v <= self.upper_bound):
-            result = v
-
-        elif self.filter_type is Type.OPEN and (self.lower_bound < v < self.upper_bound):
-            result = v
-
-        elif self.filter_type is Type.CLOSED_OPEN and (self.lower_bound <= v < self.upper_bound):
-            result = v
-
-        elif self.filter_type is Type.OPEN_CLOSED and (self.lower_bound < v <= self.upper_bound):
-            result = v
-
-        # Reject filters - bounded at both ends
-        elif self.filter_type is Type.CLOSED_REJECT and (not self.lower_bound <= v <= self.upper_bound):
-            result = v
-
-        elif self.filter_type is Type.OPEN_REJECT and (not self.lower_bound < v < self.upper_bound):
-            result = v
-
-        elif self.filter_type is Type.CLOSED_OPEN_REJECT and (not self.lower_bound <= v < self.upper_bound):
-            result = v
+        if self._accept(v):
+            log.debug("Value passed by filter : %s", v)
+            return v
+        log.debug("Value rejected by filter : %s", v)
+        return None
 
-        elif self.filter_type is Type.OPEN_CLOSED_REJECT and (not self.lower_bound < v <= self.upper_bound):
-            result = v
+    def accepts(self, v):
+        """
+        Tells whether filter() passes a value, without logging it.
 
-        # Filters - bounded at one end
-        elif self.filter_type is Type.LESS_THAN and (v < self.lower_bound):
-            result = v
+        :param v: Collected value
+        :return: True or False
+        """
+        return not isinstance(v, Number) or self._accept(v)
 
-        elif self.filter_type is Type.AT_MOST and (v <= self.lower_bound):
-            result = v
+    def mask(self, values):
+        """
+        Tests many values at once.  Values which are not numbers are passed, as by filter().
 
-        elif self.filter_type is Type.GREATER_THAN and (v > self.upper_bound):
-            result = v
+        :param values: NumPy array, array or list of values
+        :return: NumPy array of booleans if values is a NumPy array, else list of booleans
+        """
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            if values.dtype.kind in 'iuf':
+                return self._accept_array(values)
+            values = values.tolist()
+            return numpy.array(self.mask(values), dtype=bool)
+        accept = self._accept
+        return [accept(v) if isinstance(v, Number) else True for v in values]
+
+    def filter_batch(self, samples):
+        """
+        Filters a batch of samples, as returned by a sampling function.
 
-        elif self.filter_type is Type.AT_LEAST and (v >= self.upper_bound):
-            result = v
+        :param samples: List of (ts, v) tuples
+        :return: List of the samples passed
+        """
+        accept = self._accept
+        return [sample for sample in samples if not isinstance(sample[1], Number) or accept(sample[1])]
 
-        if result is not None:
-            log.info("Value passed by filter : %s" % str(result))
-        else:
-            log.info("Value rejected by filter : %s" % str(v))
+    def filter_arrays(self, timestamps, values):
+        """
+        Filters samples given as parallel arrays of timestamps and values.
 
-        return result
+        :param timestamps: NumPy array, array or list of timestamps
+        :param values: NumPy array, array or list of values, same length
+        :return: Tuple of timestamps and values passed, of the same types as given
+        """
+        return select(timestamps, values, self.mask(values))
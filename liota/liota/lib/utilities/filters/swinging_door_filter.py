@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import logging
+from numbers import Number
+
+from liota.lib.utilities.utility import getUTCmillis
+from liota.lib.utilities.filters.filter import Filter
+
+log = logging.getLogger(__name__)
+
+
+class SwingingDoorFilter(Filter):
+    """
+    Swinging door trending compression, as used by process historians.
+
+    It keeps only the samples needed to reconstruct the signal by linear interpolation between them, within
+    +/- deviation of every sample collected.  Each sample is held until the next one shows whether it is needed, so
+    a sample passed is the previous one, returned as a (ts, v) tuple with its own timestamp.  The first sample is
+    always passed.  Besides the usual door test, a sample is only held if the line to it stays within deviation of
+    the samples held before it, so the error bound holds for every sample.  Wrap it in a WindowingScheme to report a value at least once per window.
+    """
+
+    def __init__(self, deviation):
+        """
+        :param deviation: Maximum error of the reconstructed signal.
+        """
+        if not isinstance(deviation, Number):
+            log.error("deviation must be a number")
+            raise TypeError("deviation must be a number")
+        if deviation < 0:
+            log.error("deviation must be a non negative number")
+            raise ValueError("deviation must be a non negative number")
+        self.deviation = deviation
+        #  Last sample passed
+        self._archived = None
+        #  Last sample collected, not passed yet
+        self._held = None
+        #  Range of slopes of lines from the last sample passed that are within deviation of all samples collected
+        #  since, up to the held one
+        self._min_slope = None
+        self._max_slope = None
+
+    def _add(self, ts, v):
+        """
+        :return: Sample to pass as (ts, v) tuple, or None
+        """
+        if self._archived is None:
+            self._archived = (ts, v)
+            return self._archived
+        archived_ts, archived_v = self._archived
+        dt = ts - archived_ts
+        if dt <= 0:
+            #  Same or earlier timestamp as the last sample passed
+            return None
+        min_slope = float(v - self.deviation - archived_v) / dt
+        max_slope = float(v + self.deviation - archived_v) / dt
+        if self._held is not None:
+            slope = float(v - archived_v) / dt
+            if not self._min_slope <= slope <= self._max_slope:
+                #  Doors opened: a line to this sample would stray from a sample held before, so the held sample
+                #  is needed, and this sample starts a new segment from it
+                passed = self._archived = self._held
+                dt = ts - passed[0]
+                self._min_slope = float(v - self.deviation - passed[1]) / dt
+                self._max_slope = float(v + self.deviation - passed[1]) / dt
+                self._held = (ts, v)
+                return passed
+            min_slope = max(min_slope, self._min_slope)
+            max_slope = min(max_slope, self._max_slope)
+        self._min_slope = min_slope
+        self._max_slope = max_slope
+        self._held = (ts, v)
+        return None
+
+    def filter(self, v):
+        """
+        SwingingDoorFilter Implementation.  Samples are timestamped with the current time.
+
+        :param v: Collected value
+        :return: Sample passed as (ts, v) tuple, or None
+        """
+        if not isinstance(v, Number):
+            log.warn("Value is not a number. Returning without applying filter")
+            return v
+        passed = self._add(getUTCmillis(), v)
+        if passed is None:
+            log.debug("Sample held : %s", v)
+        return passed
+
+    def filter_batch(self, samples):
+        """
+        Applies the filter to a batch of samples, as returned by a sampling function.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of the samples passed
+        """
+        passed = []
+        for sample in samples:
+            if not isinstance(sample[1], Number):
+                passed.append(sample)
+                continue
+            archived = self._add(sample[0], sample[1])
+            if archived is not None:
+                passed.append(archived)
+        return passed
+
+    def flush(self):
+        """
+        Passes the sample held, e.g. before the metric stops collecting.
+
+        :return: Sample held as (ts, v) tuple, or None
+        """
+        held = self._held
+        if held is not None:
+            self._archived = held
+            self._held = None
+        return held
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import logging
+
+from liota.lib.utilities.filters.anomaly_filter import AnomalyFilter, Method
+from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
+
+log = logging.getLogger(__name__)
+
+
+class AnomalyGate(WindowingScheme):
+    """
+    Forwards a metric's values only when they deviate from their learned baseline, as told by an AnomalyFilter, and
+    sends a value as a heartbeat at the end of every heartbeat_sec window in which none deviated, so that DCC knows
+    the metric is alive.
+
+    A steady signal thus costs one value per heartbeat_sec whatever the interval of the metric.  Like any
+    WindowingScheme, the gate is used within a sampling function or a FilterPipeline, and filter_batch() and
+    filter_arrays() track windows with the timestamps of the samples.
+    """
+
+    def __init__(self, threshold=3.0, heartbeat_sec=300, method=Method.ZSCORE, alpha=0.05, window_size=200,
+                 min_samples=10):
+        """
+        :param threshold: Score above which values are passed, see AnomalyFilter.
+        :param heartbeat_sec: Window size in seconds.
+        :param method: Any one Method.
+        :param alpha: Weight of the newest value in the mean and standard deviation, for Method.ZSCORE.
+        :param window_size: Number of values the median and median absolute deviation are estimated over, for
+                            Method.MAD.
+        :param min_samples: Number of values to see before passing any, besides heartbeats.
+        """
+        super(AnomalyGate, self).__init__(AnomalyFilter(threshold, method, alpha, window_size, min_samples),
+                                          heartbeat_sec)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+from collections import deque, namedtuple
+from numbers import Number
+import logging
+
+from liota.lib.utilities.utility import getUTCmillis
+from liota.lib.utilities.filters.filter import Filter
+from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
+
+log = logging.getLogger(__name__)
+
+# Summary of the values of a window, sent instead of the values
+WindowSummary = namedtuple('WindowSummary', ['min', 'max', 'mean', 'count', 'last'])
+
+
+class _AcceptAll(Filter):
+    """
+    Filter passing every value, used when WindowAggregator has no filter.
+    """
+    stateless = True
+
+    def __init__(self):
+        pass
+
+    def filter(self, v):
+        return v
+
+
+class _Window(object):
+    """
+    Running state of one window, updated in constant time per value.
+    """
+    __slots__ = ('end', 'min', 'max', 'total', 'count', 'last')
+
+    def __init__(self, end):
+        self.end = end
+        self.min = None
+        self.max = None
+        self.total = 0
+        self.count = 0
+        self.last = None
+
+    def add(self, v):
+        if self.count:
+            if v < self.min:
+                self.min = v
+            elif v > self.max:
+                self.max = v
+        else:
+            self.min = self.max = v
+        self.total += v
+        self.count += 1
+        self.last = v
+
+    def summary(self):
+        return WindowSummary(self.min, self.max, float(self.total) / self.count, self.count, self.last)
+
+
+class WindowAggregator(WindowingScheme):
+    """
+    Aggregates values passed by a Filter over time windows, and returns a WindowSummary of each window instead of
+    its values, which reduces the number of values sent to DCC by the number of values per window.
+
+    Windows are tumbling by default: a window starts when the previous one ends.  With hop_sec smaller than
+    window_size_sec, windows are hopping: a window starts every hop_sec seconds and overlapping windows are
+    aggregated in parallel.  Windows are aligned on multiples of hop_sec since the epoch.
+
+    A window is closed by the first value collected after its end, so use filter() as the return value of a
+    sampling function: it returns (ts, WindowSummary) when a window closes, with ts the end of the window in ms, a
+    list of such tuples if several windows close at once, or None.  Windows with no value passed by the filter are
+    not summarized.  Values which are not numbers are ignored.
+    """
+
+    def __init__(self, filter_obj=None, window_size_sec=60, hop_sec=None):
+        """
+        :param filter_obj: Filter object applied to values before aggregation, or None to aggregate all values.
+        :param window_size_sec: Window size in seconds.
+        :param hop_sec: Time in seconds between the starts of consecutive windows, None for tumbling windows.
+        """
+        if filter_obj is None:
+            filter_obj = _AcceptAll()
+        super(WindowAggregator, self).__init__(filter_obj, window_size_sec)
+        if window_size_sec <= 0:
+            log.error("window_size_sec must be a positive number")
+            raise ValueError("window_size_sec must be a positive number")
+        if hop_sec is None:
+            hop_sec = window_size_sec
+        if not isinstance(hop_sec, Number) or not 0 < hop_sec <= window_size_sec:
+            log.error("hop_sec must be a positive number, not larger than window_size_sec")
+            raise ValueError("hop_sec must be a positive number, not larger than window_size_sec")
+        self.hop_sec = hop_sec
+        # Windows not closed yet, oldest first
+        self._windows = deque()
+        # Start time of the next window in ms
+        self._next_start = None
+
+    def filter_batch(self, samples):
+        """
+        Aggregates a batch of samples, as returned by a sampling function, tracking windows with their timestamps.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of (ts, WindowSummary) of the windows closed
+        """
+        summaries = []
+        if self.filter_obj.stateless:
+            passed = self.filter_obj.mask([v for _, v in samples])
+            filtered = [[v] if p else [] for (_, v), p in zip(samples, passed)]
+        else:
+            filtered = [[v for _, v in result] for result in self._filter_each(samples)]
+        for (ts, v), values in zip(samples, filtered):
+            for filtered_value in values or [None]:
+                result = self._window_at(ts, v, filtered_value)
+                if isinstance(result, list):
+                    summaries.extend(result)
+                elif result is not None:
+                    summaries.append(result)
+        return summaries
+
+    def filter_arrays(self, timestamps, values):
+        """
+        Aggregates samples given as parallel arrays of timestamps and values.
+
+        :param timestamps: NumPy array, array or list of timestamps, in ascending order
+        :param values: NumPy array, array or list of values, same length
+        :return: List of (ts, WindowSummary) of the windows closed
+        """
+        if len(timestamps) != len(values):
+            raise ValueError("Timestamps and values differ in length: %d, %d" % (len(timestamps), len(values)))
+        return self.filter_batch(zip(_tolist(timestamps), _tolist(values)))
+
+    def _window(self, collected_value, filtered_value):
+        return self._window_at(getUTCmillis(), collected_value, filtered_value)
+
+    def _window_at(self, now, collected_value, filtered_value):
+        """
+        Aggregates filtered_value into the windows it belongs to.
+
+        :param now: Time of the value in ms.
+        :param collected_value: Collected value by sampling function.
+        :param filtered_value: Filtered value by sampling function.
+        :return: (ts, WindowSummary), list of them, or None
+        """
+        size = self.window_size_sec * 1000
+        hop = self.hop_sec * 1000
+        summaries = []
+        windows = self._windows
+        while windows and windows[0].end <= now:
+            window = windows.popleft()
+            if window.count:
+                summaries.append((window.end, window.summary()))
+        if self._next_start is None or self._next_start + size <= now:
+            # First value, or no value since the last window ended
+            self._next_start = now - now % hop
+        while self._next_start <= now:
+            windows.append(_Window(self._next_start + size))
+            self._next_start += hop
+        if windows:
+            self.next_window_time = windows[0].end
+        if isinstance(filtered_value, Number) and not isinstance(filtered_value, bool):
+            for window in windows:
+                window.add(filtered_value)
+        elif filtered_value is not None:
+            log.warning("Value is not a number, not aggregated: %s" % str(filtered_value))
+        if not summaries:
+            return None
+        log.debug("Closed %d windows" % len(summaries))
+        if len(summaries) == 1:
+            return summaries[0]
+        return summaries
+
+
+def _tolist(items):
+    """
+    :return: Elements of a NumPy array, array or list as a list of Python objects
+    """
+    if hasattr(items, 'tolist'):
+        return items.tolist()
+    return list(items)
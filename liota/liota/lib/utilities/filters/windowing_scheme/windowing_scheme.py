@@ -31,11 +31,17 @@
 # ----------------------------------------------------------------------------#
 
 from abc import abstractmethod
+from bisect import bisect_left
 from numbers import Number
 import logging
 
 from liota.lib.utilities.utility import getUTCmillis
-from liota.lib.utilities.filters.filter import Filter
+from liota.lib.utilities.filters.filter import Filter, select
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 log = logging.getLogger(__name__)
 
@@ -46,6 +52,12 @@ class WindowingScheme(Filter):
 
     It keeps track of a configurable time window.  Even if all values has been filtered out at the
     end of every time window, collected value is returned so that DCC is aware of it.
+
+    filter() tracks windows with the current time.  filter_batch() and filter_arrays() filter batches of
+    samples, oldest first, tracking windows with the timestamps of the samples.  A stateless filter is applied to
+    all values at once with its mask() method, any other filter to each sample in turn with its filter_batch()
+    method, so that it sees the samples' timestamps and may pass other samples than the one given, e.g. the sample
+    held by a SwingingDoorFilter.
     """
 
     def __init__(self, filter_obj, window_size_sec):
@@ -72,9 +84,56 @@ class WindowingScheme(Filter):
         :param v: Collected value by sampling function.
         :return: Filtered value or None
         """
-        log.info("Applying windowing scheme")
+        log.debug("Applying windowing scheme")
         return self._window(v, self.filter_obj.filter(v))
 
+    def filter_batch(self, samples):
+        """
+        Applies filter and windowing scheme to a batch of samples, as returned by a sampling function.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of the samples passed
+        """
+        timestamps = [ts for ts, _ in samples]
+        if self.filter_obj.stateless:
+            keep = self._window_mask(timestamps, self.filter_obj.mask([v for _, v in samples]))
+            return [sample for sample, kept in zip(samples, keep) if kept]
+        results = self._filter_each(samples)
+        keep = self._window_mask(timestamps, [bool(result) for result in results])
+        passed = []
+        for sample, result, kept in zip(samples, results, keep):
+            if result:
+                passed.extend(result)
+            elif kept:
+                # Collected value sent for a window with no sample passed
+                passed.append(sample)
+        return passed
+
+    def filter_arrays(self, timestamps, values):
+        """
+        Applies filter and windowing scheme to samples given as parallel arrays of timestamps and values.
+
+        :param timestamps: NumPy array, array or list of timestamps, in ascending order
+        :param values: NumPy array, array or list of values, same length
+        :return: Tuple of timestamps and values passed, of the same types as given, or list of (ts, v) tuples if the
+                 filter is not stateless
+        """
+        if not self.filter_obj.stateless:
+            if len(timestamps) != len(values):
+                raise ValueError("Timestamps and values differ in length: %d, %d" % (len(timestamps), len(values)))
+            return self.filter_batch(zip(_tolist(timestamps), _tolist(values)))
+        return select(timestamps, values, self._window_mask(timestamps, self.filter_obj.mask(values)))
+
+    def _filter_each(self, samples):
+        """
+        Applies the filter to each sample in turn.
+
+        :param samples: List of (ts, v) tuples, oldest first
+        :return: List of lists of the samples passed by the filter, one list per sample
+        """
+        filter_batch = self.filter_obj.filter_batch
+        return [filter_batch([sample]) for sample in samples]
+
     def _window(self, collected_value, filtered_value):
         """
         Windowing scheme.
@@ -102,6 +161,38 @@ class WindowingScheme(Filter):
                 self.sample_passed = True  # At-least one sample has passed during this window
             return filtered_value
 
+    def _window_mask(self, timestamps, passed):
+        """
+        Windowing scheme for a batch.  Only samples ending a window are looked at one by one.
+
+        :param timestamps: Timestamps of the samples, in ascending order.
+        :param passed: NumPy array or list of booleans, whether the filter passed each sample.
+        :return: NumPy array or list of booleans, whether each sample is passed.
+        """
+        if numpy is not None and isinstance(timestamps, numpy.ndarray):
+            passed = numpy.asarray(passed, dtype=bool)
+            keep = passed.copy()
+            find = lambda t, lo: lo + int(numpy.searchsorted(timestamps[lo:], t))
+            any_passed = lambda lo, hi: passed[lo:hi].any()
+        else:
+            keep = list(passed)
+            find = lambda t, lo: bisect_left(timestamps, t, lo)
+            any_passed = lambda lo, hi: any(passed[lo:hi])
+        i = 0
+        while i < len(timestamps):
+            # First sample at or after the end of the window
+            j = find(self.next_window_time, i)
+            if any_passed(i, j):
+                self.sample_passed = True
+            if j == len(timestamps):
+                break
+            if not self.sample_passed and not passed[j]:
+                log.debug("Sending collected value for this window.")
+                keep[j] = True
+            self._set_next_window_time()
+            i = j + 1
+        return keep
+
     def _set_next_window_time(self):
         """
         Sets next time-window.
@@ -110,3 +201,12 @@ class WindowingScheme(Filter):
         self.next_window_time += (self.window_size_sec * 1000)
         log.debug("Resetting window")
         self.sample_passed = False  # Resetting
+
+
+def _tolist(items):
+    """
+    :return: Elements of a NumPy array, array or list as a list of Python objects
+    """
+    if hasattr(items, 'tolist'):
+        return items.tolist()
+    return list(items)
@@ -273,6 +273,28 @@ def read_liota_config(section, name):
     return value
 
 
+def read_liota_config_section(section):
+    """
+    Returns all options of the specified section, read at once.
+
+    :param section: Section name
+    :return: Dict of option names to values, empty if the section or
+             liota.conf is missing
+    """
+    config = ConfigParser.RawConfigParser()
+    fullPath = LiotaConfigPath().get_liota_fullpath()
+    if fullPath == '':
+        # missing config file
+        log.warn('liota.conf file missing')
+        return {}
+    if config.read(fullPath) == []:
+        log.error('Could not open config file ' + fullPath)
+        return {}
+    if not config.has_section(section):
+        return {}
+    return dict(config.items(section))
+
+
 class DiscUtilities:
     """
     DiscUtilities is a wrapper of utility functions
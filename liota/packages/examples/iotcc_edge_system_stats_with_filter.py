@@ -34,6 +34,7 @@ from linux_metrics import cpu_stat, disk_stat, net_stat
 
 from liota.core.package_manager import LiotaPackage
 from liota.lib.utilities.utility import get_default_network_interface, get_disk_name
+from liota.lib.utilities.filters.filter_pipeline import FilterPipeline
 from liota.lib.utilities.filters.range_filter import RangeFilter, Type
 from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
 
@@ -48,11 +49,13 @@ disk_name = get_disk_name()
 cpu_pro_filter = RangeFilter(Type.CLOSED_REJECT, 5, 10)  # If no of CPU processes <=5 or >=10
 cpu_util_filter = RangeFilter(Type.AT_LEAST, None, 85)  # CPU util >= 85
 disk_usage_filter = RangeFilter(Type.AT_LEAST, None, 80)  # Disk usage >= 80%
-net_usage_filter = RangeFilter(Type.AT_LEAST, None, 1000000)  # Network usage >= 1Mb
 
 # Filter with windowing scheme
 cpu_util_filter_with_window = WindowingScheme(cpu_util_filter, 30)
 
+# Filters to filter data after Sampling Functions, attached to a Metric
+net_usage_pipeline = FilterPipeline(RangeFilter(Type.AT_LEAST, None, 1000000))  # Network usage >= 1Mb
+
 
 # ---------------------------------------------------------------------------
 # User defined methods with RangeFilters
@@ -72,7 +75,7 @@ def read_disk_usage_stats():
 
 
 def read_network_bytes_received():
-    return net_usage_filter.filter(round(net_stat.rx_tx_bytes(network_interface)[0], 2))
+    return round(net_stat.rx_tx_bytes(network_interface)[0], 2)
 
 
 class PackageClass(LiotaPackage):
@@ -128,7 +131,8 @@ class PackageClass(LiotaPackage):
         metric_network_bytes_received = Metric(name=metric_name,
                                                unit=None, interval=5,
                                                aggregation_size=1,
-                                               sampling_function=read_network_bytes_received
+                                               sampling_function=read_network_bytes_received,
+                                               filter_pipeline=net_usage_pipeline
                                                )
         reg_metric_network_bytes_received = iotcc.register(metric_network_bytes_received)
         iotcc.create_relationship(iotcc_edge_system, reg_metric_network_bytes_received)
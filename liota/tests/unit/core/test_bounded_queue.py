@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+from Queue import Full
+
+from liota.core.bounded_queue import BoundedQueue, OverflowPolicy, \
+    parse_overflow_policy
+
+
+class BoundedQueueTest(unittest.TestCase):
+    """
+    BoundedQueue unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to initialise the list of dropped items.
+        :return: None
+        """
+        self.dropped = []
+
+    def _fill(self, policy, items, maxsize=4):
+        queue = BoundedQueue(maxsize, policy, on_drop=self.dropped.append)
+        for item in items:
+            queue.put(item)
+        return queue
+
+    def _drain(self, queue):
+        return [queue.get() for _ in range(queue.qsize())]
+
+    def test_unbounded(self):
+        """
+        Test case to check a queue without maxsize never drops items.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.DROP_NEWEST, range(10), maxsize=0)
+        self.assertEqual(self._drain(queue), range(10))
+        self.assertEqual(self.dropped, [])
+
+    def test_drop_oldest(self):
+        """
+        Test case to check DROP_OLDEST policy.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.DROP_OLDEST, range(6))
+        self.assertEqual(self._drain(queue), [2, 3, 4, 5])
+        self.assertEqual(self.dropped, [0, 1])
+        self.assertEqual(queue.num_dropped, 2)
+
+    def test_drop_newest(self):
+        """
+        Test case to check DROP_NEWEST policy.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.DROP_NEWEST, range(6))
+        self.assertEqual(self._drain(queue), [0, 1, 2, 3])
+        self.assertEqual(self.dropped, [4, 5])
+
+    def test_downsample(self):
+        """
+        Test case to check DOWNSAMPLE policy keeps every other item.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.DOWNSAMPLE, range(5))
+        self.assertEqual(self._drain(queue), [0, 2, 4])
+        self.assertEqual(self.dropped, [1, 3])
+
+    def test_block(self):
+        """
+        Test case to check BLOCK policy blocks the producer.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.BLOCK, range(4))
+        self.assertRaises(Full, queue.put, 4, True, 0.01)
+        self.assertEqual(self.dropped, [])
+
+    def test_control_items(self):
+        """
+        Test case to check control items are never dropped nor blocked.
+        :return: None
+        """
+        queue = self._fill(OverflowPolicy.DROP_OLDEST, [None, 1, 2, 3])
+        queue.put(4)
+        queue.put(None)
+        self.assertEqual(self._drain(queue), [None, 2, 3, 4, None])
+        self.assertEqual(self.dropped, [1])
+
+    def test_parse_overflow_policy(self):
+        """
+        Test case to check overflow policies read from liota.conf.
+        :return: None
+        """
+        self.assertIs(parse_overflow_policy(" drop_oldest"),
+                      OverflowPolicy.DROP_OLDEST)
+        self.assertRaises(KeyError, parse_overflow_policy, "drop_all")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import socket
+import unittest
+from threading import Event
+
+from liota.core.coroutine_collector import CoroutineCollector, Return, Sleep, Timeout, WaitReadable
+
+
+def add_later(a, b):
+    yield Sleep(0.01)
+    raise Return(a + b)
+
+
+def nested():
+    value = yield add_later(1, 2)
+    raise Return(value * 10)
+
+
+def failing():
+    yield Sleep(0)
+    raise ValueError("sampling failed")
+
+
+def catching():
+    try:
+        yield failing()
+    except ValueError:
+        raise Return("caught")
+
+
+def no_result():
+    yield Sleep(0)
+
+
+def invalid_request():
+    yield "not a request"
+
+
+class CoroutineCollectorTest(unittest.TestCase):
+    """
+    CoroutineCollector unit test cases
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Method to start the CoroutineCollector shared by the test cases.
+        :return: None
+        """
+        cls.collector = CoroutineCollector(name="TestCoroutineCollector")
+
+    def run_coroutine(self, coroutine):
+        """
+        Runs a coroutine on the collector and waits for its result.
+        :param coroutine: Generator object
+        :return: (result, exc_info)
+        """
+        done = Event()
+        outcome = []
+
+        def callback(result, exc_info):
+            outcome.append((result, exc_info))
+            done.set()
+
+        self.collector.submit(coroutine, callback)
+        self.assertTrue(done.wait(5))
+        return outcome[0]
+
+    def test_return_value(self):
+        """
+        Test case to check the value raised with Return is passed to the callback.
+        :return: None
+        """
+        self.assertEqual(self.run_coroutine(add_later(1, 2)), (3, None))
+
+    def test_no_result(self):
+        """
+        Test case to check a coroutine finishing without Return results in None.
+        :return: None
+        """
+        self.assertEqual(self.run_coroutine(no_result()), (None, None))
+
+    def test_nested_coroutines(self):
+        """
+        Test case to check the result of a sub-coroutine is sent back to its caller.
+        :return: None
+        """
+        self.assertEqual(self.run_coroutine(nested()), (30, None))
+
+    def test_exception(self):
+        """
+        Test case to check exceptions are passed to the callback or to the calling coroutine.
+        :return: None
+        """
+        result, exc_info = self.run_coroutine(failing())
+        self.assertIsNone(result)
+        self.assertIs(exc_info[0], ValueError)
+        self.assertEqual(self.run_coroutine(catching()), ("caught", None))
+
+    def test_invalid_request(self):
+        """
+        Test case to check yielding an unsupported object raises TypeError.
+        :return: None
+        """
+        result, exc_info = self.run_coroutine(invalid_request())
+        self.assertIs(exc_info[0], TypeError)
+
+    def test_wait_readable(self):
+        """
+        Test case to check a coroutine is resumed once its socket is readable.
+        :return: None
+        """
+        reader, writer = socket.socketpair()
+        reader.setblocking(0)
+
+        def read():
+            yield WaitReadable(reader)
+            raise Return(reader.recv(16))
+
+        done = Event()
+        outcome = []
+        self.collector.submit(read(), lambda result, exc_info: (outcome.append(result), done.set()))
+        self.assertFalse(done.wait(0.05))
+        writer.send("data")
+        self.assertTrue(done.wait(5))
+        self.assertEqual(outcome, ["data"])
+        reader.close()
+        writer.close()
+
+    def test_timeout(self):
+        """
+        Test case to check a coroutine running past its timeout is closed.
+        :return: None
+        """
+        closed = []
+
+        def hanging():
+            try:
+                yield Sleep(60)
+            finally:
+                closed.append(True)
+
+        done = Event()
+        outcome = []
+        self.collector.submit(hanging(), lambda result, exc_info: (outcome.append(exc_info), done.set()),
+                              timeout=0.05)
+        self.assertTrue(done.wait(5))
+        self.assertIs(outcome[0][0], Timeout)
+        self.assertEqual(closed, [True])
+        self.assertEqual(self.run_coroutine(add_later(2, 3)), (5, None))
+
+    def test_many_coroutines(self):
+        """
+        Test case to check many sleeping coroutines run concurrently on one thread.
+        :return: None
+        """
+        done = Event()
+        results = []
+
+        def callback(result, exc_info):
+            results.append(result)
+            if len(results) == 1000:
+                done.set()
+
+        for i in range(1000):
+            self.collector.submit(add_later(i, 0), callback)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(sorted(results), range(1000))
+        self.assertEqual(self.collector.get_num_tasks(), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
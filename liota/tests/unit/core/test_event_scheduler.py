@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import random
+import unittest
+
+from liota.core.event_scheduler import EventScheduler
+
+
+class EventSchedulerTest(unittest.TestCase):
+    """
+    EventScheduler unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to initialise the EventScheduler.
+        :return: None
+        """
+        self.scheduler = EventScheduler()
+
+    def tearDown(self):
+        """
+        Method to cleanup the resource created during the execution of test case.
+        :return: None
+        """
+        self.scheduler = None
+
+    def test_empty(self):
+        """
+        Test case to check the behaviour of an empty scheduler.
+        :return: None
+        """
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertIsNone(self.scheduler.peek())
+        self.assertIsNone(self.scheduler.peek_deadline())
+        self.assertRaises(IndexError, self.scheduler.pop)
+
+    def test_pop_in_deadline_order(self):
+        """
+        Test case to check items are popped in deadline order, with and without intervals.
+        :return: None
+        """
+        random.seed(0)
+        deadlines = []
+        for i in range(1000):
+            deadline = random.randint(0, 10000)
+            deadlines.append(deadline)
+            self.scheduler.push(deadline, deadline, random.choice([None, 10, 60]))
+
+        self.assertEqual(len(self.scheduler), 1000)
+        popped = []
+        while len(self.scheduler):
+            self.assertEqual(self.scheduler.peek(), self.scheduler.peek_deadline())
+            popped.append(self.scheduler.pop())
+        self.assertEqual(popped, sorted(deadlines))
+
+    def test_fifo_for_equal_deadlines(self):
+        """
+        Test case to check items with equal deadlines are popped in insertion order.
+        :return: None
+        """
+        self.scheduler.push("first", 5, 10)
+        self.scheduler.push("second", 5)
+        self.scheduler.push("third", 5, 10)
+        self.assertEqual([self.scheduler.pop() for _ in range(3)], ["first", "second", "third"])
+
+    def test_reschedule_at_fixed_interval(self):
+        """
+        Test case to check repeated rescheduling keeps the earliest item first.
+        :return: None
+        """
+        for i in range(10):
+            self.scheduler.push(i, i, 10)
+        for expected in range(100):
+            deadline = self.scheduler.peek_deadline()
+            self.assertEqual(deadline, expected)
+            item = self.scheduler.pop()
+            self.assertEqual(item, expected % 10)
+            self.scheduler.push(item, deadline + 10, 10)
+        self.assertEqual(len(self.scheduler), 10)
+
+    def test_cancel(self):
+        """
+        Test case to check cancelled items are never popped.
+        :return: None
+        """
+        entries = [self.scheduler.push(i, i, 10 if i % 2 else None) for i in range(500)]
+        for i in range(0, 500, 3):
+            self.assertTrue(self.scheduler.cancel(entries[i]))
+            self.assertFalse(self.scheduler.cancel(entries[i]))
+
+        expected = [i for i in range(500) if i % 3]
+        self.assertEqual(len(self.scheduler), len(expected))
+        self.assertEqual([self.scheduler.pop() for _ in expected], expected)
+        self.assertIsNone(self.scheduler.peek())
+
+    def test_cancel_releases_item(self):
+        """
+        Test case to check cancelling an entry drops its reference to the item.
+        :return: None
+        """
+        item = object()
+        entry = self.scheduler.push(item, 1, 10)
+        self.scheduler.cancel(entry)
+        self.assertNotIn(item, entry)
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_reschedule(self):
+        """
+        Test case to check rescheduling moves an item to its new deadline.
+        :return: None
+        """
+        entry = self.scheduler.push("a", 1, 10)
+        self.scheduler.push("b", 2, 10)
+        self.scheduler.reschedule(entry, "a", 3, 10)
+        self.assertEqual(len(self.scheduler), 2)
+        self.assertEqual([self.scheduler.pop(), self.scheduler.pop()], ["b", "a"])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
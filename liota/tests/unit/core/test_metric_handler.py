@@ -0,0 +1,813 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from Queue import Queue
+
+from liota.core.bounded_queue import OverflowPolicy
+from threading import Event, Lock, current_thread
+
+from liota.core import metric_handler
+from liota.core.metric_handler import EventsPriorityQueue, CollectQueue, SendThread, CollectionThreadPool, \
+    Priority, CollectionThread, CollectionWatchdog, MissedDeadlinePolicy, SchedulingPhase
+from liota.entities.metrics.metric import Metric
+from liota.entities.metrics.registered_metric import RegisteredMetric
+from liota.lib.utilities.utility import getUTCmillis
+
+
+class Interval:
+    """
+    Stands in for the Metric referenced by a RegisteredMetric.
+    """
+    interval = 10
+    priority = Priority.NORMAL
+
+
+class ScheduledMetric:
+    """
+    Minimal RegisteredMetric stand-in as seen by EventsPriorityQueue.
+    """
+
+    def __init__(self, name, next_run_time, priority=Priority.NORMAL):
+        self.name = name
+        self.ref_entity = Interval()
+        self.ref_entity.priority = priority
+        self.flag_alive = True
+        self._next_run_time = next_run_time
+        self._event_handle = None
+
+    def get_next_run_time(self):
+        return self._next_run_time
+
+
+class EventsPriorityQueueTest(unittest.TestCase):
+    """
+    EventsPriorityQueue unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to initialise the EventsPriorityQueue.
+        :return: None
+        """
+        self.event_ds = EventsPriorityQueue()
+        self.now = getUTCmillis()
+
+    def tearDown(self):
+        """
+        Method to cleanup the resource created during the execution of test case.
+        :return: None
+        """
+        self.event_ds = None
+
+    def test_get_next_element_when_ready(self):
+        """
+        Test case to check elements are returned in order of their next run time.
+        :return: None
+        """
+        for name, delta in [("b", -5), ("a", -10), ("c", -1)]:
+            self.event_ds.put_and_notify(ScheduledMetric(name, self.now + delta))
+        names = [self.event_ds.get_next_element_when_ready().name for _ in range(3)]
+        self.assertEqual(names, ["a", "b", "c"])
+        self.assertEqual(self.event_ds.qsize(), 0)
+
+    def test_get_ready_elements(self):
+        """
+        Test case to check all due elements are drained at once, up to max_count.
+        :return: None
+        """
+        for i in range(5):
+            self.event_ds.put_and_notify(ScheduledMetric(i, self.now - 10 + i))
+        self.event_ds.put_and_notify(ScheduledMetric("future", self.now + 60000))
+
+        batch = self.event_ds.get_ready_elements(max_count=3)
+        self.assertEqual([m.name for m in batch], [0, 1, 2])
+        batch = self.event_ds.get_ready_elements()
+        self.assertEqual([m.name for m in batch], [3, 4])
+        self.assertEqual(self.event_ds.qsize(), 1)
+
+    def test_get_ready_elements_exit_signal(self):
+        """
+        Test case to check an exit signal is returned alone and ahead of due elements.
+        :return: None
+        """
+        self.event_ds.put_and_notify(ScheduledMetric("due", self.now - 10))
+        self.event_ds.put_and_notify(SystemExit(), timeout=0)
+
+        batch = self.event_ds.get_ready_elements()
+        self.assertEqual(len(batch), 1)
+        self.assertIsInstance(batch[0], SystemExit)
+
+    def test_remove(self):
+        """
+        Test case to check a metric is removed from the queue right away.
+        :return: None
+        """
+        metric = ScheduledMetric("removed", self.now + 60000)
+        self.event_ds.put_and_notify(metric)
+        self.event_ds.put_and_notify(ScheduledMetric("kept", self.now - 10))
+
+        self.assertTrue(self.event_ds.remove(metric))
+        self.assertIsNone(metric._event_handle)
+        self.assertFalse(self.event_ds.remove(metric))
+        self.assertEqual(self.event_ds.qsize(), 1)
+        self.assertEqual(self.event_ds.get_next_element_when_ready().name, "kept")
+
+    def test_put_dead_metric(self):
+        """
+        Test case to check a stopped metric is not queued again.
+        :return: None
+        """
+        metric = ScheduledMetric("dead", self.now)
+        metric.flag_alive = False
+        self.event_ds.put_and_notify(metric)
+        self.assertEqual(self.event_ds.qsize(), 0)
+
+    def test_put_queued_metric(self):
+        """
+        Test case to check putting a queued metric again reschedules it.
+        :return: None
+        """
+        metric = ScheduledMetric("metric", self.now + 60000)
+        self.event_ds.put_and_notify(metric)
+        metric._next_run_time = self.now - 10
+        self.event_ds.put_and_notify(metric)
+        self.assertEqual(self.event_ds.qsize(), 1)
+        self.assertIs(self.event_ds.get_next_element_when_ready(), metric)
+
+    def test_priority_tie_break(self):
+        """
+        Test case to check priority orders elements due at the same time.
+        :return: None
+        """
+        for name, priority in [("low", Priority.LOW), ("normal", Priority.NORMAL),
+                               ("high", Priority.HIGH)]:
+            self.event_ds.put_and_notify(ScheduledMetric(name, self.now - 10, priority))
+        batch = self.event_ds.get_ready_elements()
+        self.assertEqual([m.name for m in batch], ["high", "normal", "low"])
+
+
+class CollectQueueTest(unittest.TestCase):
+    """
+    CollectQueue unit test cases
+    """
+
+    def test_get_oldest_wait(self):
+        """
+        Test case to check the waiting time of the oldest batch.
+        :return: None
+        """
+        collect_queue = CollectQueue()
+        self.assertEqual(collect_queue.get_oldest_wait(), 0)
+        first = [ScheduledMetric("first", 0)]
+        second = [ScheduledMetric("second", 0)]
+
+        with mock.patch("liota.core.metric_handler.getUTCmillis", return_value=1000):
+            collect_queue.put(first)
+        with mock.patch("liota.core.metric_handler.getUTCmillis", return_value=1500):
+            collect_queue.put(second)
+        with mock.patch("liota.core.metric_handler.getUTCmillis", return_value=2000):
+            self.assertEqual(collect_queue.get_oldest_wait(), 1000)
+            self.assertIs(collect_queue.get(), first)
+            self.assertEqual(collect_queue.get_oldest_wait(), 500)
+
+    def test_priority_lanes(self):
+        """
+        Test case to check high priority batches are taken first and low priority ones shed first.
+        :return: None
+        """
+        dropped = []
+        collect_queue = CollectQueue(2, OverflowPolicy.DROP_NEWEST, on_drop=dropped.append)
+        low = [ScheduledMetric("low", 0, Priority.LOW)]
+        normal = [ScheduledMetric("normal", 0)]
+        high = [ScheduledMetric("high", 0, Priority.HIGH)]
+        mixed = [ScheduledMetric("mixed", 0), ScheduledMetric("alarm", 0, Priority.HIGH)]
+
+        collect_queue.put(low)
+        collect_queue.put(normal)
+        collect_queue.put(high)
+        self.assertEqual(dropped, [low])
+        collect_queue.put(mixed)
+        self.assertEqual(dropped, [low, normal])
+        collect_queue.put([ScheduledMetric("late", 0, Priority.LOW)])
+        self.assertEqual(len(dropped), 3)
+
+        self.assertIs(collect_queue.get(), high)
+        self.assertIs(collect_queue.get(), mixed)
+
+
+class CollectionThreadTest(unittest.TestCase):
+    """
+    CollectionThread unit test cases
+    """
+
+    def test_collect_error(self):
+        """
+        Test case to check a failing sampling function neither stops its worker nor the rest of its batch.
+        :return: None
+        """
+        metrics = [mock.Mock(flag_alive=True) for _ in range(3)]
+        for metric in metrics:
+            metric.ref_entity.sampling_timeout = None
+        metrics[0].collect.side_effect = ValueError("sensor unplugged")
+        collect_queue = Queue()
+        collect_queue.put(metrics)
+        collect_queue.put(None)
+        with mock.patch.object(metric_handler, "collect_queue", collect_queue), \
+                mock.patch("liota.core.metric_handler._schedule_next_collection") as schedule:
+            worker = CollectionThread(Lock(), name="CollectionThread-Test")
+            worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertIsNone(worker.working_obj)
+        for metric in metrics:
+            metric.collect.assert_called_once_with()
+        self.assertEqual([args[0][0] for args in schedule.call_args_list], metrics)
+
+
+class CollectionThreadPoolTest(unittest.TestCase):
+    """
+    Test cases of the growing and shrinking of CollectionThreadPool
+    """
+
+    def setUp(self):
+        """
+        Method to replace collect_queue with a queue of given depth and oldest wait.
+        :return: None
+        """
+        self.collect_queue = Queue()
+        self.collect_queue.depth = 0
+        self.collect_queue.qsize = lambda: self.collect_queue.depth
+        self.collect_queue.get_oldest_wait = mock.Mock(return_value=0)
+        patcher = mock.patch.object(metric_handler, "collect_queue", self.collect_queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _pool(self, *args, **kwargs):
+        pool = CollectionThreadPool(*args, **kwargs)
+        self.addCleanup(self._stop, pool)
+        return pool
+
+    def _stop(self, pool):
+        workers = list(pool._pool)
+        for _ in workers:
+            self.collect_queue.put(None)
+        for worker in workers:
+            worker.join(5)
+
+    def test_grow_depth(self):
+        """
+        Test case to check a worker is added when more batches than depth_threshold are queued.
+        :return: None
+        """
+        pool = self._pool(1, max_threads=4, depth_threshold=2)
+        self.collect_queue.depth = 2
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 1)
+        self.collect_queue.depth = 3
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 2)
+
+    def test_grow_wait(self):
+        """
+        Test case to check a worker is added when the oldest batch waited longer than wait_threshold_ms.
+        :return: None
+        """
+        pool = self._pool(1, max_threads=4, depth_threshold=2, wait_threshold_ms=500)
+        self.collect_queue.depth = 1
+        self.collect_queue.get_oldest_wait.return_value = 500
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 1)
+        self.collect_queue.get_oldest_wait.return_value = 501
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 2)
+
+    def test_max_threads(self):
+        """
+        Test case to check the pool does not grow beyond max_threads.
+        :return: None
+        """
+        pool = self._pool(1, max_threads=3)
+        self.collect_queue.depth = 10
+        for _ in range(5):
+            pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 3)
+        self.assertEqual(pool._num_grown, 2)
+
+    def test_retire(self):
+        """
+        Test case to check a worker idle for longer than idle_timeout is retired, down to min_threads.
+        :return: None
+        """
+        pool = self._pool(3, min_threads=2, idle_timeout=1)
+        pool.adjust()
+        self.assertEqual(self.collect_queue.get_oldest_wait.call_count, 1)
+        self.assertEqual(pool.get_num_threads(), 3)
+        for worker in pool._pool:
+            worker.last_active -= 2000
+        workers = list(pool._pool)
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 2)
+        deadline = time.time() + 5
+        while pool._num_shrunk == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pool._num_shrunk, 1)
+        self.assertEqual(len(pool._pool), 2)
+        retired = [worker for worker in workers if worker not in pool._pool]
+        retired[0].join(5)
+        self.assertFalse(retired[0].is_alive())
+        pool.adjust()
+        self.assertEqual(pool.get_num_threads(), 2)
+
+
+    def test_replace_overrunning(self):
+        """
+        Test case to check the watchdog replaces a worker stuck past sampling_timeout and requeues its pending batch.
+        :return: None
+        """
+        release = Event()
+        self.addCleanup(release.set)
+        stuck = RegisteredMetric(Metric(name="Stuck_Metric", interval=10, sampling_function=lambda: release.wait(5),
+                                        sampling_timeout=0.05), None, None)
+        stuck.flag_alive = True
+        pending = [mock.Mock(flag_alive=True) for _ in range(2)]
+        for metric in pending:
+            metric.ref_entity.sampling_timeout = None
+        schedule = mock.patch("liota.core.metric_handler._schedule_next_collection")
+        schedule.start()
+        self.addCleanup(schedule.stop)
+        pool = self._pool(1)
+        worker = pool._pool[0]
+        self.collect_queue.put([stuck] + pending)
+        deadline = time.time() + 5
+        while worker.working_obj is not stuck and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(worker.pending), 2)
+
+        with mock.patch.object(metric_handler, "collect_thread_pool", pool):
+            watchdog = CollectionWatchdog(interval=0.02, name="CollectionWatchdog-Test")
+            self.addCleanup(setattr, watchdog, "flag_alive", False)
+            while not all(metric.collect.called for metric in pending) and time.time() < deadline:
+                time.sleep(0.01)
+            watchdog.flag_alive = False
+        self.assertTrue(worker.abandoned)
+        self.assertNotIn(worker, pool._pool)
+        self.assertEqual(pool.get_num_threads(), 1)
+        self.assertEqual(pool._num_replaced, 1)
+        self.assertEqual(stuck.overrun_count, 1)
+        for metric in pending:
+            metric.collect.assert_called_once_with()
+
+        release.set()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        for metric in pending:
+            metric.collect.assert_called_once_with()
+
+
+class CoreConfigTest(unittest.TestCase):
+    """
+    Test cases of CORE_CFG options used when metrics are registered
+    """
+
+    def setUp(self):
+        """
+        Method to replace CORE_CFG options read from liota.conf.
+        :return: None
+        """
+        patcher = mock.patch.object(metric_handler, "core_config", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("liota.core.metric_handler.read_liota_config_section",
+                             return_value={"metric_buffer_size": "16", "metric_overflow_policy": "drop_newest",
+                                           "send_batch_size": "many", "missed_deadline_policy": "skip",
+                                           "max_catch_up": "3", "scheduling_phase": "spread"})
+        self.read_section = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_core_config(self):
+        """
+        Test case to check liota.conf is read once, and defaults are used for options missing or invalid.
+        :return: None
+        """
+        self.assertEqual(metric_handler._read_core_config("metric_buffer_size", 0), 16)
+        self.assertEqual(metric_handler._read_core_config("send_batch_size", 1), 1)
+        self.assertEqual(metric_handler._read_core_config("send_linger_ms", 0), 0)
+        self.read_section.assert_called_once_with("CORE_CFG")
+
+    def test_create_value_buffer(self):
+        """
+        Test case to check value buffers take CORE_CFG defaults without reading liota.conf for each metric.
+        :return: None
+        """
+        for _ in range(100):
+            reg_metric = mock.Mock()
+            reg_metric.ref_entity.buffer_size = None
+            reg_metric.ref_entity.overflow_policy = None
+            values = metric_handler.create_value_buffer(reg_metric)
+        self.assertEqual(values.maxsize, 16)
+        self.assertIs(values.policy, OverflowPolicy.DROP_NEWEST)
+        self.assertEqual(self.read_section.call_count, 1)
+
+    def test_create_blocking_buffer(self):
+        """
+        Test case to check a blocking value buffer smaller than the aggregation size is rejected.
+        :return: None
+        """
+        reg_metric = mock.Mock()
+        reg_metric.ref_entity = Metric(name="Test_Metric", aggregation_size=8, buffer_size=4,
+                                       overflow_policy=OverflowPolicy.BLOCK)
+        self.assertRaises(ValueError, metric_handler.create_value_buffer, reg_metric)
+        reg_metric.ref_entity = Metric(name="Test_Metric", aggregation_size=2, max_aggregation_size=8,
+                                       buffer_size=4, overflow_policy=OverflowPolicy.BLOCK)
+        self.assertRaises(ValueError, metric_handler.create_value_buffer, reg_metric)
+        reg_metric.ref_entity = Metric(name="Test_Metric", aggregation_size=4, buffer_size=4,
+                                       overflow_policy=OverflowPolicy.BLOCK)
+        self.assertEqual(metric_handler.create_value_buffer(reg_metric).maxsize, 4)
+        reg_metric.ref_entity = Metric(name="Test_Metric", aggregation_size=32)
+        self.assertEqual(metric_handler.create_value_buffer(reg_metric).maxsize, 16)
+
+    def test_get_missed_deadline_policy(self):
+        """
+        Test case to check missed deadline policies default to CORE_CFG options, read once for all metrics.
+        :return: None
+        """
+        metric = mock.Mock(missed_deadline_policy=None, max_catch_up=None)
+        for _ in range(100):
+            self.assertEqual(metric_handler.get_missed_deadline_policy(metric), (MissedDeadlinePolicy.SKIP, 3))
+        metric = mock.Mock(missed_deadline_policy=MissedDeadlinePolicy.COALESCE, max_catch_up=1)
+        self.assertEqual(metric_handler.get_missed_deadline_policy(metric), (MissedDeadlinePolicy.COALESCE, 1))
+        self.assertEqual(self.read_section.call_count, 1)
+
+    def test_get_scheduling_phase(self):
+        """
+        Test case to check scheduling phases default to the CORE_CFG option, read once for all metrics.
+        :return: None
+        """
+        for _ in range(100):
+            self.assertIs(metric_handler.get_scheduling_phase(mock.Mock(scheduling_phase=None)),
+                          SchedulingPhase.SPREAD)
+        self.assertIs(metric_handler.get_scheduling_phase(mock.Mock(scheduling_phase=SchedulingPhase.ALIGN)),
+                      SchedulingPhase.ALIGN)
+        self.assertEqual(self.read_section.call_count, 1)
+
+    def test_register_metrics(self):
+        """
+        Test case to check registering many metrics reads liota.conf once.
+        :return: None
+        """
+        metric = Metric(name="Test_Metric", interval=10)
+        reg_metrics = [RegisteredMetric(metric, None, None) for _ in range(100)]
+        self.assertIs(reg_metrics[-1].scheduling_phase, SchedulingPhase.SPREAD)
+        self.assertEqual(reg_metrics[-1].values.maxsize, 16)
+        self.assertEqual(self.read_section.call_count, 1)
+
+
+class CreateSpoolTest(unittest.TestCase):
+    """
+    Test cases of the spools of DCCs
+    """
+
+    def setUp(self):
+        """
+        Method to configure a spool directory.
+        :return: None
+        """
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        patcher = mock.patch.object(metric_handler, "core_config", {"spool_dir": self.path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_class(self):
+        """
+        Test case to check DCCs of the same class get spools of their own.
+        :return: None
+        """
+        dccs = [mock.Mock(spec=["spool"]) for _ in range(3)]
+        spools = [metric_handler._create_spool(dcc) for dcc in dccs]
+        self.assertEqual([os.path.basename(spool.path) for spool in spools], ["Mock", "Mock.1", "Mock.2"])
+        for spool in spools:
+            spool.close()
+
+    def test_spool_name(self):
+        """
+        Test case to check spool_name names the spool of a DCC, and is not shared.
+        :return: None
+        """
+        first = metric_handler._create_spool(mock.Mock(spool_name="broker-a"))
+        self.assertEqual(first.path, os.path.join(self.path, "broker-a"))
+        self.assertIsNone(metric_handler._create_spool(mock.Mock(spool_name="broker-a")))
+        first.close()
+
+
+class ProcessPoolTest(unittest.TestCase):
+    """
+    Test cases of the process pool of ExecutionMode.PROCESS
+    """
+
+    def setUp(self):
+        """
+        Method to configure the size of the process pool.
+        :return: None
+        """
+        for name, value in [("core_config", {"collect_process_pool_size": "2"}), ("process_pool", None)]:
+            patcher = mock.patch.object(metric_handler, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_get_process_pool(self):
+        """
+        Test case to check the pool is created on first use with the configured size, then reused.
+        :return: None
+        """
+        self.assertIsNone(metric_handler.process_pool)
+        pool = metric_handler.get_process_pool()
+        self.addCleanup(pool.terminate)
+        self.assertIs(metric_handler.get_process_pool(), pool)
+        self.assertEqual(len(pool._pool), 2)
+        self.assertNotEqual(pool.apply_async(os.getpid).get(5), os.getpid())
+
+    def test_initialize(self):
+        """
+        Test case to check initialize() forks the process pool before starting any thread.
+        :return: None
+        """
+        calls = mock.Mock()
+        patchers = [mock.patch.object(metric_handler, name, None)
+                    for name in ["event_ds", "event_checker_thread", "collect_queue", "collect_thread_pool",
+                                 "collection_watchdog"]]
+        patchers.append(mock.patch.object(metric_handler, "is_initialization_done", False))
+        patchers.append(mock.patch("multiprocessing.Pool", calls.Pool))
+        for name in ["EventCheckerThread", "CollectionThreadPool", "CollectionWatchdog"]:
+            patchers.append(mock.patch.object(metric_handler, name, getattr(calls, name)))
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        metric_handler.initialize()
+
+        self.assertEqual([call[0] for call in calls.mock_calls],
+                         ["Pool", "EventCheckerThread", "CollectionThreadPool", "CollectionWatchdog"])
+        self.assertIs(metric_handler.get_process_pool(), calls.Pool.return_value)
+
+    def test_recycle_process_pool(self):
+        """
+        Test case to check a recycled pool is replaced and interrupts collections waiting on it.
+        :return: None
+        """
+        pool = metric_handler.get_process_pool()
+        self.addCleanup(pool.terminate)
+        result = mock.Mock()
+        result.get.side_effect = multiprocessing.TimeoutError()
+        metric_handler.recycle_process_pool(pool)
+        self.assertIsNone(metric_handler.process_pool)
+        new_pool = metric_handler.get_process_pool()
+        self.addCleanup(new_pool.terminate)
+        self.assertIsNot(new_pool, pool)
+        with mock.patch.object(metric_handler, "process_poll_interval", 0.01):
+            self.assertRaises(RuntimeError, metric_handler.get_process_result, pool, result, None)
+            self.assertRaises(multiprocessing.TimeoutError, metric_handler.get_process_result, new_pool, result, 0.05)
+
+
+class SendThreadTest(unittest.TestCase):
+    """
+    SendThread unit test cases
+    """
+
+    def _send(self, metrics, batch_size):
+        send_queue = Queue()
+        for metric in metrics:
+            send_queue.put(metric)
+        send_queue.put(SystemExit())
+        SendThread(send_queue, batch_size=batch_size).join(5)
+
+    def test_publish_batch(self):
+        """
+        Test case to check queued metrics sharing msg_attr are published together.
+        :return: None
+        """
+        dcc = mock.Mock()
+        msg_attr = object()
+        first, second, third, dead = [mock.Mock(ref_dcc=dcc, msg_attr=msg_attr,
+                                                flag_alive=True) for _ in range(4)]
+        third.msg_attr = object()
+        dead.flag_alive = False
+        self._send([first, second, dead, third, first], batch_size=8)
+
+        dcc.publish_batch.assert_called_once_with([first, second])
+        third.send_data.assert_called_once_with()
+        self.assertFalse(dead.send_data.called)
+
+    def test_publish_single(self):
+        """
+        Test case to check each metric is published on its own by default.
+        :return: None
+        """
+        dcc = mock.Mock()
+        metrics = [mock.Mock(ref_dcc=dcc, msg_attr=None, flag_alive=True)
+                   for _ in range(3)]
+        self._send(metrics, batch_size=1)
+
+        self.assertFalse(dcc.publish_batch.called)
+        for metric in metrics:
+            metric.send_data.assert_called_once_with()
+
+    def test_publish_equal_metrics(self):
+        """
+        Test case to check different metrics due at the same time are all published.
+        :return: None
+        """
+        dcc = mock.Mock()
+        metrics = []
+        for name in ["First_Metric", "Second_Metric"]:
+            metric = RegisteredMetric(Metric(name=name, interval=10, sampling_function=lambda: 1), dcc, None)
+            metric.flag_alive = True
+            metric._next_run_time = 1000
+            metric.store_collected_data(1)
+            metrics.append(metric)
+        self.assertEqual(metrics[0], metrics[1])
+        self._send(metrics + [metrics[0]], batch_size=8)
+
+        dcc.publish_batch.assert_called_once_with(metrics)
+
+    def test_send_groups(self):
+        """
+        Test case to check a batch is split by msg_attr, publish of each group is recorded in the pool.
+        :return: None
+        """
+        dcc = mock.Mock()
+        pool = mock.Mock()
+        first_attr, second_attr = object(), object()
+        first, second, third, fourth, single = [mock.Mock(ref_dcc=dcc, flag_alive=True) for _ in range(5)]
+        first.msg_attr = third.msg_attr = first_attr
+        second.msg_attr = fourth.msg_attr = second_attr
+        single.msg_attr = None
+        for metric in [first, second, third, fourth, single]:
+            metric.values.qsize.return_value = 2
+        thread = SendThread(Queue(), batch_size=8, pool=pool)
+        thread._send_queue.put(SystemExit())
+        thread.join(5)
+        thread._send([first, second, single, third, fourth])
+
+        self.assertEqual(dcc.publish_batch.call_args_list,
+                         [mock.call([first, third]), mock.call([second, fourth])])
+        single.send_data.assert_called_once_with()
+        self.assertEqual([(call[0][0], call[0][2]) for call in pool.record_publish.call_args_list],
+                         [([first, third], 4), ([second, fourth], 4), ([single], 2)])
+
+
+class FirstDcc(object):
+    spool = None
+
+
+class SecondDcc(object):
+    spool = None
+
+
+class SpoolingDcc(object):
+    spool = None
+
+    def _try_send(self, message, msg_attr):
+        return True
+
+
+class SendPoolTest(unittest.TestCase):
+    """
+    Test cases of the SendThreadPool of each DCC
+    """
+
+    def setUp(self):
+        """
+        Method to start from default options and no send pools.
+        :return: None
+        """
+        for name, value in [("core_config", {}), ("send_pools", {})]:
+            patcher = mock.patch.object(metric_handler, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get_send_pool(self, dcc):
+        pool = metric_handler.get_send_pool(dcc)
+        self.addCleanup(pool.terminate)
+        return pool
+
+    def _metric(self, dcc, senders):
+        metric = mock.Mock(ref_dcc=dcc, msg_attr=None, flag_alive=True)
+        metric.ref_entity.priority.value = 1
+        metric.values.qsize.return_value = 1
+        metric.send_data.side_effect = lambda: senders.append(current_thread().name)
+        return metric
+
+    def test_get_send_pool(self):
+        """
+        Test case to check a send pool is created once for each DCC instance.
+        :return: None
+        """
+        first_dcc, second_dcc = FirstDcc(), FirstDcc()
+        pool = self._get_send_pool(first_dcc)
+        self.assertIs(metric_handler.get_send_pool(first_dcc), pool)
+        other_pool = self._get_send_pool(second_dcc)
+        self.assertIsNot(other_pool, pool)
+        self.assertEqual(len(metric_handler.get_send_pools()), 2)
+        self.assertEqual(len(pool._threads), 1)
+        self.assertIsNone(pool.spool)
+
+    def test_send_pool_isolation(self):
+        """
+        Test case to check metrics of a DCC are only published by the send threads of that DCC.
+        :return: None
+        """
+        first_dcc, second_dcc = FirstDcc(), SecondDcc()
+        first_pool = self._get_send_pool(first_dcc)
+        second_pool = self._get_send_pool(second_dcc)
+        first_senders, second_senders = [], []
+        for _ in range(3):
+            first_pool.put(self._metric(first_dcc, first_senders))
+        second_pool.put(self._metric(second_dcc, second_senders))
+        # An exit signal overtakes queued metrics, wait for them to be sent
+        deadline = time.time() + 5
+        while (len(first_senders) < 3 or not second_senders) and time.time() < deadline:
+            time.sleep(0.01)
+        for pool in [first_pool, second_pool]:
+            pool.terminate()
+            for thread in pool._threads:
+                thread.join(5)
+
+        self.assertEqual(first_senders, ["FirstDcc-Sender-1"] * 3)
+        self.assertEqual(second_senders, ["SecondDcc-Sender-1"])
+        self.assertEqual(first_pool.get_stats()[0], "FirstDcc")
+        self.assertEqual(second_pool.send_queue.qsize(), 0)
+
+    def test_release_send_pool(self):
+        """
+        Test case to check releasing the send pool of a DCC stops its threads and forgets the pool.
+        :return: None
+        """
+        dcc = FirstDcc()
+        pool = metric_handler.get_send_pool(dcc)
+
+        self.assertTrue(metric_handler.release_send_pool(dcc))
+        self.assertFalse(metric_handler.release_send_pool(dcc))
+        self.assertEqual(metric_handler.get_send_pools(), [])
+        self.assertFalse(any(thread.is_alive() for thread in pool._threads))
+        self.assertIsNot(self._get_send_pool(dcc), pool)
+
+    def test_release_spool(self):
+        """
+        Test case to check releasing the send pool of a DCC closes its spool, which a new DCC of the same class reopens.
+        :return: None
+        """
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        metric_handler.core_config["spool_dir"] = path
+        dcc = SpoolingDcc()
+        pool = metric_handler.get_send_pool(dcc)
+        spool = dcc.spool
+        self.assertEqual(spool.path, os.path.join(path, "SpoolingDcc"))
+
+        metric_handler.release_send_pool(dcc)
+        self.assertFalse(pool._replay_thread.is_alive())
+        self.assertIsNone(dcc.spool)
+        new_dcc = SpoolingDcc()
+        self._get_send_pool(new_dcc)
+        self.addCleanup(new_dcc.spool.close)
+        self.assertEqual(new_dcc.spool.path, spool.path)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
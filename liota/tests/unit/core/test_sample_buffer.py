@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+from Queue import Empty, Full
+from threading import Thread
+
+from liota.core.bounded_queue import OverflowPolicy
+from liota.core.sample_buffer import SampleBuffer, split_array_batch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SampleBufferTest(unittest.TestCase):
+    """
+    SampleBuffer unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to initialise the list of dropped samples.
+        :return: None
+        """
+        self.dropped = []
+
+    def _samples(self, count, start=0):
+        return [(1000L * i, i * 0.5) for i in range(start, start + count)]
+
+    def test_put_get(self):
+        """
+        Test case to check samples are returned in order, across growth of the buffer.
+        :return: None
+        """
+        buf = SampleBuffer()
+        samples = self._samples(100)
+        for sample in samples:
+            buf.put(sample)
+        self.assertEqual(buf.qsize(), 100)
+        self.assertEqual([buf.get() for _ in range(100)], samples)
+        self.assertRaises(Empty, buf.get, False)
+        self.assertRaises(Empty, buf.get, True, 0.01)
+
+    def test_drain(self):
+        """
+        Test case to check all samples are taken at once.
+        :return: None
+        """
+        buf = SampleBuffer()
+        buf.put_many(self._samples(40))
+        self.assertEqual(buf.get(), (0, 0.0))
+        timestamps, values = buf.drain()
+        self.assertEqual(timestamps, range(1000, 40000, 1000))
+        self.assertEqual(values, [i * 0.5 for i in range(1, 40)])
+        self.assertEqual(buf.qsize(), 0)
+        self.assertEqual(buf.drain(), ([], []))
+
+    def test_value_types(self):
+        """
+        Test case to check values keep their type, with mixed or non-numeric values.
+        :return: None
+        """
+        buf = SampleBuffer()
+        buf.put_many([(1, 10), (2, 10.5), (3, True), (4, "on"), (5, 2 ** 70)])
+        self.assertEqual(buf.drain(), ([1, 2, 3, 4, 5], [10, 10.5, True, "on", 2 ** 70]))
+
+        buf.put_many([(1, 10), (2, 11)])
+        self.assertEqual(buf.get(), (1, 10))
+        self.assertIsInstance(buf.get()[1], int)
+        buf.put((3, False))
+        self.assertIs(buf.get()[1], False)
+
+    def test_memory_size(self):
+        """
+        Test case to check numeric samples are stored in arrays.
+        :return: None
+        """
+        buf = SampleBuffer()
+        buf.put_many(self._samples(1024))
+        self.assertLess(buf.memory_size(), 1024 * 20)
+
+    def test_drop_oldest(self):
+        """
+        Test case to check DROP_OLDEST policy overwrites the oldest samples.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.DROP_OLDEST, self.dropped.append)
+        buf.put_many(self._samples(10))
+        self.assertEqual(buf.drain()[0], [6000, 7000, 8000, 9000])
+        self.assertEqual(self.dropped, self._samples(6))
+        self.assertEqual(buf.num_dropped, 6)
+
+    def test_drop_newest(self):
+        """
+        Test case to check DROP_NEWEST policy drops samples being added.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.DROP_NEWEST, self.dropped.append)
+        buf.put_many(self._samples(6))
+        self.assertEqual(buf.drain()[0], [0, 1000, 2000, 3000])
+        self.assertEqual(self.dropped, self._samples(2, 4))
+
+    def test_downsample(self):
+        """
+        Test case to check DOWNSAMPLE policy keeps every other sample.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.DOWNSAMPLE, self.dropped.append)
+        buf.put_many(self._samples(5))
+        self.assertEqual(buf.drain()[0], [0, 2000, 4000])
+        self.assertEqual([ts for ts, _ in self.dropped], [1000, 3000])
+
+    def test_block(self):
+        """
+        Test case to check BLOCK policy blocks the producer.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.BLOCK)
+        buf.put_many(self._samples(4))
+        self.assertRaises(Full, buf.put, (5000, 1), False)
+        self.assertRaises(Full, buf.put, (5000, 1), True, 0.01)
+        buf.get()
+        buf.put((5000, 1), False)
+        self.assertEqual(buf.qsize(), 4)
+
+    def test_block_clear(self):
+        """
+        Test case to check a producer blocked by BLOCK policy resumes when the buffer is cleared.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.BLOCK)
+        buf.put_many(self._samples(4))
+        errors = []
+
+        def put():
+            try:
+                buf.put((5000, 1), True, 5)
+            except Exception as e:
+                errors.append(e)
+        putter = Thread(target=put)
+        putter.start()
+        while not buf._num_putters and putter.is_alive():
+            putter.join(0.001)
+        buf.clear()
+        putter.join(5)
+        self.assertFalse(putter.is_alive())
+        self.assertEqual(errors, [])
+        self.assertEqual(buf.drain(), ([5000], [1]))
+
+    def test_lazy_state(self):
+        """
+        Test case to check an empty buffer allocates no storage nor conditions until needed.
+        :return: None
+        """
+        buf = SampleBuffer()
+        self.assertIsNone(buf._not_empty)
+        self.assertIsNone(buf._not_full)
+        self.assertEqual(buf._capacity, 0)
+        self.assertFalse(hasattr(buf, '__dict__'))
+        buf.put((1000, 1))
+        buf.clear()
+        self.assertEqual(buf._capacity, 0)
+
+        # A waiting consumer is woken up by a producer
+        getter = Thread(target=lambda: self.dropped.append(buf.get(True, 5)))
+        getter.start()
+        while not buf._num_getters and getter.is_alive():
+            getter.join(0.001)
+        buf.put((2000, 2))
+        getter.join(5)
+        self.assertEqual(self.dropped, [(2000, 2)])
+        self.assertIsNone(buf._not_full)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_put_arrays(self):
+        """
+        Test case to check NumPy batches are appended at once, across the end of the ring.
+        :return: None
+        """
+        buf = SampleBuffer()
+        buf.put_many(self._samples(10))
+        for _ in range(10):
+            buf.get()
+        timestamps = numpy.arange(100, dtype=numpy.int64) * 1000
+        buf.put_arrays(timestamps, timestamps * 0.5)
+        self.assertLess(buf.memory_size(), 100 * 20)
+        buf.put_arrays(numpy.array([100000]), numpy.array([7], dtype=numpy.int32))
+        drained = buf.drain()
+        self.assertEqual(drained[0], range(0, 101000, 1000))
+        self.assertEqual(drained[1], [i * 500.0 for i in range(100)] + [7])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_put_arrays_overflow(self):
+        """
+        Test case to check overflow policy applies to NumPy batches.
+        :return: None
+        """
+        buf = SampleBuffer(4, OverflowPolicy.DROP_OLDEST, self.dropped.append)
+        buf.put_arrays(numpy.arange(6), numpy.array([True] * 6))
+        self.assertEqual(buf.drain(), ([2, 3, 4, 5], [True] * 4))
+        self.assertEqual(len(self.dropped), 2)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_split_array_batch(self):
+        """
+        Test case to check batches of samples are recognised.
+        :return: None
+        """
+        timestamps, values = numpy.arange(3), numpy.ones(3)
+        self.assertIs(split_array_batch((timestamps, values))[0], timestamps)
+        structured = numpy.zeros(3, dtype=[("ts", numpy.int64), ("value", numpy.float64)])
+        self.assertEqual(len(split_array_batch(structured)[1]), 3)
+        self.assertIsNone(split_array_batch(values))
+        self.assertIsNone(split_array_batch((1000, 1.5)))
+        self.assertRaises(ValueError, split_array_batch, (timestamps, numpy.ones(2)))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
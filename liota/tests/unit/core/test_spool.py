@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import os
+import shutil
+import tempfile
+import unittest
+from threading import Event
+
+from liota.core.spool import Spool, SpoolInUseError, SpoolReplayThread
+
+
+class SpoolTest(unittest.TestCase):
+    """
+    Spool unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create the spool directory.
+        :return: None
+        """
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Method to remove the spool directory.
+        :return: None
+        """
+        shutil.rmtree(self.path)
+
+    def _drain(self, spool):
+        messages = []
+        while True:
+            record = spool.peek()
+            if record is None:
+                return messages
+            messages.append(record[0])
+            spool.pop()
+
+    def _segment_files(self):
+        return sorted(name for name in os.listdir(self.path)
+                      if name.endswith(".seg"))
+
+    def test_append_pop(self):
+        """
+        Test case to check records are returned oldest first, across segments, with their msg_attr.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256)
+        for i in range(50):
+            spool.append("message %d" % i, {"topic": i})
+        self.assertEqual(spool.qsize(), 50)
+        self.assertTrue(len(self._segment_files()) > 1)
+        self.assertEqual(spool.peek(), ("message 0", {"topic": 0}))
+        # peek() does not remove the record
+        self.assertEqual(spool.peek(), ("message 0", {"topic": 0}))
+        self.assertEqual(self._drain(spool),
+                         ["message %d" % i for i in range(50)])
+        self.assertEqual(spool.qsize(), 0)
+        self.assertEqual(spool.num_sent, 50)
+        # Segments sent are removed
+        self.assertEqual(len(self._segment_files()), 1)
+        spool.close()
+
+    def test_resume(self):
+        """
+        Test case to check a spool opened again resumes after the records already sent.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256)
+        for i in range(30):
+            spool.append("message %d" % i)
+        for _ in range(12):
+            spool.peek()
+            spool.pop()
+        spool.close()
+
+        spool = Spool(self.path, segment_size=256)
+        self.assertEqual(spool.qsize(), 18)
+        spool.append("message 30")
+        self.assertEqual(self._drain(spool),
+                         ["message %d" % i for i in range(12, 31)])
+        spool.close()
+
+    def test_max_size(self):
+        """
+        Test case to check oldest segments are dropped when the spool is full.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256, max_size=1024)
+        for i in range(200):
+            spool.append("message %d" % i)
+        self.assertTrue(spool.disk_size() <= 1024)
+        self.assertTrue(spool.num_dropped > 0)
+        self.assertEqual(spool.qsize() + spool.num_dropped, 200)
+        messages = self._drain(spool)
+        self.assertEqual(messages[-1], "message 199")
+        self.assertEqual(messages[0], "message %d" % spool.num_dropped)
+        spool.close()
+
+    def test_pop_dropped(self):
+        """
+        Test case to check pop() removes nothing if the record peeked was dropped by a full spool.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256, max_size=1024)
+        spool.append("message 0")
+        self.assertEqual(spool.peek(), ("message 0", None))
+        i = 1
+        while not spool.num_dropped:
+            spool.append("message %d" % i)
+            i += 1
+        self.assertFalse(spool.pop())
+        self.assertEqual(spool.num_sent, 0)
+        # The oldest record left was never peeked, it is still pending
+        self.assertEqual(spool.peek(), ("message %d" % spool.num_dropped, None))
+        self.assertTrue(spool.pop())
+        self.assertEqual(spool.qsize() + spool.num_dropped + spool.num_sent, i)
+        spool.close()
+
+    def test_lock(self):
+        """
+        Test case to check a spool directory can not be opened twice at once.
+        :return: None
+        """
+        spool = Spool(self.path)
+        self.assertRaises(SpoolInUseError, Spool, self.path)
+        spool.close()
+        Spool(self.path).close()
+
+    def test_large_record(self):
+        """
+        Test case to check a record larger than segment_size gets a segment of its own.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=64)
+        spool.append("a")
+        spool.append("b" * 1000)
+        spool.append("c")
+        self.assertEqual(self._drain(spool), ["a", "b" * 1000, "c"])
+        spool.close()
+
+    def test_corruption(self):
+        """
+        Test case to check records failing CRC check are skipped with the rest of their segment.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256)
+        for i in range(30):
+            spool.append("message %d" % i)
+        spool.close()
+        first_segment = os.path.join(self.path, self._segment_files()[0])
+        with open(first_segment, "r+b") as f:
+            f.seek(20)
+            f.write("garbage")
+
+        spool = Spool(self.path, segment_size=256)
+        messages = self._drain(spool)
+        self.assertTrue(0 < len(messages) < 30)
+        self.assertEqual(messages[-1], "message 29")
+        spool.close()
+
+    def test_torn_record(self):
+        """
+        Test case to check a record without header at the end of the spool is overwritten.
+        :return: None
+        """
+        spool = Spool(self.path, segment_size=256)
+        spool.append("message 0")
+        spool.close()
+        segment = os.path.join(self.path, self._segment_files()[0])
+        with open(segment, "r+b") as f:
+            # Payload written by a process which crashed before its header
+            f.seek(100)
+            f.write("torn payload")
+
+        spool = Spool(self.path, segment_size=256)
+        self.assertEqual(spool.qsize(), 1)
+        spool.append("message 1")
+        self.assertEqual(self._drain(spool), ["message 0", "message 1"])
+        spool.close()
+
+    def test_replay(self):
+        """
+        Test case to check replay sends records in order and keeps them after a failed send.
+        :return: None
+        """
+        spool = Spool(self.path)
+        sent = []
+        done = Event()
+        failures = [1]
+
+        def send(message, msg_attr):
+            if failures[0]:
+                failures[0] -= 1
+                return False
+            sent.append(message)
+            if len(sent) == 20:
+                done.set()
+            return True
+
+        for i in range(20):
+            spool.append("message %d" % i)
+        replay = SpoolReplayThread(spool, send, rate=0, retry_interval=0.01)
+        self.assertTrue(done.wait(5))
+        replay.stop()
+        replay.join(5)
+        self.assertFalse(replay.is_alive())
+        self.assertEqual(sent, ["message %d" % i for i in range(20)])
+        self.assertEqual(spool.qsize(), 0)
+        spool.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
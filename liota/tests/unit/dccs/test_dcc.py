@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from liota.core.spool import Spool
+from liota.dcc_comms.dcc_comms import DCCComms
+from liota.dccs.dcc import DataCenterComponent
+
+
+class FakeDcc(DataCenterComponent):
+
+    def __init__(self, comms):
+        super(FakeDcc, self).__init__(comms)
+
+    def register(self, entity_obj):
+        pass
+
+    def create_relationship(self, reg_entity_parent, reg_entity_child):
+        pass
+
+    def _format_data(self, reg_metric):
+        return reg_metric.message
+
+    def set_properties(self, reg_entity, properties):
+        pass
+
+    def unregister(self, entity_obj):
+        pass
+
+
+class DataCenterComponentTest(unittest.TestCase):
+    """
+    DataCenterComponent unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create a DCC with a spool.
+        :return: None
+        """
+        self.path = tempfile.mkdtemp()
+        self.comms = mock.Mock(spec=DCCComms)
+        self.dcc = FakeDcc(self.comms)
+        self.dcc.spool = Spool(self.path)
+
+    def tearDown(self):
+        """
+        Method to remove the spool.
+        :return: None
+        """
+        self.dcc.spool.close()
+        shutil.rmtree(self.path)
+
+    def test_send(self):
+        """
+        Test case to check messages sent by comms are not spooled.
+        :return: None
+        """
+        self.comms.send.return_value = None
+        self.dcc._send("message", "msg_attr")
+
+        self.comms.send.assert_called_once_with("message", "msg_attr")
+        self.assertEqual(self.dcc.spool.qsize(), 0)
+
+    def test_spool_failed_send(self):
+        """
+        Test case to check messages comms fails to send are spooled with their msg_attr.
+        :return: None
+        """
+        self.comms.send.return_value = False
+        self.dcc._send("first", "msg_attr")
+        self.comms.send.side_effect = IOError("Connection lost")
+        self.dcc._send("second", None)
+
+        self.assertEqual(self.dcc.spool.qsize(), 2)
+        self.assertEqual(self.dcc.spool.peek(), ("first", "msg_attr"))
+        self.dcc.spool.pop()
+        self.assertEqual(self.dcc.spool.peek(), ("second", None))
+
+    def test_send_without_spool(self):
+        """
+        Test case to check comms exceptions are raised when the DCC has no spool.
+        :return: None
+        """
+        self.dcc.spool.close()
+        self.dcc.spool = None
+        self.comms.send.side_effect = IOError("Connection lost")
+        self.assertRaises(IOError, self.dcc._send, "message", None)
+        self.dcc.spool = Spool(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
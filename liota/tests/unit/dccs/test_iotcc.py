@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import json
+import unittest
+
+import mock
+
+from liota.core.sample_buffer import SampleBuffer
+from liota.dccs.iotcc import IotControlCenter
+from liota.lib.utilities.filters.windowing_scheme.window_aggregator import WindowSummary
+
+
+class IotControlCenterTest(unittest.TestCase):
+    """
+    IotControlCenter unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create an IotControlCenter without connecting it.
+        :return: None
+        """
+        self.iotcc = IotControlCenter.__new__(IotControlCenter)
+
+    def _reg_metric(self, samples):
+        reg_metric = mock.Mock(reg_entity_id="uuid")
+        reg_metric.ref_entity.name = "cpu"
+        reg_metric.values = SampleBuffer()
+        reg_metric.values.put_many(samples)
+        return reg_metric
+
+    def test_format_data(self):
+        """
+        Test case to check values are sent as one stat of the metric.
+        :return: None
+        """
+        message = json.loads(self.iotcc._format_data(self._reg_metric([(1000, 1.5), (2000, 2.5)])))
+        self.assertEqual(message["metric_data"], [{"statKey": "cpu", "timestamps": [1000, 2000], "data": [1.5, 2.5]}])
+        self.assertIsNone(self.iotcc._format_data(self._reg_metric([])))
+
+    def test_format_window_summary(self):
+        """
+        Test case to check a WindowSummary is sent as one numeric stat per field.
+        :return: None
+        """
+        message = json.loads(self.iotcc._format_data(self._reg_metric([
+            (10000, WindowSummary(1, 5, 3.0, 4, 2)),
+            (20000, WindowSummary(2, 6, 4.0, 3, 6))
+        ])))
+        self.assertEqual([stat["statKey"] for stat in message["metric_data"]],
+                         ["cpu.min", "cpu.max", "cpu.mean", "cpu.count", "cpu.last"])
+        self.assertEqual(message["metric_data"][2], {"statKey": "cpu.mean", "timestamps": [10000, 20000],
+                                                     "data": [3.0, 4.0]})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import os
+import time
+import unittest
+
+import mock
+
+from liota.core import metric_handler
+from liota.core.bounded_queue import OverflowPolicy
+from liota.core.metric_handler import ExecutionMode, MissedDeadlinePolicy, SchedulingPhase
+from liota.entities.metrics.metric import Metric
+from liota.entities.metrics.registered_metric import RegisteredMetric, MAX_BACKOFF_INTERVALS
+from liota.lib.utilities.filters.filter_pipeline import FilterPipeline
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Sampling function
+def sampling_function():
+    return 10
+
+
+# Sampling function run in a worker process
+def process_sampling_function():
+    return os.getpid()
+
+
+def hung_sampling_function():
+    time.sleep(60)
+    return 0
+
+
+# Sampling function returning a batch of samples
+def batch_sampling_function():
+    timestamps = numpy.arange(1000, dtype=numpy.int64)
+    return timestamps, numpy.sin(timestamps)
+
+
+class RegisteredMetricTest(unittest.TestCase):
+    """
+    RegisteredMetric unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to initialise the RegisteredMetric.
+        :return: None
+        """
+        self.metric = Metric(
+            name="Test_Metric",
+            unit=None,
+            interval=10,
+            aggregation_size=2,
+            sampling_function=sampling_function,
+            sampling_timeout=1
+        )
+        self.reg_metric = RegisteredMetric(self.metric, None, None)
+
+    def tearDown(self):
+        """
+        Method to cleanup the resource created during the execution of test case.
+        :return: None
+        """
+        self.metric = None
+        self.reg_metric = None
+
+    def test_slots(self):
+        """
+        Test case to check metrics have no instance dict, and msg_attr is only set on request.
+        :return: None
+        """
+        self.assertFalse(hasattr(self.metric, '__dict__'))
+        self.assertFalse(hasattr(self.reg_metric, '__dict__'))
+        self.assertFalse(hasattr(self.reg_metric, 'msg_attr'))
+        self.reg_metric.msg_attr = "msg_attr"
+        self.assertEqual(self.reg_metric.msg_attr, "msg_attr")
+
+    def test_set_next_run_time(self):
+        """
+        Test case to check the next run time advances by one interval.
+        :return: None
+        """
+        self.reg_metric._next_run_time = 100000
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=105000):
+            self.reg_metric.set_next_run_time()
+        self.assertEqual(self.reg_metric.get_next_run_time(), 110000)
+        self.assertEqual(self.reg_metric.deadline_miss_count, 0)
+
+    def test_deadline_miss(self):
+        """
+        Test case to check a next run time already in the past counts as a deadline miss.
+        :return: None
+        """
+        self.reg_metric._next_run_time = 100000
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=125000):
+            self.reg_metric.set_next_run_time()
+        self.assertEqual(self.reg_metric.deadline_miss_count, 1)
+
+    def test_overrun_backoff(self):
+        """
+        Test case to check overruns are counted once per collection and back off exponentially.
+        :return: None
+        """
+        self.reg_metric._next_run_time = 100000
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=200000):
+            self.reg_metric.record_overrun()
+            self.reg_metric.record_overrun()
+            self.reg_metric.set_next_run_time()
+            self.assertEqual(self.reg_metric.overrun_count, 1)
+            self.assertEqual(self.reg_metric.get_next_run_time(), 200000 + 2 * 10000)
+
+            self.reg_metric.record_overrun()
+            self.reg_metric.set_next_run_time()
+            self.assertEqual(self.reg_metric.get_next_run_time(), 200000 + 4 * 10000)
+
+            for _ in range(10):
+                self.reg_metric.record_overrun()
+                self.reg_metric.set_next_run_time()
+            self.assertEqual(self.reg_metric.get_next_run_time(), 200000 + MAX_BACKOFF_INTERVALS * 10000)
+
+        # A timely collection resets the backoff
+        self.reg_metric.set_next_run_time()
+        self.assertEqual(self.reg_metric._consecutive_overruns, 0)
+        self.assertEqual(self.reg_metric.overrun_count, 12)
+
+    def test_overrun_backoff_phase(self):
+        """
+        Test case to check backing off keeps the next run time on the phase of the metric.
+        :return: None
+        """
+        self.reg_metric._next_run_time = 103000
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=205500):
+            self.reg_metric.record_overrun()
+            self.reg_metric.set_next_run_time()
+        self.assertEqual(self.reg_metric.get_next_run_time(), 233000)
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=234000):
+            self.reg_metric.set_next_run_time()
+        self.assertEqual(self.reg_metric.get_next_run_time(), 243000)
+
+    def test_collect(self):
+        """
+        Test case to check collected values are stored and counted for aggregation.
+        :return: None
+        """
+        self.reg_metric.collect()
+        self.reg_metric.collect()
+        self.assertEqual(self.reg_metric.values.qsize(), 2)
+        self.assertTrue(self.reg_metric.is_ready_to_send())
+
+    def test_collect_process(self):
+        """
+        Test case to check a sampling function in ExecutionMode.PROCESS runs in a worker process.
+        :return: None
+        """
+        patcher = mock.patch.object(metric_handler, "process_pool", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            sampling_function=process_sampling_function,
+            execution_mode=ExecutionMode.PROCESS,
+            sampling_timeout=5
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        reg_metric.collect()
+        self.addCleanup(metric_handler.process_pool.terminate)
+        self.assertEqual(reg_metric.values.qsize(), 1)
+        self.assertNotEqual(reg_metric.values.get()[1], os.getpid())
+        self.assertEqual(reg_metric.overrun_count, 0)
+
+    def test_collect_process_timeout(self):
+        """
+        Test case to check the process pool is recycled when a sampling function in ExecutionMode.PROCESS times out.
+        :return: None
+        """
+        patcher = mock.patch.object(metric_handler, "process_pool", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            sampling_function=hung_sampling_function,
+            execution_mode=ExecutionMode.PROCESS,
+            sampling_timeout=0.5
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        pool = metric_handler.get_process_pool()
+        self.addCleanup(pool.terminate)
+        workers = list(pool._pool)
+        reg_metric.collect()
+        self.assertEqual(reg_metric.values.qsize(), 0)
+        self.assertEqual(reg_metric.overrun_count, 1)
+        self.assertIsNone(metric_handler.process_pool)
+        for worker in workers:
+            worker.join(5)
+            self.assertFalse(worker.is_alive())
+
+    def test_buffer_overflow(self):
+        """
+        Test case to check values dropped by a full buffer are counted.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            sampling_function=sampling_function,
+            buffer_size=2,
+            overflow_policy=OverflowPolicy.DROP_NEWEST
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        for _ in range(5):
+            reg_metric.collect()
+        self.assertEqual(reg_metric.values.qsize(), 2)
+        self.assertEqual(reg_metric.dropped_values, 3)
+
+    def _reschedule_late(self, missed_deadline_policy, max_catch_up=None):
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            sampling_function=sampling_function,
+            missed_deadline_policy=missed_deadline_policy,
+            max_catch_up=max_catch_up
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        reg_metric._next_run_time = 100000
+        # Collection completed 45 s late: run times 110 s to 140 s have passed
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=145000):
+            reg_metric.set_next_run_time()
+        return reg_metric
+
+    def test_missed_deadline_policy(self):
+        """
+        Test case to check rescheduling of a metric that missed run times.
+        :return: None
+        """
+        reg_metric = self._reschedule_late(MissedDeadlinePolicy.CATCH_UP)
+        self.assertEqual(reg_metric.get_next_run_time(), 110000)
+        self.assertEqual(reg_metric.missed_intervals, 0)
+
+        reg_metric = self._reschedule_late(MissedDeadlinePolicy.CATCH_UP, max_catch_up=1)
+        self.assertEqual(reg_metric.get_next_run_time(), 140000)
+        self.assertEqual(reg_metric.missed_intervals, 3)
+
+        reg_metric = self._reschedule_late(MissedDeadlinePolicy.COALESCE)
+        self.assertEqual(reg_metric.get_next_run_time(), 140000)
+        self.assertEqual(reg_metric.missed_intervals, 3)
+
+        reg_metric = self._reschedule_late(MissedDeadlinePolicy.SKIP)
+        self.assertEqual(reg_metric.get_next_run_time(), 150000)
+        self.assertEqual(reg_metric.missed_intervals, 4)
+        self.assertEqual(reg_metric.deadline_miss_count, 1)
+
+    def _register(self, name, scheduling_phase):
+        metric = Metric(
+            name=name,
+            interval=10,
+            sampling_function=sampling_function,
+            scheduling_phase=scheduling_phase
+        )
+        return RegisteredMetric(metric, None, None)
+
+    def test_get_first_run_time(self):
+        """
+        Test case to check first run times of each scheduling phase.
+        :return: None
+        """
+        now = 123456
+        self.assertEqual(self._register("m", SchedulingPhase.NONE).get_first_run_time(now), 133456)
+        self.assertEqual(self._register("m", SchedulingPhase.ALIGN).get_first_run_time(now), 130000)
+        self.assertEqual(self._register("m", SchedulingPhase.ALIGN).get_first_run_time(130000), 140000)
+
+        first_run_times = set()
+        for i in range(20):
+            first_run_time = self._register("m%d" % i, SchedulingPhase.SPREAD).get_first_run_time(now)
+            self.assertTrue(now < first_run_time <= now + 10000)
+            # Offset within the interval depends only on the metric
+            self.assertEqual(self._register("m%d" % i, SchedulingPhase.SPREAD).get_first_run_time(now + 10000),
+                             first_run_time + 10000)
+            first_run_times.add(first_run_time)
+        self.assertGreater(len(first_run_times), 10)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_collect_array_batch(self):
+        """
+        Test case to check a NumPy batch counts every sample for aggregation.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=1000,
+            sampling_function=batch_sampling_function
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        reg_metric.collect()
+        self.assertEqual(reg_metric.values.qsize(), 1000)
+        self.assertTrue(reg_metric.is_ready_to_send())
+        self.assertEqual(reg_metric.values.get(), (0, 0.0))
+
+    def test_max_flush_latency(self):
+        """
+        Test case to check values are sent once the oldest one waited max_flush_latency.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=100,
+            sampling_function=sampling_function,
+            max_flush_latency=30
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        self.assertFalse(reg_metric.is_ready_to_send())
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=100000):
+            reg_metric.collect()
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=120000):
+            reg_metric.collect()
+            self.assertFalse(reg_metric.is_ready_to_send())
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=130000):
+            self.assertTrue(reg_metric.is_ready_to_send())
+            reg_metric.reset_aggregation_size()
+            self.assertFalse(reg_metric.is_ready_to_send())
+
+    def test_adapt_aggregation_size(self):
+        """
+        Test case to check aggregation size adapts to publish latency within bounds.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=8,
+            sampling_function=sampling_function,
+            min_aggregation_size=2,
+            max_aggregation_size=12
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        self.assertEqual(reg_metric.effective_aggregation_size, 8)
+        reg_metric.adapt_aggregation_size(100, 1000)
+        self.assertEqual(reg_metric.effective_aggregation_size, 9)
+        for _ in range(4):
+            reg_metric.adapt_aggregation_size(100, 1000)
+        self.assertEqual(reg_metric.effective_aggregation_size, 12)
+        # Close to the SLO, the size is kept
+        reg_metric.adapt_aggregation_size(900, 1000)
+        self.assertEqual(reg_metric.effective_aggregation_size, 12)
+        for _ in range(4):
+            reg_metric.adapt_aggregation_size(1500, 1000)
+        self.assertEqual(reg_metric.effective_aggregation_size, 2)
+
+        # Without max_aggregation_size the size is static
+        self.reg_metric.adapt_aggregation_size(1500, 1000)
+        self.assertEqual(self.reg_metric.effective_aggregation_size, 2)
+
+    def test_adapt_aggregation_size_settles(self):
+        """
+        Test case to check aggregation size settles below the SLO when publish latency grows with it.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=30,
+            sampling_function=sampling_function,
+            max_aggregation_size=64
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        sizes = []
+        for _ in range(40):
+            # 50 ms per message plus 40 ms per value
+            reg_metric.adapt_aggregation_size(50 + 40 * reg_metric.effective_aggregation_size, 1000)
+            sizes.append(reg_metric.effective_aggregation_size)
+        self.assertEqual(sizes[:2], [15, 16])
+        self.assertEqual(set(sizes[-20:]), set([19]))
+
+    def test_filter_pipeline(self):
+        """
+        Test case to check values rejected by the filter pipeline are neither buffered nor counted.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=2,
+            sampling_function=sampling_function,
+            filter_pipeline=FilterPipeline(RangeFilter(Type.AT_LEAST, None, 5))
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        with mock.patch("liota.entities.metrics.registered_metric.getUTCmillis", return_value=100000):
+            reg_metric.collect()
+            reg_metric.store_collected_data(3)
+            reg_metric.store_collected_data([(100001, 4), (100002, 6)])
+        self.assertEqual(reg_metric.current_aggregation_size, 2)
+        self.assertEqual(map(list, reg_metric.values.drain()), [[100000, 100002], [10, 6]])
+        reg_metric.store_collected_data((100003, 1))
+        self.assertEqual(reg_metric.current_aggregation_size, 2)
+        self.assertRaises(TypeError, Metric, name="Test_Metric", filter_pipeline=RangeFilter(Type.AT_LEAST, None, 5))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_filter_pipeline_array_batch(self):
+        """
+        Test case to check the filter pipeline filters a NumPy batch using the timestamps of its samples.
+        :return: None
+        """
+        metric = Metric(
+            name="Test_Metric",
+            interval=10,
+            aggregation_size=1000,
+            sampling_function=batch_sampling_function,
+            filter_pipeline=FilterPipeline(RangeFilter(Type.AT_LEAST, None, 0.5),
+                                           RangeFilter(Type.AT_MOST, 0.9, None))
+        )
+        reg_metric = RegisteredMetric(metric, None, None)
+        reg_metric.collect()
+        values = numpy.sin(numpy.arange(1000))
+        expected = numpy.count_nonzero((values >= 0.5) & (values <= 0.9))
+        self.assertEqual(reg_metric.current_aggregation_size, expected)
+        self.assertEqual(reg_metric.values.qsize(), expected)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=1)
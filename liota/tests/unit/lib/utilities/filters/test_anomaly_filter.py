@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import random
+import unittest
+
+import mock
+
+from liota.lib.utilities.filters.anomaly_filter import AnomalyFilter, Method
+from liota.lib.utilities.filters.windowing_scheme.anomaly_gate import AnomalyGate
+
+
+class AnomalyFilterTest(unittest.TestCase):
+    """
+    AnomalyFilter and AnomalyGate unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create a noisy, drifting signal with a spike.
+        :return: None
+        """
+        rand = random.Random(9)
+        self.values = [100.0 + 0.01 * i + rand.gauss(0.0, 1.0) for i in range(3000)]
+        self.values[2000] += 20.0
+
+    def test_filter(self):
+        """
+        Test case to check a spike is passed and few other values are, with either method.
+        :return: None
+        """
+        for method in Method:
+            anomaly_filter = AnomalyFilter(threshold=4.0, method=method)
+            passed = [i for i, v in enumerate(self.values) if anomaly_filter.filter(v) is not None]
+            self.assertIn(2000, passed, method)
+            self.assertLess(len(passed), 30, method)
+        self.assertEqual(anomaly_filter.filter("n/a"), "n/a")
+        self.assertRaises(TypeError, AnomalyFilter, method="zscore")
+
+    def test_min_samples(self):
+        """
+        Test case to check no value is passed before min_samples values, and a change of constant values is passed.
+        :return: None
+        """
+        anomaly_filter = AnomalyFilter(min_samples=5)
+        self.assertEqual([anomaly_filter.filter(v) for v in [1, 1, 1, 1, 1, 1, 2]], [None] * 6 + [2])
+
+    def test_gate_heartbeat(self):
+        """
+        Test case to check the gate passes deviating values and a value at the end of windows with none.
+        :return: None
+        """
+        with mock.patch("liota.lib.utilities.filters.windowing_scheme.windowing_scheme.getUTCmillis",
+                        return_value=0):
+            gate = AnomalyGate(threshold=4.0, heartbeat_sec=60, method=Method.MAD)
+        samples = [(1000 * i, v) for i, v in enumerate(self.values)]
+        passed = gate.filter_batch(samples)
+        self.assertIn(samples[2000], passed)
+        # A heartbeat at the end of each window with no value passed, far fewer values than collected
+        timestamps = [ts for ts, _ in passed]
+        self.assertEqual(timestamps[0], 60000)
+        self.assertTrue(all(ts - prev_ts <= 120000 for prev_ts, ts in zip(timestamps, timestamps[1:])))
+        self.assertLess(len(passed), 100)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+
+
+class DeadbandFilterTest(unittest.TestCase):
+    """
+    DeadbandFilter unit test cases
+    """
+
+    def test_absolute(self):
+        """
+        Test case to check only changes larger than epsilon from the last value passed are passed.
+        :return: None
+        """
+        deadband = DeadbandFilter(0.5)
+        values = [20.0, 20.2, 20.5, 20.6, 20.1, 19.5, 19.5, "n/a"]
+        self.assertEqual([deadband.filter(v) for v in values],
+                         [20.0, None, None, 20.6, None, 19.5, None, "n/a"])
+
+    def test_relative(self):
+        """
+        Test case to check epsilon is a fraction of the last value passed when relative.
+        :return: None
+        """
+        deadband = DeadbandFilter(0.1, relative=True)
+        values = [100, 109, 111, 121, 123, 0, 0, 1]
+        self.assertEqual([deadband.filter(v) for v in values],
+                         [100, None, 111, None, 123, 0, None, 1])
+
+    def test_batch(self):
+        """
+        Test case to check a batch gives the same result as sample by sample filtering.
+        :return: None
+        """
+        values = [20.0, 20.2, 20.5, 20.6, 20.1, 19.5, 19.5, 21]
+        samples = [(1000 * i, v) for i, v in enumerate(values)]
+        deadband = DeadbandFilter(0.5)
+        expected = [(ts, v) for ts, v in samples if deadband.filter(v) is not None]
+
+        deadband = DeadbandFilter(0.5)
+        self.assertEqual(deadband.filter_batch(samples[:3]) + deadband.filter_batch(samples[3:]), expected)
+
+    def test_validation(self):
+        """
+        Test case to check invalid epsilon is rejected.
+        :return: None
+        """
+        self.assertRaises(TypeError, DeadbandFilter, "1")
+        self.assertRaises(ValueError, DeadbandFilter, -1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
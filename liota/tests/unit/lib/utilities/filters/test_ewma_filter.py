@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import random
+import unittest
+
+from liota.lib.utilities.filters.ewma_filter import EwmaFilter
+
+
+class EwmaFilterTest(unittest.TestCase):
+    """
+    EwmaFilter unit test cases
+    """
+
+    def test_filter(self):
+        """
+        Test case to check the mean is returned and weighs older values less.
+        :return: None
+        """
+        ewma = EwmaFilter(0.5)
+        self.assertEqual([ewma.filter(v) for v in [10, 20, 20, "n/a", 0]], [10.0, 15.0, 17.5, "n/a", 8.75])
+        self.assertEqual(ewma.count, 4)
+        self.assertEqual(EwmaFilter(1).filter_batch([(1000, 3), (2000, 5)]), [(1000, 3.0), (2000, 5.0)])
+
+    def test_variance(self):
+        """
+        Test case to check mean and standard deviation converge to those of the values.
+        :return: None
+        """
+        rand = random.Random(7)
+        ewma = EwmaFilter(0.01)
+        for _ in range(5000):
+            ewma.update(rand.gauss(50.0, 2.0))
+        self.assertAlmostEqual(ewma.mean, 50.0, delta=0.5)
+        self.assertAlmostEqual(ewma.std, 2.0, delta=0.3)
+        self.assertRaises(ValueError, EwmaFilter, 0)
+        self.assertRaises(TypeError, EwmaFilter, "0.1")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
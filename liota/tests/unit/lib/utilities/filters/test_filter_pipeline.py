@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+from array import array
+
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+from liota.lib.utilities.filters.filter_pipeline import FilterPipeline
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class FilterPipelineTest(unittest.TestCase):
+    """
+    FilterPipeline unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create a pipeline of two stateless stages and a stateful one.
+        :return: None
+        """
+        self.pipeline = FilterPipeline(RangeFilter(Type.AT_LEAST, None, 0),
+                                       RangeFilter(Type.LESS_THAN, 100, None),
+                                       DeadbandFilter(5))
+        self.values = [-1, 10, 12, 200, 20, 21, -5, 30]
+        self.passed = [10, 20, 30]
+
+    def test_compile(self):
+        """
+        Test case to check consecutive stateless stages are fused into one step.
+        :return: None
+        """
+        self.assertEqual(self.pipeline._plan, [[0, 1], [2]])
+        pipeline = FilterPipeline(DeadbandFilter(5), RangeFilter(Type.AT_LEAST, None, 0), DeadbandFilter(1))
+        self.assertEqual(pipeline._plan, [[0], [1], [2]])
+        self.assertRaises(TypeError, FilterPipeline)
+        self.assertRaises(TypeError, FilterPipeline, RangeFilter(Type.AT_LEAST, None, 0), None)
+
+    def test_filter(self):
+        """
+        Test case to check values are passed through all stages in order, and counted per stage.
+        :return: None
+        """
+        self.assertEqual([v for v in self.values if self.pipeline.filter(v) is not None], self.passed)
+        self.assertEqual([stats[:4] for stats in self.pipeline.get_stats()],
+                         [("RangeFilter", 0, 6, 2), ("RangeFilter", 0, 5, 1), ("DeadbandFilter", 1, 3, 2)])
+
+    def test_filter_batch(self):
+        """
+        Test case to check a batch of samples gives the same result as sample by sample filtering.
+        :return: None
+        """
+        samples = [(1000 * i, v) for i, v in enumerate(self.values)]
+        self.assertEqual(self.pipeline.filter_batch(samples[:3]) + self.pipeline.filter_batch(samples[3:]),
+                         [sample for sample in samples if sample[1] in self.passed])
+        self.assertEqual([stats[:4] for stats in self.pipeline.get_stats()],
+                         [("RangeFilter", 0, 6, 2), ("RangeFilter", 0, 5, 1), ("DeadbandFilter", 1, 3, 2)])
+        self.assertTrue(all(stats.time_ms >= 0 for stats in self.pipeline.get_stats()))
+
+    def test_filter_arrays(self):
+        """
+        Test case to check arrays go through stages without array support as samples.
+        :return: None
+        """
+        timestamps = array('l', range(0, 8000, 1000))
+        self.assertEqual(self.pipeline.filter_arrays(timestamps, array('l', self.values)),
+                         [(1000, 10), (4000, 20), (7000, 30)])
+        pipeline = FilterPipeline(RangeFilter(Type.AT_LEAST, None, 0), RangeFilter(Type.LESS_THAN, 100, None))
+        self.assertEqual(pipeline.filter_arrays(timestamps, array('l', self.values)),
+                         (array('l', [1000, 2000, 4000, 5000, 7000]), array('l', [10, 12, 20, 21, 30])))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_filter_numpy_arrays(self):
+        """
+        Test case to check fused stages filter NumPy arrays with the same counts as sample by sample filtering.
+        :return: None
+        """
+        pipeline = FilterPipeline(RangeFilter(Type.AT_LEAST, None, 0), RangeFilter(Type.LESS_THAN, 100, None))
+        timestamps, values = pipeline.filter_arrays(numpy.arange(8) * 1000, numpy.array(self.values, dtype=float))
+        self.assertEqual(values.tolist(), [10, 12, 20, 21, 30])
+        self.assertEqual(timestamps.tolist(), [1000, 2000, 4000, 5000, 7000])
+        self.assertEqual([stats[2:4] for stats in pipeline.get_stats()], [(6, 2), (5, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
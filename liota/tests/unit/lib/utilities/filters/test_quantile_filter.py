@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import random
+import unittest
+
+from liota.lib.utilities.filters.quantile_filter import P2Quantile, QuantileFilter, RollingQuantile
+
+
+class QuantileFilterTest(unittest.TestCase):
+    """
+    QuantileFilter unit test cases
+    """
+
+    def test_p2_quantile(self):
+        """
+        Test case to check quantile estimates are exact for few values and close to the sample quantiles for many.
+        :return: None
+        """
+        quantile = P2Quantile(0.5)
+        self.assertIsNone(quantile.value())
+        for v in [5, 1, 3]:
+            quantile.add(v)
+        self.assertEqual(quantile.value(), 3)
+        rand = random.Random(11)
+        values = [rand.gauss(0.0, 1.0) for _ in range(10000)]
+        for p in [0.05, 0.5, 0.95]:
+            quantile = P2Quantile(p)
+            for v in values:
+                quantile.add(v)
+            self.assertAlmostEqual(quantile.value(), sorted(values)[int(p * len(values))], delta=0.05)
+
+    def test_rolling_quantile(self):
+        """
+        Test case to check the rolling estimate follows a shift of the values.
+        :return: None
+        """
+        quantile = RollingQuantile(0.5, 100)
+        for v in range(1000):
+            quantile.add(v)
+        self.assertTrue(850 <= quantile.value() <= 950)
+        self.assertEqual(quantile.count, 200)
+        for _ in range(150):
+            quantile.add(5000)
+        self.assertEqual(quantile.value(), 5000)
+
+    def test_filter(self):
+        """
+        Test case to check only values out of the quantiles of previous values are passed.
+        :return: None
+        """
+        rand = random.Random(5)
+        quantile_filter = QuantileFilter(0.01, 0.99, window_size=500)
+        for _ in range(1000):
+            quantile_filter.filter(rand.uniform(10.0, 20.0))
+        self.assertEqual(quantile_filter.filter(15.0), None)
+        self.assertEqual(quantile_filter.filter(9.0), 9.0)
+        self.assertEqual(quantile_filter.filter(21.0), 21.0)
+        self.assertEqual(quantile_filter.filter("n/a"), "n/a")
+        # Nothing is passed before min_samples values
+        self.assertEqual([QuantileFilter(upper_quantile=0.5).filter(v) for v in range(10)], [None] * 10)
+        self.assertRaises(TypeError, QuantileFilter)
+        self.assertRaises(ValueError, QuantileFilter, 0.9, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+from array import array
+
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Bounds of each filter type and values it accepts among 0...11
+ACCEPTED = [
+    (Type.CLOSED, 1, 10, range(1, 11)),
+    (Type.OPEN, 1, 10, range(2, 10)),
+    (Type.CLOSED_OPEN, 1, 10, range(1, 10)),
+    (Type.OPEN_CLOSED, 1, 10, range(2, 11)),
+    (Type.CLOSED_REJECT, 1, 10, [0, 11]),
+    (Type.OPEN_REJECT, 1, 10, [0, 1, 10, 11]),
+    (Type.CLOSED_OPEN_REJECT, 1, 10, [0, 10, 11]),
+    (Type.OPEN_CLOSED_REJECT, 1, 10, [0, 1, 11]),
+    (Type.LESS_THAN, 1, None, [0]),
+    (Type.AT_MOST, 1, None, [0, 1]),
+    (Type.GREATER_THAN, None, 10, [11]),
+    (Type.AT_LEAST, None, 10, [10, 11])
+]
+
+
+class RangeFilterTest(unittest.TestCase):
+    """
+    RangeFilter unit test cases
+    """
+
+    def test_filter(self):
+        """
+        Test case to check each filter type accepts the values in its range.
+        :return: None
+        """
+        for filter_type, lower_bound, upper_bound, accepted in ACCEPTED:
+            range_filter = RangeFilter(filter_type, lower_bound, upper_bound)
+            self.assertEqual([v for v in range(12) if range_filter.filter(v) is not None], accepted,
+                             filter_type)
+        self.assertEqual(RangeFilter(Type.CLOSED, 1, 10).filter("n/a"), "n/a")
+
+    def test_filter_batch(self):
+        """
+        Test case to check a batch of samples is filtered as sample by sample.
+        :return: None
+        """
+        samples = [(1000 * v, v) for v in range(12)] + [(12000, "n/a")]
+        for filter_type, lower_bound, upper_bound, accepted in ACCEPTED:
+            range_filter = RangeFilter(filter_type, lower_bound, upper_bound)
+            self.assertEqual(range_filter.filter_batch(samples),
+                             [(1000 * v, v) for v in accepted] + [(12000, "n/a")])
+
+    def test_filter_arrays(self):
+        """
+        Test case to check arrays of samples are filtered, keeping their types.
+        :return: None
+        """
+        range_filter = RangeFilter(Type.OPEN_REJECT, 1, 10)
+        timestamps, values = range_filter.filter_arrays(array('d', range(0, 12000, 1000)), array('l', range(12)))
+        self.assertEqual(timestamps, array('d', [0, 1000, 10000, 11000]))
+        self.assertEqual(values, array('l', [0, 1, 10, 11]))
+        self.assertEqual(range_filter.filter_arrays([0, 1000], [5, 11]), ([1000], [11]))
+        self.assertRaises(ValueError, range_filter.filter_arrays, [0, 1000], [5])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_filter_numpy_arrays(self):
+        """
+        Test case to check NumPy arrays are filtered with the same result as sample by sample.
+        :return: None
+        """
+        values = numpy.arange(12) * 1.0
+        timestamps = numpy.arange(12, dtype=numpy.int64) * 1000
+        for filter_type, lower_bound, upper_bound, accepted in ACCEPTED:
+            range_filter = RangeFilter(filter_type, lower_bound, upper_bound)
+            passed_timestamps, passed_values = range_filter.filter_arrays(timestamps, values)
+            self.assertIsInstance(passed_values, numpy.ndarray)
+            self.assertEqual(passed_values.tolist(), accepted, filter_type)
+            self.assertEqual(passed_timestamps.tolist(), [1000 * v for v in accepted])
+        mask = RangeFilter(Type.CLOSED, 1, 10).mask(numpy.array([0, "n/a", 5], dtype=object))
+        self.assertEqual(mask.tolist(), [False, True, True])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
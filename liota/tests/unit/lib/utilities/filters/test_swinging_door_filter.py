@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import math
+import random
+import unittest
+
+import mock
+
+from liota.lib.utilities.filters.swinging_door_filter import SwingingDoorFilter
+
+
+class SwingingDoorFilterTest(unittest.TestCase):
+    """
+    SwingingDoorFilter unit test cases
+    """
+
+    def _reconstruct(self, passed, ts):
+        for (t0, v0), (t1, v1) in zip(passed, passed[1:]):
+            if t0 <= ts <= t1:
+                return v0 + (v1 - v0) * float(ts - t0) / (t1 - t0)
+
+    def test_line(self):
+        """
+        Test case to check samples on a straight line are compressed to its ends.
+        :return: None
+        """
+        sdt = SwingingDoorFilter(0.1)
+        samples = [(1000 * i, 2.0 * i) for i in range(10)] + [(10000, 0.0)]
+        self.assertEqual(sdt.filter_batch(samples), [(0, 0.0), (9000, 18.0)])
+        self.assertEqual(sdt.flush(), (10000, 0.0))
+        self.assertIsNone(sdt.flush())
+
+    def test_reconstruction(self):
+        """
+        Test case to check the signal interpolated from the samples passed is within deviation of all samples.
+        :return: None
+        """
+        rand = random.Random(7)
+        samples = [(1000 * i, 20 + 5 * math.sin(i / 50.0) + rand.gauss(0, 0.05)) for i in range(2000)]
+        sdt = SwingingDoorFilter(0.2)
+        passed = sdt.filter_batch(samples)
+        passed.append(sdt.flush())
+        self.assertLess(len(passed), len(samples) / 5)
+        for ts, v in samples:
+            self.assertLessEqual(abs(self._reconstruct(passed, ts) - v), 0.2 + 1e-9)
+
+    def test_filter(self):
+        """
+        Test case to check sample by sample filtering returns passed samples with their timestamps.
+        :return: None
+        """
+        sdt = SwingingDoorFilter(0.5)
+        results = []
+        with mock.patch("liota.lib.utilities.filters.swinging_door_filter.getUTCmillis") as now:
+            for i, v in enumerate([1, 1, 1, 5, 5, "n/a"]):
+                now.return_value = 1000 * i
+                results.append(sdt.filter(v))
+        self.assertEqual(results, [(0, 1), None, None, (2000, 1), (3000, 5), "n/a"])
+
+    def test_validation(self):
+        """
+        Test case to check invalid deviation is rejected.
+        :return: None
+        """
+        self.assertRaises(TypeError, SwingingDoorFilter, None)
+        self.assertRaises(ValueError, SwingingDoorFilter, -0.1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
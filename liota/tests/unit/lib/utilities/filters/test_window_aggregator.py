@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import unittest
+
+import mock
+
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+from liota.lib.utilities.filters.windowing_scheme.window_aggregator import WindowAggregator, WindowSummary
+
+
+class WindowAggregatorTest(unittest.TestCase):
+    """
+    WindowAggregator unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to mock the clock of WindowAggregator.
+        :return: None
+        """
+        self.patcher = mock.patch("liota.lib.utilities.filters.windowing_scheme.window_aggregator.getUTCmillis")
+        self.now = self.patcher.start()
+
+    def tearDown(self):
+        """
+        Method to restore the clock.
+        :return: None
+        """
+        self.patcher.stop()
+
+    def _feed(self, aggregator, samples):
+        """
+        :param samples: List of (time in ms, value)
+        :return: List of non None results
+        """
+        results = []
+        for ts, v in samples:
+            self.now.return_value = ts
+            result = aggregator.filter(v)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def test_tumbling(self):
+        """
+        Test case to check a summary is returned for each tumbling window.
+        :return: None
+        """
+        aggregator = WindowAggregator(window_size_sec=10)
+        results = self._feed(aggregator, [(ts, ts / 1000) for ts in range(100000, 125000, 1000)])
+        self.assertEqual(results, [
+            (110000, WindowSummary(100, 109, 104.5, 10, 109)),
+            (120000, WindowSummary(110, 119, 114.5, 10, 119))
+        ])
+
+    def test_hopping(self):
+        """
+        Test case to check overlapping windows are summarized when hop_sec is smaller than window_size_sec.
+        :return: None
+        """
+        aggregator = WindowAggregator(window_size_sec=10, hop_sec=5)
+        results = self._feed(aggregator, [(ts, ts / 1000) for ts in range(100000, 121000, 1000)])
+        self.assertEqual(results, [
+            (110000, WindowSummary(100, 109, 104.5, 10, 109)),
+            (115000, WindowSummary(105, 114, 109.5, 10, 114)),
+            (120000, WindowSummary(110, 119, 114.5, 10, 119))
+        ])
+
+    def test_range_filter(self):
+        """
+        Test case to check only values passed by the filter are aggregated, and empty windows are skipped.
+        :return: None
+        """
+        aggregator = WindowAggregator(RangeFilter(Type.AT_LEAST, None, 5), window_size_sec=10)
+        results = self._feed(aggregator, [(100000, 1), (101000, 7), (102000, 5), (103000, 2),
+                                          (111000, 1), (125000, 9), (130000, 0)])
+        self.assertEqual(results, [
+            (110000, WindowSummary(5, 7, 6.0, 2, 5)),
+            (130000, WindowSummary(9, 9, 9.0, 1, 9))
+        ])
+
+    def test_deadband_batch(self):
+        """
+        Test case to check a batch of samples gives the same summaries as sample by sample aggregation with a stateful filter.
+        :return: None
+        """
+        samples = [(100000 + 1000 * i, v) for i, v in enumerate([1, 1.2, 3, 3.1, 5, 5, 1, 1.4, 2, 2] * 3)]
+        expected = self._feed(WindowAggregator(DeadbandFilter(0.5), window_size_sec=10), samples)
+        self.assertEqual(WindowAggregator(DeadbandFilter(0.5), window_size_sec=10).filter_batch(samples), expected)
+        self.assertEqual(expected[0], (110000, WindowSummary(1, 5, 2.4, 5, 2)))
+
+    def test_gap(self):
+        """
+        Test case to check windows closed at once are returned together, and windows are restarted after a gap.
+        :return: None
+        """
+        aggregator = WindowAggregator(window_size_sec=10, hop_sec=2)
+        self._feed(aggregator, [(101000, 1)])
+        self.now.return_value = 111000
+        self.assertEqual(aggregator.filter(2), (110000, WindowSummary(1, 1, 1.0, 1, 1)))
+        self.now.return_value = 500000
+        self.assertEqual(aggregator.filter(3), [(end, WindowSummary(2, 2, 2.0, 1, 2))
+                                                for end in range(112000, 122000, 2000)])
+        self.assertEqual(aggregator.filter(4), None)
+
+    def test_validation(self):
+        """
+        Test case to check invalid window settings are rejected.
+        :return: None
+        """
+        self.assertRaises(ValueError, WindowAggregator, window_size_sec=0)
+        self.assertRaises(ValueError, WindowAggregator, window_size_sec=10, hop_sec=20)
+        self.assertRaises(TypeError, WindowAggregator, filter_obj=object())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
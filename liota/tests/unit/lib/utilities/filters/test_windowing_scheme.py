@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------#
+#  Copyright © 2015-2016 VMware, Inc. All Rights Reserved.                    #
+#                                                                             #
+#  Licensed under the BSD 2-Clause License (the “License”); you may not use   #
+#  this file except in compliance with the License.                           #
+#                                                                             #
+#  The BSD 2-Clause License                                                   #
+#                                                                             #
+#  Redistribution and use in source and binary forms, with or without         #
+#  modification, are permitted provided that the following conditions are met:#
+#                                                                             #
+#  - Redistributions of source code must retain the above copyright notice,   #
+#      this list of conditions and the following disclaimer.                  #
+#                                                                             #
+#  - Redistributions in binary form must reproduce the above copyright        #
+#      notice, this list of conditions and the following disclaimer in the    #
+#      documentation and/or other materials provided with the distribution.   #
+#                                                                             #
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"#
+#  AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE  #
+#  IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE #
+#  ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE  #
+#  LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR        #
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF       #
+#  SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS   #
+#  INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN    #
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)    #
+#  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF     #
+#  THE POSSIBILITY OF SUCH DAMAGE.                                            #
+# ----------------------------------------------------------------------------#
+
+import random
+import unittest
+
+import mock
+
+from liota.lib.utilities.filters.deadband_filter import DeadbandFilter
+from liota.lib.utilities.filters.range_filter import RangeFilter, Type
+from liota.lib.utilities.filters.swinging_door_filter import SwingingDoorFilter
+from liota.lib.utilities.filters.windowing_scheme.windowing_scheme import WindowingScheme
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CLOCK = "liota.lib.utilities.filters.windowing_scheme.windowing_scheme.getUTCmillis"
+
+
+class WindowingSchemeTest(unittest.TestCase):
+    """
+    WindowingScheme unit test cases
+    """
+
+    def setUp(self):
+        """
+        Method to create samples, mostly rejected by the filter.
+        :return: None
+        """
+        rand = random.Random(3)
+        self.samples = [(100000 + 700 * i, rand.choice([1, 2, 3, 3, 3, 3, 3, 3])) for i in range(500)]
+
+    def _windowing_scheme(self):
+        with mock.patch(CLOCK, return_value=100000):
+            return WindowingScheme(RangeFilter(Type.AT_MOST, 2, None), 5)
+
+    def _filter_each(self):
+        windowing_scheme = self._windowing_scheme()
+        passed = []
+        with mock.patch(CLOCK) as now:
+            for ts, v in self.samples:
+                now.return_value = ts
+                if windowing_scheme.filter(v) is not None:
+                    passed.append((ts, v))
+        return passed
+
+    def test_filter(self):
+        """
+        Test case to check a rejected value is passed at the end of a window where no value passed.
+        :return: None
+        """
+        windowing_scheme = self._windowing_scheme()
+        results = []
+        with mock.patch(CLOCK) as now:
+            for ts, v in [(101000, 3), (102000, 1), (105000, 3), (106000, 3), (110000, 3), (111000, 3)]:
+                now.return_value = ts
+                results.append(windowing_scheme.filter(v))
+        self.assertEqual(results, [None, 1, None, None, 3, None])
+
+    def test_filter_batch(self):
+        """
+        Test case to check a batch of samples gives the same result as sample by sample filtering.
+        :return: None
+        """
+        expected = self._filter_each()
+        windowing_scheme = self._windowing_scheme()
+        self.assertEqual(windowing_scheme.filter_batch(self.samples[:123]) +
+                         windowing_scheme.filter_batch(self.samples[123:]), expected)
+
+    def test_deadband_batch(self):
+        """
+        Test case to check a batch of samples gives the same result as sample by sample filtering with a DeadbandFilter.
+        :return: None
+        """
+        samples = [(100000 + 700 * i, v) for i, v in enumerate([1, 1.2, 3, 3.1, 3.2, 3, 3, 3, 3, 3, 3, 3, 1, 1] * 5)]
+        expected = []
+        with mock.patch(CLOCK, return_value=100000):
+            windowing_scheme = WindowingScheme(DeadbandFilter(0.5), 5)
+        with mock.patch(CLOCK) as now:
+            for ts, v in samples:
+                now.return_value = ts
+                if windowing_scheme.filter(v) is not None:
+                    expected.append((ts, v))
+        with mock.patch(CLOCK, return_value=100000):
+            windowing_scheme = WindowingScheme(DeadbandFilter(0.5), 5)
+        self.assertEqual(windowing_scheme.filter_batch(samples[:20]) + windowing_scheme.filter_batch(samples[20:]),
+                         expected)
+
+    def test_swinging_door_batch(self):
+        """
+        Test case to check a SwingingDoorFilter passes the samples it would pass on its own, with their timestamps.
+        :return: None
+        """
+        samples = [(1000 * i, v) for i, v in enumerate([0, 1, 2, 3, 4, 4, 4, 4, 3, 2, 1, 0, 0, 0])]
+        expected = SwingingDoorFilter(0.5).filter_batch(samples)
+        with mock.patch(CLOCK, return_value=0):
+            windowing_scheme = WindowingScheme(SwingingDoorFilter(0.5), 3600)
+        passed = windowing_scheme.filter_batch(samples)
+        self.assertEqual(passed, expected)
+        self.assertGreater(len(passed), 1)
+
+    def test_swinging_door_window(self):
+        """
+        Test case to check the collected sample is passed at the end of a window where a SwingingDoorFilter passed none.
+        :return: None
+        """
+        samples = [(1000 * i, i) for i in range(12)]
+        with mock.patch(CLOCK, return_value=0):
+            windowing_scheme = WindowingScheme(SwingingDoorFilter(0.5), 5)
+        self.assertEqual(windowing_scheme.filter_batch(samples), [(0, 0), (10000, 10)])
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_filter_numpy_arrays(self):
+        """
+        Test case to check NumPy arrays of samples give the same result as sample by sample filtering.
+        :return: None
+        """
+        expected = self._filter_each()
+        timestamps = numpy.array([ts for ts, _ in self.samples], dtype=numpy.int64)
+        values = numpy.array([v for _, v in self.samples], dtype=numpy.float64)
+        passed_timestamps, passed_values = self._windowing_scheme().filter_arrays(timestamps, values)
+        self.assertEqual(zip(passed_timestamps.tolist(), passed_values.tolist()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)